@@ -0,0 +1,84 @@
+"""
+Compares size and parse time of `blueprint.json` written normally, with
+`--minify` and with `--minify --body-size`. Every output is checked against
+`resources/blueprint_schema.json`.
+
+Run from repository root after compiling the design once, e.g.
+
+    python -m create_blueprint --top rv32i_cpu --auto-height examples/rv32i_cpu/*.sv
+    python -m benchmarks.blueprint_minify blueprints/rv32i_cpu/rv32i_cpu.json rv32i_cpu
+"""
+
+import argparse
+import gc
+import json
+import time
+from pathlib import Path
+from typing import Union
+
+from create_blueprint.block_placer import BlockPlacer, BlockPlacerOptions
+from create_blueprint.blueprint import Blueprint
+from create_blueprint.blueprint_schema import validate_blueprint
+from create_blueprint.cell import generate_cells
+from create_blueprint.circuit import Circuit
+from create_blueprint.netlist import Netlist
+
+
+def _best_parse_time(text: str) -> float:
+    times = []
+
+    for _ in range(20):
+        gc.collect()
+
+        start = time.perf_counter()
+
+        json.loads(text)
+
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="benchmarks.blueprint_minify")
+
+    parser.add_argument("yosys_output", help="JSON written by yosys", type=Path)
+    parser.add_argument("top", help="top module name")
+    parser.add_argument(
+        "--body-size", help="blocks in one body", type=int, default=4096
+    )
+
+    args = parser.parse_args()
+
+    circuit = Circuit.from_yosys_output(
+        generate_cells(10), args.yosys_output.read_text(), args.top
+    )
+    blueprint: Blueprint = BlockPlacer.place(
+        Netlist.from_circuit(circuit), BlockPlacerOptions(None, False, True, False)
+    )
+
+    del circuit
+
+    print(f"Blocks: {len(blueprint.blocks)}\n")
+    print(f"{'':>16}{'size':>10}{'parse time':>12}")
+
+    variants: list[tuple[str, bool, Union[int, None]]] = [
+        ("default", False, None),
+        ("minify", True, None),
+        ("minify + bodies", True, args.body_size),
+    ]
+
+    for name, minify, body_size in variants:
+        blueprint.minify = minify
+        blueprint.body_size = body_size
+
+        text = blueprint.to_json()
+
+        validate_blueprint(json.loads(text))
+
+        print(
+            f"{name:>16}{len(text) / 2**20:>8.2f}MB" f"{_best_parse_time(text):>11.3f}s"
+        )
+
+
+main()
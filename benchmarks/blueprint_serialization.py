@@ -0,0 +1,199 @@
+"""
+Compares storing blocks as nested dicts and saving `blueprint.json` with
+`json.dumps` (as it was done before) to `Block` records written by
+`Blueprint.write_json`. Both outputs are checked to be identical.
+
+Run from repository root after compiling the design once, e.g.
+
+    python -m create_blueprint --top rv32i_cpu --auto-height examples/rv32i_cpu/*.sv
+    python -m benchmarks.blueprint_serialization blueprints/rv32i_cpu/rv32i_cpu.json rv32i_cpu
+"""
+
+import argparse
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from create_blueprint.block_placer import BlockPlacer, BlockPlacerOptions
+from create_blueprint.blueprint import Block, Blueprint
+from create_blueprint.cell import generate_cells
+from create_blueprint.circuit import Circuit
+from create_blueprint.netlist import Netlist
+from create_blueprint.shape_id import ShapeId
+
+
+def _block_dict(block: Block) -> dict[str, Any]:
+    """
+    Returns block in the form in which `Blueprint` stored it before.
+    """
+
+    pos = {"x": block.x, "y": block.y, "z": block.z}
+    rest = {
+        "shapeId": block.shape_id,
+        "xaxis": block.xaxis,
+        "zaxis": block.zaxis,
+        "color": block.color,
+    }
+
+    if block.id is None:
+        return {"bounds": {"x": 1, "y": 1, "z": 1}, "pos": pos} | rest
+
+    controller = {
+        "id": block.id,
+        "controllers": [{"id": id} for id in block.controllers],
+        "joints": None,
+    }
+
+    match block.shape_id:
+        case ShapeId.Sensor:
+            controller = {
+                "audioEnabled": False,
+                "buttonMode": True,
+                "colorMode": True,
+                "color": "EEEEEE",
+                "range": 1,
+            } | controller
+
+            return {"controller": controller, "pos": pos} | rest
+        case ShapeId.Switch:
+            return {"controller": {"active": False} | controller, "pos": pos} | rest
+        case ShapeId.Timer:
+            controller = {"active": False} | controller
+            controller["seconds"] = block.value // 40
+            controller["ticks"] = block.value % 40
+
+            return {"pos": pos, "controller": controller} | rest
+        case _:
+            controller = {"active": False} | controller
+            controller["mode"] = block.value
+
+            return {"pos": pos, "controller": controller} | rest
+
+
+def _current_rss() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _peak_rss_increase(save: Callable[[], None]) -> int:
+    """
+    Runs `save` in forked process and returns increase of its peak RSS.
+    """
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+
+    if pid == 0:
+        os.close(read_fd)
+        os.write(write_fd, str(_current_rss()).encode())
+        os.close(write_fd)
+
+        save()
+
+        os._exit(0)
+
+    os.close(write_fd)
+
+    with os.fdopen(read_fd) as pipe:
+        start_rss = int(pipe.read())
+
+    _, _, rusage = os.wait4(pid, 0)
+
+    return rusage.ru_maxrss * 1024 - start_rss
+
+
+def _best_time(save: Callable[[], None]) -> float:
+    times = []
+
+    for _ in range(5):
+        gc.collect()
+
+        start = time.perf_counter()
+
+        save()
+
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="benchmarks.blueprint_serialization")
+
+    parser.add_argument("yosys_output", help="JSON written by yosys", type=Path)
+    parser.add_argument("top", help="top module name")
+
+    args = parser.parse_args()
+
+    circuit = Circuit.from_yosys_output(
+        generate_cells(10), args.yosys_output.read_text(), args.top
+    )
+    netlist = Netlist.from_circuit(circuit)
+
+    del circuit
+
+    options = BlockPlacerOptions(None, False, True, False)
+
+    tracemalloc.start()
+
+    blueprint: Blueprint = BlockPlacer.place(netlist, options)
+    records_size = tracemalloc.get_traced_memory()[0]
+
+    tracemalloc.stop()
+
+    print(f"Blocks: {len(blueprint.blocks)}\n")
+
+    with tempfile.TemporaryDirectory() as temp_path:
+        dicts_path = Path(temp_path) / "dicts.json"
+        records_path = Path(temp_path) / "records.json"
+
+        def save_dicts():
+            block_dicts = [_block_dict(block) for block in blueprint.blocks]
+
+            dicts_path.write_text(
+                json.dumps(
+                    {"bodies": [{"childs": block_dicts}], "version": 4},
+                    separators=(",", ":"),
+                )
+            )
+
+        def save_records():
+            with records_path.open("w") as file:
+                blueprint.write_json(file)
+
+        # Peak RSS is measured first, so memory freed by other runs and kept
+        # by allocator doesn't hide allocations.
+        peaks_rss = [_peak_rss_increase(save) for save in (save_dicts, save_records)]
+
+        tracemalloc.start()
+
+        block_dicts = [_block_dict(block) for block in blueprint.blocks]
+        dicts_size = tracemalloc.get_traced_memory()[0]
+
+        tracemalloc.stop()
+
+        del block_dicts
+
+        print(f"{'':>10}{'blocks':>10}{'save time':>12}{'save peak RSS':>16}")
+
+        for name, blocks_size, save, peak_rss in (
+            ("dicts", dicts_size, save_dicts, peaks_rss[0]),
+            ("records", records_size, save_records, peaks_rss[1]),
+        ):
+            save_time = _best_time(save)
+
+            print(
+                f"{name:>10}{blocks_size / 2**20:>8.1f}MB{save_time:>11.3f}s"
+                f"{peak_rss / 2**20:>14.1f}MB"
+            )
+
+        if dicts_path.read_bytes() != records_path.read_bytes():
+            raise ValueError("outputs are different")
+
+
+main()
@@ -0,0 +1,62 @@
+"""
+Measures graph rewriting on synthetic net with one driver and many sinks.
+
+    python -m benchmarks.high_fanout
+"""
+
+import argparse
+import time
+
+from create_blueprint.circuit import Circuit
+from create_blueprint.edge_list import EdgeList
+from create_blueprint.gate import GateMode
+
+
+def _create_circuit(fanout: int) -> Circuit:
+    circuit = Circuit()
+    driver = circuit._create_gate("middle", GateMode.OR)
+
+    for _ in range(fanout):
+        circuit._link(driver, circuit._create_gate("middle"))
+
+    return circuit
+
+
+def _remove_last(edges, fanout: int) -> float:
+    items = list(range(fanout))
+
+    for item in items:
+        edges.append(item)
+
+    start = time.perf_counter()
+
+    for item in reversed(items):
+        edges.remove(item)
+
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="benchmarks.high_fanout")
+
+    parser.add_argument("-f", "--fanout", type=int, default=10_000)
+
+    args = parser.parse_args()
+
+    print(f"Removing {args.fanout} edges from the end:")
+    print(f"\tlist: {_remove_last([], args.fanout):.3f}s")
+    print(f"\tEdgeList: {_remove_last(EdgeList(), args.fanout):.3f}s\n")
+
+    print("Connection limit enforcement:")
+
+    for fanout in (args.fanout // 10, args.fanout):
+        circuit = _create_circuit(fanout)
+
+        start = time.perf_counter()
+
+        circuit._ensure_connection_limit()
+
+        print(f"\tfan-out {fanout}: {time.perf_counter() - start:.3f}s")
+
+
+main()
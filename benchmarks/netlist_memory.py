@@ -0,0 +1,89 @@
+"""
+Compares memory used by `Circuit` object graph and by `Netlist` built from it.
+
+Run from repository root after compiling the design once, e.g.
+
+    python -m create_blueprint --top rv32i_cpu --auto-height examples/rv32i_cpu/*.sv
+    python -m benchmarks.netlist_memory blueprints/rv32i_cpu/rv32i_cpu.json rv32i_cpu
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from pathlib import Path
+
+from create_blueprint.block_placer import BlockPlacer, BlockPlacerOptions
+from create_blueprint.cell import generate_cells
+from create_blueprint.circuit import Circuit
+from create_blueprint.netlist import Netlist
+
+
+def _traced() -> int:
+    gc.collect()
+
+    return tracemalloc.get_traced_memory()[0]
+
+
+def _place(circuit, options: BlockPlacerOptions) -> tuple[float, int]:
+    tracemalloc.reset_peak()
+
+    start_memory = _traced()
+    start = time.perf_counter()
+
+    BlockPlacer.place(circuit, options)
+
+    return (
+        time.perf_counter() - start,
+        tracemalloc.get_traced_memory()[1] - start_memory,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="benchmarks.netlist_memory")
+
+    parser.add_argument("yosys_output", help="JSON written by yosys", type=Path)
+    parser.add_argument("top", help="top module name")
+    parser.add_argument("-i", "--cell-max-inputs", type=int, default=10)
+
+    args = parser.parse_args()
+
+    cells = generate_cells(args.cell_max_inputs)
+    yosys_output = args.yosys_output.read_text()
+    options = BlockPlacerOptions(None, False, True, False)
+
+    tracemalloc.start()
+
+    base = _traced()
+    circuit = Circuit.from_yosys_output(cells, yosys_output, args.top)
+    circuit.output_ready_time
+
+    circuit_memory = _traced() - base
+    circuit_place_time, circuit_place_peak = _place(circuit, options)
+
+    before_netlist = _traced()
+    netlist = Netlist.from_circuit(circuit)
+    netlist_memory = _traced() - before_netlist
+
+    del circuit
+
+    netlist_place_time, netlist_place_peak = _place(netlist, options)
+
+    tracemalloc.stop()
+
+    print(f"Logic count: {len(netlist.all_logic)}\n")
+    print(f"{'':>10}{'retained':>12}{'peak':>12}{'placement':>12}")
+
+    for name, memory, place_peak, place_time in (
+        ("Circuit", circuit_memory, circuit_place_peak, circuit_place_time),
+        ("Netlist", netlist_memory, netlist_place_peak, netlist_place_time),
+    ):
+        print(
+            f"{name:>10}{memory / 2**20:>10.1f}MB"
+            f"{(memory + place_peak) / 2**20:>10.1f}MB{place_time:>11.2f}s"
+        )
+
+    print(f"\nNetlist is {circuit_memory / netlist_memory:.1f}x smaller.")
+
+
+main()
@@ -0,0 +1,86 @@
+"""
+Measures time of importing entry points of `create_blueprint` in fresh
+interpreters and fails if it is over budget or if dependencies which are
+needed only for icons, flowcharts or yosys attributes are imported eagerly.
+
+    python -m benchmarks.startup_time --budget 0.25
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+_MODULES = [
+    "create_blueprint.build",
+    "create_blueprint.batch",
+    "create_blueprint.client",
+    "create_blueprint.api",
+]
+# Dependencies which must be imported at their first use.
+_LAZY_MODULES = ["PIL", "graphviz", "bitstring"]
+
+_MEASURE_SCRIPT = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+
+import {module}
+
+print(json.dumps([time.perf_counter() - start, sorted(sys.modules)]))
+"""
+
+
+def _measure(module: str) -> tuple[float, list[str]]:
+    output = subprocess.run(
+        [sys.executable, "-c", _MEASURE_SCRIPT.format(module=module)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    import_time, modules = json.loads(output)
+
+    return import_time, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="benchmarks.startup_time")
+
+    parser.add_argument(
+        "--budget", help="maximum import time in seconds", type=float, default=0.25
+    )
+    parser.add_argument("--repeats", help="imports of each module", type=int, default=5)
+
+    args = parser.parse_args()
+
+    print(f"{'':>24}{'import time':>13}")
+
+    errors: list[str] = []
+
+    for module in _MODULES:
+        times = []
+
+        for _ in range(args.repeats):
+            import_time, modules = _measure(module)
+
+            times.append(import_time)
+
+        print(f"{module:>24}{min(times) * 1000:>11.1f}ms")
+
+        if min(times) > args.budget:
+            errors.append(
+                f'importing "{module}" takes {min(times):.3f}s, budget is {args.budget}s'
+            )
+
+        for lazy_module in _LAZY_MODULES:
+            if lazy_module in modules:
+                errors.append(f'"{module}" imports "{lazy_module}"')
+
+    if len(errors) != 0:
+        raise ValueError("\n".join(errors))
+
+
+main()
@@ -0,0 +1,78 @@
+"""
+Compares reading yosys output file as whole and parsing it with `json.loads`
+to streaming it through `parse_yosys_output`.
+
+Run from repository root after compiling the design once, e.g.
+
+    python -m create_blueprint --top rv32i_cpu --auto-height examples/rv32i_cpu/*.sv
+    python -m benchmarks.yosys_output_parsing blueprints/rv32i_cpu/rv32i_cpu.json rv32i_cpu
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from create_blueprint.yosys_json import parse_yosys_output
+
+
+def _measure(parse: Callable[[], Any]) -> tuple[float, int, int]:
+    """
+    Returns best time of several runs, peak and retained memory.
+    """
+
+    gc.collect()
+    tracemalloc.start()
+
+    result = parse()
+    retained, peak = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+
+    del result
+
+    times = []
+
+    for _ in range(5):
+        gc.collect()
+
+        start = time.perf_counter()
+
+        parse()
+
+        times.append(time.perf_counter() - start)
+
+    return min(times), peak, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="benchmarks.yosys_output_parsing")
+
+    parser.add_argument("yosys_output", help="JSON written by yosys", type=Path)
+    parser.add_argument("top", help="top module name")
+
+    args = parser.parse_args()
+
+    def parse_json() -> Any:
+        return json.loads(args.yosys_output.read_text())["modules"][args.top]
+
+    def parse_stream() -> Any:
+        with args.yosys_output.open() as stream:
+            return parse_yosys_output(stream, args.top)
+
+    print(f"Yosys output size: {args.yosys_output.stat().st_size / 2**20:.1f}MB\n")
+    print(f"{'':>12}{'time':>10}{'peak':>12}{'retained':>12}")
+
+    for name, parse in (("json.loads", parse_json), ("streaming", parse_stream)):
+        parse_time, peak, retained = _measure(parse)
+
+        print(
+            f"{name:>12}{parse_time:>9.3f}s{peak / 2**20:>10.1f}MB"
+            f"{retained / 2**20:>10.1f}MB"
+        )
+
+
+main()
@@ -0,0 +1,139 @@
+"""
+In-process API which compiles design to `Circuit` and `Blueprint` objects
+without command line parsing. Nothing is written to disk unless synthesis
+cache or blueprints directory is given.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Union
+import time
+
+from .block_placer import BlockPlacer, BlockPlacerOptions
+from .blueprint import Blueprint
+from .cell import generate_cells
+from .circuit import Circuit
+from .shape_id import ShapeId
+from .synthesis_cache import SynthesisCache
+from .yosys import compile
+
+
+@dataclass
+class CompileOptions:
+    cell_max_inputs: int = 10
+    optimize: bool = True
+    hierarchical: bool = False
+    # Overrides of top module parameters, values are Verilog constants.
+    parameters: dict[str, str] = field(default_factory=dict)
+    placement: BlockPlacerOptions = field(
+        default_factory=lambda: BlockPlacerOptions(None, False, True, False)
+    )
+    # Name of blueprint (default: top module name).
+    name: Union[str, None] = None
+    # See `Blueprint.minify` and `Blueprint.body_size`.
+    minify: bool = False
+    body_size: Union[int, None] = None
+    # See `Blueprint.save`.
+    reproducible: bool = False
+    cache: Union[SynthesisCache, None] = None
+    # If given, yosys output, yosys log and blueprint are saved to
+    # `blueprints_path / name` directory like command line does.
+    blueprints_path: Union[Path, None] = None
+
+
+@dataclass
+class CompileReport:
+    delay: int
+    blocks_count: dict[str, int]
+    total_blocks_count: int
+    # Seconds spent in each stage of compilation.
+    stages_times: dict[str, float]
+    # Set if blueprint is saved.
+    blueprint_path: Union[Path, None]
+
+
+def compile_design(
+    files: list[Union[str, Path]],
+    top: str,
+    options: Union[CompileOptions, None] = None,
+) -> tuple[Circuit, Blueprint, CompileReport]:
+    """
+    Synthesizes `top` module from `files`, places blocks and returns circuit
+    (which can be simulated or inspected with `Circuit.timing`), blueprint
+    (which can be saved later or serialized with `Blueprint.to_json`) and
+    report. Default options are used if `options` is not given.
+    """
+
+    if options is None:
+        options = CompileOptions()
+
+    stages_times: dict[str, float] = {}
+    stage_start = time.perf_counter()
+
+    def end_stage(name: str):
+        nonlocal stage_start
+
+        now = time.perf_counter()
+        stages_times[name] = now - stage_start
+        stage_start = now
+
+    cells = generate_cells(options.cell_max_inputs)
+    name = options.name if options.name is not None else top
+    blueprint_path = None
+
+    if options.blueprints_path is not None:
+        blueprint_path = options.blueprints_path / name
+
+        blueprint_path.mkdir(parents=True, exist_ok=True)
+
+    yosys_output = compile(
+        top,
+        [str(file) for file in files],
+        cells,
+        None,
+        blueprint_path,
+        options.cache,
+        options.hierarchical,
+        parameters=options.parameters,
+    )
+
+    end_stage("synthesis")
+
+    circuit = Circuit.from_yosys_output(cells, yosys_output, top, options.optimize)
+
+    del yosys_output
+
+    end_stage("circuit")
+
+    blueprint: Blueprint = BlockPlacer.place(circuit, options.placement)
+
+    blueprint.name = name
+    blueprint.minify = options.minify
+    blueprint.body_size = options.body_size
+    blueprint.reproducible = options.reproducible
+
+    end_stage("placement")
+
+    saved_blueprint_path = None
+
+    if blueprint_path is not None:
+        saved_blueprint_path = blueprint.save(blueprint_path)
+
+        end_stage("saving")
+
+    blocks_count: dict[str, int] = {}
+
+    for block in blueprint.blocks:
+        shape_name = ShapeId(block.shape_id).name
+
+        blocks_count[shape_name] = blocks_count.get(shape_name, 0) + 1
+
+    report = CompileReport(
+        circuit.output_ready_time,
+        blocks_count,
+        len(blueprint.blocks),
+        stages_times,
+        saved_blueprint_path,
+    )
+
+    return circuit, blueprint, report
@@ -0,0 +1,212 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Any, Union
+import argparse
+import json
+import os
+import sys
+import time
+import tomllib
+
+from .build import (
+    BuildSummary,
+    blueprint_name,
+    build,
+    create_argument_parser,
+    positive_int,
+)
+
+
+def load_manifest(path: Path) -> list[list[str]]:
+    """
+    Returns command line arguments of every build in TOML or JSON manifest.
+    Manifest is a list of builds or a table with `build` list and `defaults`
+    which are applied to every build. Keys of build are names of command line
+    options with "_" instead of "-", `files` is a list of source files and
+    `parameters` is a table of top module parameters.
+    """
+
+    text = path.read_text()
+    data = tomllib.loads(text) if path.suffix == ".toml" else json.loads(text)
+
+    if isinstance(data, list):
+        data = {"build": data}
+
+    defaults = data.get("defaults", {})
+
+    return [_build_arguments(defaults | options) for options in data["build"]]
+
+
+def _build_arguments(options: dict[str, Any]) -> list[str]:
+    result: list[str] = []
+    files: list[str] = []
+
+    for key, value in options.items():
+        option = f"--{key.replace('_', '-')}"
+
+        match key, value:
+            case "files", _:
+                files = [str(file) for file in value]
+            case "parameters", _:
+                for name, parameter_value in value.items():
+                    result += ["--parameter", f"{name}={parameter_value}"]
+            case _, True:
+                result.append(option)
+            case _, False:
+                pass
+            case _:
+                result += [option, str(value)]
+
+    return result + ["--", *files]
+
+
+def _run_build(args: argparse.Namespace, log_path: Path) -> tuple[BuildSummary, float]:
+    """
+    Runs build in worker process, output of build is written to `log_path`.
+    """
+
+    start = time.perf_counter()
+
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with log_path.open("w") as log, redirect_stdout(log):
+        summary = build(args)
+
+    return summary, time.perf_counter() - start
+
+
+def _format_table(rows: list[list[str]]) -> str:
+    """
+    Aligns first two columns (names) to the left and other ones to the right.
+    """
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+
+    return "\n".join(
+        "  ".join(
+            cell.ljust(width) if i < 2 else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        ).rstrip()
+        for row in rows
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="create_blueprint.batch",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+
+    parser.add_argument("manifest", help="TOML or JSON manifest", type=Path)
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="count of builds run at the same time",
+        type=positive_int,
+        default=os.cpu_count(),
+    )
+    parser.add_argument(
+        "--summary",
+        help="path to a file to which summary table is written",
+        type=Path,
+    )
+
+    args = parser.parse_args()
+
+    build_parser = create_argument_parser()
+    builds: list[argparse.Namespace] = []
+    blueprint_paths: set[Path] = set()
+
+    for arguments in load_manifest(args.manifest):
+        build_args = build_parser.parse_args(arguments)
+        name = blueprint_name(build_args)
+        blueprint_path = (build_args.blueprints_path / name).resolve()
+
+        if blueprint_path in blueprint_paths:
+            parser.error(f'blueprint "{name}" is built more than once')
+
+        blueprint_paths.add(blueprint_path)
+        builds.append(build_args)
+
+    results: list[Union[tuple[BuildSummary, float], BaseException]] = []
+
+    with ProcessPoolExecutor(args.jobs) as executor:
+        futures: list[Future[tuple[BuildSummary, float]]] = []
+
+        for build_args in builds:
+            log_path = (
+                build_args.blueprints_path / blueprint_name(build_args) / "build.log"
+            )
+
+            futures.append(executor.submit(_run_build, build_args, log_path))
+
+        for i, (build_args, future) in enumerate(zip(builds, futures)):
+            name = blueprint_name(build_args)
+
+            try:
+                summary, build_time = future.result()
+            except Exception as error:
+                results.append(error)
+
+                print(f"[{i + 1}/{len(builds)}] {name} failed: {error}")
+            else:
+                results.append((summary, build_time))
+
+                print(
+                    f"[{i + 1}/{len(builds)}] {name}: {summary.delay} ticks, "
+                    f"{summary.total_blocks_count} blocks ({build_time:.1f}s)"
+                )
+
+    shape_names = sorted(
+        {
+            shape_name
+            for result in results
+            if not isinstance(result, BaseException)
+            for shape_name in result[0].blocks_count
+        }
+    )
+    rows = [["name", "top", "delay", *shape_names, "total", "time"]]
+
+    for build_args, result in zip(builds, results):
+        if isinstance(result, BaseException):
+            rows.append(
+                [
+                    blueprint_name(build_args),
+                    build_args.top,
+                    "failed",
+                    *([""] * (len(shape_names) + 2)),
+                ]
+            )
+
+            continue
+
+        summary, build_time = result
+
+        rows.append(
+            [
+                summary.name,
+                summary.top,
+                str(summary.delay),
+                *(
+                    str(summary.blocks_count.get(shape_name, 0))
+                    for shape_name in shape_names
+                ),
+                str(summary.total_blocks_count),
+                f"{build_time:.1f}s",
+            ]
+        )
+
+    table = _format_table(rows)
+
+    print(f"\n{table}")
+
+    if args.summary is not None:
+        args.summary.write_text(table + "\n")
+
+    if any(isinstance(result, BaseException) for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
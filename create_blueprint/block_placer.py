@@ -16,6 +16,7 @@ from .shape_id import ShapeId
 from .color_generator import Color, ColorGenerator
 from .blueprint import Blueprint
 from .circuit import Circuit
+from .netlist import Netlist
 
 
 @dataclass
@@ -27,35 +28,53 @@ class BlockPlacerOptions:
 
 
 class BlockPlacer:
-    _circuit: Circuit
+    _circuit: Union[Circuit, Netlist]
     _blueprint: Blueprint
     _options: BlockPlacerOptions
     _height: int
-    _middle_gates_offset: int
-    _one_middle_logic_placed: bool
+    # Columns of middle logic which already have concrete block under them.
+    _middle_columns: set[tuple[int, int]]
 
     def __init__(
-        self, circuit: Circuit, blueprint: Blueprint, options: BlockPlacerOptions
+        self,
+        circuit: Union[Circuit, Netlist],
+        blueprint: Blueprint,
+        options: BlockPlacerOptions,
     ) -> None:
         super().__init__()
 
         self._circuit = circuit
         self._blueprint = blueprint
         self._options = options
-        self._middle_gates_offset = 0
-        self._one_middle_logic_placed = False
+        self._middle_columns = set()
+        self.height = self.middle_logic_height(circuit, options)
 
-        if options.auto_height:
-            self.height = int(len(circuit.middle_logic) ** 0.5)
+    @staticmethod
+    def middle_logic_height(
+        circuit: Union[Circuit, Netlist], options: BlockPlacerOptions
+    ) -> int:
+        if options.height is not None:
+            return options.height
+        elif options.auto_height:
+            return int(len(circuit.middle_logic) ** 0.5)
         elif options.cubic:
-            self.height = int(len(circuit.middle_logic) ** (1 / 3))
-        elif options.height is not None:
-            self.height = options.height
+            return int(len(circuit.middle_logic) ** (1 / 3))
         else:
-            self.height = 1
+            return 1
 
     @classmethod
-    def place(cls, circuit: Circuit, options: BlockPlacerOptions) -> Blueprint:
+    def place(
+        cls,
+        circuit: Union[Circuit, Netlist],
+        options: BlockPlacerOptions,
+        slots: Union[dict[LogicId, int], None] = None,
+    ) -> Blueprint:
+        """
+        Places ports and middle logic. Middle logic is placed to consecutive
+        slots (or to one slot if `options.compact` is set) unless `slots` of
+        every middle logic are given.
+        """
+
         placer = cls(circuit, Blueprint(), options)
 
         color_generator = ColorGenerator()
@@ -110,29 +129,33 @@ class BlockPlacer:
             if output.override_x is None:
                 output_gates_offset += port_width
 
-        for logic in circuit.middle_logic.values():
-            placer._place_middle_logic(logic)
+        for i, logic in enumerate(circuit.middle_logic.values()):
+            if slots is not None:
+                slot = slots[logic.id]
+            elif options.compact:
+                slot = 0
+            else:
+                slot = i
+
+            placer._place_middle_logic(logic, slot)
 
         return placer._blueprint
 
-    def _place_middle_logic(self, logic: Logic):
+    def _place_middle_logic(self, logic: Logic, slot: int):
         layer_offset = 0
 
         if self._options.cubic:
-            layer_offset = self._middle_gates_offset // (self.height**2)
+            layer_offset = slot // (self.height**2)
 
-        middle_gates_offset_in_layer = (
-            self._middle_gates_offset - layer_offset * self.height**2
-        )
+        slot_in_layer = slot - layer_offset * self.height**2
 
-        x = middle_gates_offset_in_layer // self.height
+        x = slot_in_layer // self.height
         y = 2 + layer_offset
-        z = middle_gates_offset_in_layer % self.height + 1
+        z = slot_in_layer % self.height + 1
+
+        if (x, y) not in self._middle_columns:
+            self._middle_columns.add((x, y))
 
-        if (
-            not (self._one_middle_logic_placed and self._options.compact)
-            and middle_gates_offset_in_layer % self.height == 0
-        ):
             self._blueprint.create_solid(ShapeId.Concrete, x, y, 0)
 
         if isinstance(logic, Gate):
@@ -140,11 +163,6 @@ class BlockPlacer:
         elif isinstance(logic, Timer):
             self._blueprint.create_timer(logic, x, y, z)
 
-        if not self._options.compact:
-            self._middle_gates_offset += 1
-
-        self._one_middle_logic_placed = True
-
     def _create_attachment(
         self,
         gate_id: LogicId,
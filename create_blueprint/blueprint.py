@@ -1,30 +1,109 @@
+from collections.abc import Iterator
+from functools import cache
+from hashlib import file_digest, sha256
+from io import StringIO
 from pathlib import Path
-from typing import Any, Union
-from uuid import UUID, uuid4
+from typing import TYPE_CHECKING, TextIO, Union
+from uuid import UUID, uuid4, uuid5
 import json
-from PIL import Image, ImageDraw, ImageFont
+import os
+import shutil
 from datetime import datetime
 
 from .port import AttachmentRotation, GateRotation
 from .logic import LogicId
-from .timer import Timer
+from .timer import MAX_TIMER_TICKS, Timer
 from .gate import Gate
 from .shape_id import ShapeId
+from .utils import RESOURCES_PATH, open_atomically
+
+if TYPE_CHECKING:
+    from PIL import Image, ImageFont
 
 _DEFAULT_COLOR = "222222"
+# Count of blocks serialized before they are written to file.
+_WRITE_BATCH_SIZE = 1024
+# Namespace of UUIDs of reproducible blueprints.
+_UUID_NAMESPACE = UUID("55535efc-5c2d-4dac-87a3-697cba00ed59")
+
+
+class Block:
+    """
+    Block of blueprint. Only values which differ between blocks are stored,
+    everything else is added by `Blueprint.write_json`. `id` and
+    `controllers` (IDs of connected logic) are set for interactable blocks,
+    `value` is mode of gate or ticks of timer.
+    """
+
+    __slots__ = (
+        "shape_id",
+        "x",
+        "y",
+        "z",
+        "xaxis",
+        "zaxis",
+        "color",
+        "id",
+        "controllers",
+        "value",
+    )
+
+    shape_id: str
+    x: int
+    y: int
+    z: int
+    xaxis: int
+    zaxis: int
+    color: str
+    id: Union[LogicId, None]
+    controllers: tuple[LogicId, ...]
+    value: int
+
+    def __init__(
+        self,
+        shape_id: str,
+        x: int,
+        y: int,
+        z: int,
+        xaxis: int,
+        zaxis: int,
+        color: str,
+        id: Union[LogicId, None] = None,
+        controllers: tuple[LogicId, ...] = (),
+        value: int = 0,
+    ) -> None:
+        self.shape_id = shape_id
+        self.x = x
+        self.y = y
+        self.z = z
+        self.xaxis = xaxis
+        self.zaxis = zaxis
+        self.color = color
+        self.id = id
+        self.controllers = controllers
+        self.value = value
 
 
 class Blueprint:
     uuid: UUID
     name: str
     description: str
-    blocks: list[dict[str, Any]]
+    blocks: list[Block]
+    # Write smaller `blueprint.json`, see `write_json`.
+    minify: bool
+    # Maximum count of blocks in one body, all blocks are in one body if None.
+    body_size: Union[int, None]
+    # Save same files for same blueprint, see `save`.
+    reproducible: bool
 
     def __init__(self):
         self.uuid = uuid4()
         self.name = ""
         self.description = ""
         self.blocks = []
+        self.minify = False
+        self.body_size = None
+        self.reproducible = False
 
     def create_solid(
         self,
@@ -37,16 +116,7 @@ class Blueprint:
         if color is None:
             color = _DEFAULT_COLOR
 
-        block = {
-            "bounds": {"x": 1, "y": 1, "z": 1},
-            "pos": {"x": x, "y": y, "z": z},
-            "shapeId": shape_id,
-            "xaxis": 1,
-            "zaxis": 3,
-            "color": color,
-        }
-
-        self.blocks.append(block)
+        self.blocks.append(Block(shape_id, x, y, z, 1, 3, color))
 
     def create_sensor(
         self,
@@ -73,25 +143,9 @@ class Blueprint:
         if color is None:
             color = _DEFAULT_COLOR
 
-        block = {
-            "controller": {
-                "audioEnabled": False,
-                "buttonMode": True,
-                "colorMode": True,
-                "color": "EEEEEE",
-                "range": 1,
-                "id": id,
-                "controllers": [{"id": gate_id}],
-                "joints": None,
-            },
-            "pos": {"x": x, "y": y, "z": z},
-            "shapeId": ShapeId.Sensor,
-            "xaxis": xaxis,
-            "zaxis": zaxis,
-            "color": color,
-        }
-
-        self.blocks.append(block)
+        self.blocks.append(
+            Block(ShapeId.Sensor, x, y, z, xaxis, zaxis, color, id, (gate_id,))
+        )
 
     def create_switch(
         self,
@@ -117,21 +171,9 @@ class Blueprint:
         if color is None:
             color = _DEFAULT_COLOR
 
-        block = {
-            "controller": {
-                "active": False,
-                "id": id,
-                "controllers": [{"id": gate_id}],
-                "joints": None,
-            },
-            "pos": {"x": x, "y": y, "z": z},
-            "shapeId": ShapeId.Switch,
-            "xaxis": xaxis,
-            "zaxis": zaxis,
-            "color": color,
-        }
-
-        self.blocks.append(block)
+        self.blocks.append(
+            Block(ShapeId.Switch, x, y, z, xaxis, zaxis, color, id, (gate_id,))
+        )
 
     def create_timer(
         self,
@@ -141,29 +183,28 @@ class Blueprint:
         z: int,
         color: Union[str, None] = None,
     ):
-        if timer.ticks > 2400:
-            raise ValueError(f"timer.ticks ({timer.ticks}) must be < 2400")
+        if timer.ticks > MAX_TIMER_TICKS:
+            raise ValueError(
+                f"timer.ticks ({timer.ticks}) must be <= {MAX_TIMER_TICKS}"
+            )
 
         if color is None:
             color = _DEFAULT_COLOR
 
-        block = {
-            "pos": {"x": x, "y": y + 1, "z": z},
-            "controller": {
-                "active": False,
-                "id": timer.id,
-                "controllers": [{"id": output.id} for output in timer.outputs],
-                "joints": None,
-                "seconds": timer.ticks // 40,
-                "ticks": timer.ticks % 40,
-            },
-            "shapeId": ShapeId.Timer,
-            "xaxis": 1,
-            "zaxis": -2,
-            "color": color,
-        }
-
-        self.blocks.append(block)
+        self.blocks.append(
+            Block(
+                ShapeId.Timer,
+                x,
+                y + 1,
+                z,
+                1,
+                -2,
+                color,
+                timer.id,
+                tuple(output.id for output in timer.outputs),
+                timer.ticks,
+            )
+        )
 
     def create_gate(
         self,
@@ -192,28 +233,77 @@ class Blueprint:
         if color is None:
             color = _DEFAULT_COLOR
 
-        block = {
-            "pos": {"x": x, "y": y, "z": z},
-            "controller": {
-                "active": False,
-                "id": gate.id,
-                "controllers": [{"id": output.id} for output in gate.outputs],
-                "joints": None,
-                "mode": int(gate.mode),
-            },
-            "shapeId": ShapeId.Gate,
-            "xaxis": xaxis,
-            "zaxis": zaxis,
-            "color": color,
-        }
+        self.blocks.append(
+            Block(
+                ShapeId.Gate,
+                x,
+                y,
+                z,
+                xaxis,
+                zaxis,
+                color,
+                gate.id,
+                tuple(output.id for output in gate.outputs),
+                int(gate.mode),
+            )
+        )
+
+    def save(self, path: Path) -> Path:
+        """
+        Saves blueprint to `uuid` directory in `path` and returns it.
 
-        self.blocks.append(block)
+        If `reproducible` is set, `uuid` is derived from name, description and
+        `blueprint.json` and icon has no time, so unchanged blueprint is saved
+        to the same directory with the same files. Blueprint is written to
+        temporary directory which is then renamed, so existing directory is
+        always complete and is kept as is.
+        """
 
-    def save(self, path: Path):
-        path /= str(self.uuid)
+        if not self.reproducible:
+            blueprint_path = path / str(self.uuid)
 
-        path.mkdir(parents=True)
+            blueprint_path.mkdir(parents=True)
 
+            self._write_description(blueprint_path)
+
+            with (blueprint_path / "blueprint.json").open("w") as file:
+                self.write_json(file)
+
+            _create_blueprint_icon(self.name, True).save(blueprint_path / "icon.png")
+
+            return blueprint_path
+
+        temp_path = path / f".blueprint-{uuid4()}"
+
+        temp_path.mkdir(parents=True)
+
+        try:
+            with (temp_path / "blueprint.json").open("w") as file:
+                self.write_json(file)
+
+            with (temp_path / "blueprint.json").open("rb") as file:
+                blueprint_json_hash = file_digest(file, sha256).hexdigest()
+
+            content_hash = sha256(
+                json.dumps([self.name, self.description, blueprint_json_hash]).encode()
+            ).hexdigest()
+
+            self.uuid = uuid5(_UUID_NAMESPACE, content_hash)
+
+            self._write_description(temp_path)
+
+            _create_blueprint_icon(self.name, False).save(temp_path / "icon.png")
+
+            blueprint_path = path / str(self.uuid)
+
+            if not blueprint_path.exists():
+                os.rename(temp_path, blueprint_path)
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+        return blueprint_path
+
+    def _write_description(self, path: Path):
         (path / "description.json").write_text(
             json.dumps(
                 {
@@ -227,19 +317,161 @@ class Blueprint:
                 separators=(",", " : "),
             )
         )
-        (path / "blueprint.json").write_text(
-            json.dumps(
-                {"bodies": [{"childs": self.blocks}], "version": 4},
-                separators=(",", ":"),
-            )
+
+    def hot_swap(self, path: Path):
+        """
+        Replaces `blueprint.json` of existing blueprint in `path` directory, so
+        game can reload it without restart. `description.json` and icon of
+        existing blueprint are kept. File is replaced atomically, so game never
+        reads partially written blueprint.
+        """
+
+        with open_atomically(path / "blueprint.json") as file:
+            self.write_json(file)
+
+    def to_json(self) -> str:
+        output = StringIO()
+
+        self.write_json(output)
+
+        return output.getvalue()
+
+    def write_json(self, file: TextIO):
+        """
+        Writes `blueprint.json` to `file` in batches of blocks, so JSON of
+        whole blueprint is never held in memory. Output is the same as of
+        `json.dumps` with compact separators.
+
+        If `minify` is set, fields which game doesn't need are omitted (`joints`,
+        empty `controllers` and default color, so such blocks get default
+        color of their shape in game) and IDs are renumbered densely in order
+        of blocks. If `body_size` is set, blocks are split into bodies of at
+        most `body_size` blocks.
+        """
+
+        ids = None
+
+        if self.minify:
+            ids = {}
+
+            for block in self.blocks:
+                if block.id is not None:
+                    ids[block.id] = len(ids)
+
+        body_size = self.body_size or max(len(self.blocks), 1)
+
+        file.write('{"bodies":[')
+
+        batch: list[str] = []
+
+        for i, block_json in enumerate(_blocks_json(self.blocks, ids)):
+            if i == 0:
+                batch.append('{"childs":[')
+            elif i % body_size == 0:
+                batch.append(']},{"childs":[')
+            else:
+                batch.append(",")
+
+            batch.append(block_json)
+
+            if len(batch) >= _WRITE_BATCH_SIZE:
+                file.write("".join(batch))
+
+                batch.clear()
+
+        if len(self.blocks) == 0:
+            batch.append('{"childs":[')
+
+        batch.append(']}],"version":4}')
+
+        file.write("".join(batch))
+
+
+def _blocks_json(
+    blocks: list[Block], ids: Union[dict[LogicId, int], None]
+) -> Iterator[str]:
+    """
+    Serializes blocks, minified with `ids` as new IDs if `ids` is given.
+    """
+
+    for block in blocks:
+        pos = f'"pos":{{"x":{block.x},"y":{block.y},"z":{block.z}}}'
+        rest = (
+            f'"shapeId":{_json_string(block.shape_id)},"xaxis":{block.xaxis},'
+            f'"zaxis":{block.zaxis}'
         )
-        _create_blueprint_icon(self.name).save(path / "icon.png")
 
+        if ids is None or block.color != _DEFAULT_COLOR:
+            rest += f',"color":{_json_string(block.color)}'
+
+        rest += "}"
+
+        if block.id is None:
+            yield f'{{"bounds":{{"x":1,"y":1,"z":1}},{pos},{rest}'
+
+            continue
+
+        if ids is None:
+            controllers = ",".join(f'{{"id":{id}}}' for id in block.controllers)
+            controller = f'"id":{block.id},"controllers":[{controllers}],"joints":null'
+        else:
+            controller = f'"id":{ids[block.id]}'
+
+            if len(block.controllers) != 0:
+                controllers = ",".join(
+                    f'{{"id":{ids[id]}}}' for id in block.controllers
+                )
+                controller += f',"controllers":[{controllers}]'
+
+        # Keys are in the same order as in blueprints saved by game.
+        match block.shape_id:
+            case ShapeId.Sensor:
+                yield (
+                    '{"controller":{"audioEnabled":false,"buttonMode":true,'
+                    f'"colorMode":true,"color":"EEEEEE","range":1,{controller}}},'
+                    f"{pos},{rest}"
+                )
+            case ShapeId.Switch:
+                yield f'{{"controller":{{"active":false,{controller}}},{pos},{rest}'
+            case ShapeId.Timer:
+                yield (
+                    f'{{{pos},"controller":{{"active":false,{controller},'
+                    f'"seconds":{block.value // 40},"ticks":{block.value % 40}}},'
+                    f"{rest}"
+                )
+            case ShapeId.Gate:
+                yield (
+                    f'{{{pos},"controller":{{"active":false,{controller},'
+                    f'"mode":{block.value}}},{rest}'
+                )
+            case _:
+                raise ValueError(f'block with shape "{block.shape_id}" can\'t have id')
+
+
+@cache
+def _json_string(s: str) -> str:
+    return json.dumps(s)
+
+
+@cache
+def icon_font() -> "ImageFont.FreeTypeFont":
+    """
+    Font of blueprint icon, loaded once. PIL is imported only when the first
+    icon is drawn.
+    """
+
+    from PIL import ImageFont
+
+    FONT_SIZE = 60
+
+    return ImageFont.truetype(RESOURCES_PATH / "Hack" / "Hack-Regular.ttf", FONT_SIZE)
+
+
+def _create_blueprint_icon(name: str, time: bool) -> "Image.Image":
+    from PIL import Image, ImageDraw
 
-def _create_blueprint_icon(name: str) -> Image.Image:
     LINE_LENGTH = 7
     LINES_COUNT = 4
-    FONT_SIZE = 60
 
     multiline_name = []
 
@@ -254,14 +486,15 @@ def _create_blueprint_icon(name: str) -> Image.Image:
     while len(multiline_name) < LINES_COUNT - 1:
         multiline_name.append(" " * LINE_LENGTH)
 
-    multiline_name.append(" " * (LINE_LENGTH - 5) + datetime.now().strftime("%H:%M"))
+    if time:
+        multiline_name.append(
+            " " * (LINE_LENGTH - 5) + datetime.now().strftime("%H:%M")
+        )
 
     icon = Image.new("RGB", (256, 256))
     draw = ImageDraw.Draw(icon)
-    font = ImageFont.truetype("resources/Hack/Hack-Regular.ttf", FONT_SIZE)
-
     draw.multiline_text(
-        (0, 0), "\n".join(multiline_name), fill=(255, 255, 255), font=font
+        (0, 0), "\n".join(multiline_name), fill=(255, 255, 255), font=icon_font()
     )
 
     return icon
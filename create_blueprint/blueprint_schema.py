@@ -0,0 +1,135 @@
+"""
+Checks `blueprint.json` against `resources/blueprint_schema.json`. Only the
+subset of JSON Schema which is used by that file is supported, so no
+dependency is needed.
+"""
+
+from functools import cache
+from typing import Any
+import json
+import re
+
+from .utils import RESOURCES_PATH
+
+_SCHEMA_PATH = RESOURCES_PATH / "blueprint_schema.json"
+
+_TYPES: dict[str, type] = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+@cache
+def blueprint_schema() -> dict[str, Any]:
+    return json.loads(_SCHEMA_PATH.read_text())
+
+
+def validate_blueprint(blueprint: Any):
+    """
+    Raises ValueError if parsed `blueprint.json` doesn't match schema, if IDs
+    of blocks are not unique or if block is connected to missing ID.
+    """
+
+    schema = blueprint_schema()
+
+    _validate(blueprint, schema, schema, "blueprint")
+
+    controllers = [
+        block["controller"]
+        for body in blueprint["bodies"]
+        for block in body["childs"]
+        if "controller" in block
+    ]
+    ids: set[int] = set()
+
+    for controller in controllers:
+        if controller["id"] in ids:
+            raise ValueError(f'ID {controller["id"]} is used more than once')
+
+        ids.add(controller["id"])
+
+    for controller in controllers:
+        for connection in controller.get("controllers") or []:
+            if connection["id"] not in ids:
+                raise ValueError(
+                    f'ID {controller["id"]} is connected to missing ID {connection["id"]}'
+                )
+
+
+def _validate(value: Any, schema: dict[str, Any], root: dict[str, Any], path: str):
+    if "$ref" in schema:
+        name = schema["$ref"].removeprefix("#/$defs/")
+
+        _validate(value, root["$defs"][name], root, path)
+
+        return
+
+    if "anyOf" in schema:
+        errors: list[ValueError] = []
+
+        for option in schema["anyOf"]:
+            try:
+                _validate(value, option, root, path)
+            except ValueError as error:
+                errors.append(error)
+
+                continue
+
+            return
+
+        # Error of schema which matched deepest is the most useful one.
+        raise max(errors, key=lambda error: len(str(error).partition(" ")[0]))
+
+    if "type" in schema:
+        types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+
+        if not any(_has_type(value, type) for type in types):
+            raise ValueError(f'"{path}" must be {" or ".join(types)}')
+
+    if "const" in schema and value != schema["const"]:
+        raise ValueError(f'"{path}" must be {json.dumps(schema["const"])}')
+
+    if "enum" in schema and value not in schema["enum"]:
+        raise ValueError(f'"{path}" must be one of {json.dumps(schema["enum"])}')
+
+    if "minimum" in schema and value < schema["minimum"]:
+        raise ValueError(f'"{path}" must be >= {schema["minimum"]}')
+
+    if "maximum" in schema and value > schema["maximum"]:
+        raise ValueError(f'"{path}" must be <= {schema["maximum"]}')
+
+    if "pattern" in schema and re.search(schema["pattern"], value) is None:
+        raise ValueError(f'"{path}" must match "{schema["pattern"]}"')
+
+    if isinstance(value, dict):
+        for key in schema.get("required", []):
+            if key not in value:
+                raise ValueError(f'"{path}" must have "{key}"')
+
+        properties = schema.get("properties", {})
+
+        for key, item in value.items():
+            if key in properties:
+                _validate(item, properties[key], root, f"{path}.{key}")
+            elif schema.get("additionalProperties", True) is False:
+                raise ValueError(f'"{path}" must not have "{key}"')
+
+    if isinstance(value, list):
+        if len(value) < schema.get("minItems", 0):
+            raise ValueError(f'"{path}" must have at least {schema["minItems"]} items')
+
+        if "items" in schema:
+            for i, item in enumerate(value):
+                _validate(item, schema["items"], root, f"{path}[{i}]")
+
+
+def _has_type(value: Any, type: str) -> bool:
+    # bool is subclass of int, but JSON booleans are not integers.
+    if type == "integer" and isinstance(value, bool):
+        return False
+
+    return isinstance(value, _TYPES[type])
@@ -3,5 +3,7 @@ from .gate import Gate, GateMode
 
 
 class BufferGate(Gate):
+    __slots__ = ()
+
     def __init__(self, id: LogicId) -> None:
         super().__init__(id, GateMode.AND)
@@ -0,0 +1,589 @@
+from dataclasses import dataclass
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+from .block_placer import BlockPlacer, BlockPlacerOptions
+from .cell import generate_cells
+from .blueprint import Blueprint
+from .build_graph import BuildGraph
+from .circuit import Circuit
+from .netlist import Netlist
+from .patch import PatchState, diff_blueprints
+from .synthesis_cache import SynthesisCache, included_files
+from .utils import write_text_atomically
+from .yosys import build_graph_key, compile
+
+# Seconds between checks of watched files.
+_WATCH_INTERVAL = 0.1
+# Seconds without changes of watched files after which build is started.
+_WATCH_DEBOUNCE = 0.3
+
+
+def positive_int(s: str) -> int:
+    i = int(s)
+
+    if i <= 0:
+        raise ValueError(f'"{i}" must be > 0')
+
+    return i
+
+
+def blueprint_directory(s: str) -> Path:
+    path = Path(s)
+
+    if not (path / "description.json").is_file():
+        raise ValueError(f'"{path}" is not a blueprint directory')
+
+    return path
+
+
+def existing_path(s: str) -> Path:
+    path = Path(s)
+
+    if not path.exists():
+        raise ValueError(f'"{path}" does not exist')
+
+    return path
+
+
+def parameter(s: str) -> tuple[str, str]:
+    name, separator, value = s.partition("=")
+
+    if separator == "" or name == "" or value == "":
+        raise ValueError(f'"{s}" must be NAME=VALUE')
+
+    return name, value
+
+
+def default_cache_path() -> Path:
+    return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "sm-verilog"
+
+
+@dataclass
+class BuildSummary:
+    name: str
+    top: str
+    delay: int
+    blocks_count: dict[str, int]
+    total_blocks_count: int
+    blueprint_path: Path
+    # Seconds spent in each stage of build.
+    stages_times: dict[str, float]
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="create_blueprint",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+
+    parser.add_argument(
+        "files",
+        metavar="file",
+        help="SystemVerilog file to be compiled",
+        nargs="+",
+        type=existing_path,
+    )
+    parser.add_argument(
+        "-m",
+        "--module-flowchart",
+        help="generate module flowchart",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-g",
+        "--gates-flowchart",
+        help="generate gates flowchart",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-t",
+        "--top",
+        help="specify top module name",
+        required=True,
+    )
+    parser.add_argument(
+        "-p",
+        "--parameter",
+        help="override parameter of top module, value is Verilog constant",
+        metavar="NAME=VALUE",
+        type=parameter,
+        action="append",
+        default=[],
+    )
+    parser.add_argument(
+        "-n",
+        "--name",
+        help="name of blueprint and of its directory (default: top module name)",
+    )
+    parser.add_argument(
+        "-i",
+        "--cell-max-inputs",
+        help="use gates with less or equal count of inputs",
+        type=int,
+        default=10,
+    )
+    parser.add_argument(
+        "--timing-report",
+        help="print critical path and slack histogram",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--no-optimize",
+        help="disable constant propagation, structural hashing, wide gates collapsing, inverter absorption and dead logic removal",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--hierarchical",
+        help="don't flatten design, synthesize each unique module once and copy it for every instance",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--incremental",
+        help="synthesize only modules which source files changed since previous build (implies --hierarchical)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--watch",
+        help="rebuild blueprint when source files change (implies --incremental)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--hot-swap",
+        help="replace blueprint.json of existing blueprint in this directory instead of creating new blueprint",
+        metavar="BLUEPRINT_PATH",
+        type=blueprint_directory,
+    )
+    parser.add_argument(
+        "--minify",
+        help="omit fields of blueprint.json which game doesn't need and renumber IDs densely (blocks with default color get default color of their shape)",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--body-size",
+        help="split blocks into bodies of at most this count of blocks",
+        metavar="BLOCKS",
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--reproducible",
+        help="derive blueprint UUID from its content and don't put time on icon, so unchanged blueprint is saved to the same directory with the same files",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--patch",
+        help="keep IDs and positions of logic which didn't change since previous build with --patch and replace previous blueprint in place, changed blocks are written to blueprint.patch.json",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--cache-path",
+        help="path to a directory in which yosys outputs are cached",
+        type=Path,
+        default=default_cache_path(),
+    )
+    parser.add_argument(
+        "--cache-size",
+        help="maximum size of cached yosys outputs in megabytes",
+        type=positive_int,
+        default=256,
+    )
+    parser.add_argument(
+        "--no-cache",
+        help="always run yosys, even if its output is cached",
+        action="store_true",
+    )
+    parser.add_argument(
+        "-b",
+        "--blueprints-path",
+        help="path to a directory in which blueprints will be stored",
+        type=Path,
+        default="./blueprints/",
+    )
+
+    block_placer_arguments_parser = parser.add_mutually_exclusive_group(required=True)
+    block_placer_arguments_parser.add_argument(
+        "--height",
+        help="height of middle gates layer",
+        type=positive_int,
+    )
+    block_placer_arguments_parser.add_argument(
+        "--auto-height",
+        help="automatically calculate middle gates layer height to make it look like square",
+        action="store_true",
+    )
+    block_placer_arguments_parser.add_argument(
+        "-c",
+        "--compact",
+        help="compact middle gates layer to one block",
+        action="store_true",
+    )
+    block_placer_arguments_parser.add_argument(
+        "--cubic",
+        help="give middle gates layer shape of cube",
+        action="store_true",
+    )
+
+    return parser
+
+
+def blueprint_name(args: argparse.Namespace) -> str:
+    return args.name if args.name is not None else args.top
+
+
+def run(args: argparse.Namespace):
+    """
+    Builds blueprint with options parsed by `create_argument_parser` once or,
+    with `--watch`, every time source files change.
+    """
+
+    if args.watch:
+        watch(args)
+    else:
+        build(args)
+
+
+def build(args: argparse.Namespace) -> BuildSummary:
+    """
+    Builds blueprint with options parsed by `create_argument_parser`.
+    """
+
+    stages_times: dict[str, float] = {}
+    stage_start = time.perf_counter()
+
+    def end_stage(name: str):
+        nonlocal stage_start
+
+        now = time.perf_counter()
+        stages_times[name] = now - stage_start
+        stage_start = now
+
+    if args.patch and (args.minify or args.reproducible):
+        raise ValueError("--patch can't be used with --minify or --reproducible")
+
+    CELLS = generate_cells(args.cell_max_inputs)
+
+    name = blueprint_name(args)
+    parameters = dict(args.parameter)
+    blueprint_path = args.blueprints_path / name
+
+    blueprint_path.mkdir(parents=True, exist_ok=True)
+
+    module_flowchart_prefix = None
+
+    if args.module_flowchart:
+        module_flowchart_prefix = blueprint_path / f"module"
+
+    cache = None
+
+    if not args.no_cache:
+        cache = SynthesisCache(args.cache_path, args.cache_size * 1024 * 1024)
+
+    build_graph = None
+    reused_modules: set[str] = set()
+
+    if args.incremental or args.watch:
+        build_graph = BuildGraph.load(
+            blueprint_path / "build_graph.json",
+            build_graph_key(args.top, args.files, CELLS, parameters),
+        )
+
+        # Flowchart of blackbox modules would be empty.
+        if not args.module_flowchart:
+            reused_modules = build_graph.reusable_modules()
+
+    while True:
+        statistics: list[str] = []
+        yosys_output = compile(
+            args.top,
+            args.files,
+            CELLS,
+            module_flowchart_prefix,
+            blueprint_path,
+            cache,
+            args.hierarchical or args.incremental or args.watch,
+            sorted(reused_modules),
+            parameters,
+            statistics,
+        )
+
+        if build_graph is None:
+            break
+
+        stale_modules = build_graph.link(yosys_output, reused_modules)
+
+        if len(stale_modules) == 0:
+            reused_modules &= yosys_output["modules"].keys()
+
+            build_graph.save()
+
+            break
+
+        reused_modules -= stale_modules
+
+    if cache is not None:
+        for path in cache.hits:
+            print(f'Using cached yosys output "{path}"')
+
+    if len(statistics) != 0:
+        print("\n\n".join(statistics))
+
+    end_stage("synthesis")
+
+    circuit = Circuit.from_yosys_output(
+        CELLS, yosys_output, args.top, not args.no_optimize
+    )
+
+    del yosys_output
+
+    timing_report = None
+
+    if args.timing_report:
+        timing_report = (
+            circuit.timing.critical_path(),
+            circuit.timing.slack_histogram(),
+        )
+
+    delay_blocks_count = circuit.delay_blocks_count
+    optimization_results = circuit.optimization_results
+    netlist = Netlist.from_circuit(circuit)
+
+    del circuit
+
+    end_stage("circuit")
+
+    block_placer_options = BlockPlacerOptions(
+        args.height,
+        args.compact,
+        args.auto_height,
+        args.cubic,
+    )
+
+    patch_state = None
+    # Blueprint directory which is replaced in place.
+    target_blueprint_path = args.hot_swap
+
+    if args.patch:
+        patch_state = PatchState.load(
+            blueprint_path / "patch_state.json", block_placer_options
+        )
+
+        if (
+            target_blueprint_path is None
+            and patch_state.blueprint_path is not None
+            and (patch_state.blueprint_path / "description.json").is_file()
+        ):
+            target_blueprint_path = patch_state.blueprint_path
+
+        blueprint: Blueprint = patch_state.place(netlist, block_placer_options)
+    else:
+        blueprint = BlockPlacer.place(netlist, block_placer_options)
+
+    blueprint.name = name
+    blueprint.minify = args.minify
+    blueprint.body_size = args.body_size
+    blueprint.reproducible = args.reproducible
+
+    end_stage("placement")
+
+    patch_diff = None
+
+    if patch_state is not None and target_blueprint_path is not None:
+        patch_diff = diff_blueprints(target_blueprint_path, blueprint)
+
+        write_text_atomically(
+            blueprint_path / "blueprint.patch.json", json.dumps(patch_diff, indent=1)
+        )
+
+    if target_blueprint_path is not None:
+        blueprint.hot_swap(target_blueprint_path)
+
+        saved_blueprint_path = target_blueprint_path
+    else:
+        saved_blueprint_path = blueprint.save(blueprint_path)
+
+    if patch_state is not None:
+        patch_state.save(saved_blueprint_path)
+
+    print("\n")
+
+    if args.module_flowchart:
+        print(f'Module flowchart is "{module_flowchart_prefix}.dot"\n')
+
+    if args.gates_flowchart:
+        from .graphviz import render_circuit
+
+        path = blueprint_path / "gates.dot"
+        dot = render_circuit(netlist)
+
+        path.write_text(dot)
+
+        print(f'Gates flowchart is "{path}"\n')
+
+    end_stage("saving")
+
+    if build_graph is not None:
+        synthesized_modules = build_graph.modules.keys() - reused_modules
+
+        print("Incremental build:")
+        print(
+            "\treused netlists of modules: "
+            f"{', '.join(sorted(reused_modules)) or 'none'}"
+        )
+        print(
+            "\tsynthesized modules: "
+            f"{', '.join(sorted(synthesized_modules)) or 'none'}"
+        )
+        print("\tcircuit, placement and blueprint were built from scratch\n")
+
+    print(f"Circuit delay is {netlist.output_ready_time} ticks.\n")
+
+    if len(optimization_results) != 0:
+        print("Optimizations:")
+
+        for result in optimization_results:
+            print(
+                f"\t{result.name}: {result.removed_logic_count} logic removed, "
+                f"{result.saved_ticks} ticks saved"
+            )
+
+        print()
+
+    if delay_blocks_count != 0:
+        print(f"Delay lines use {delay_blocks_count} blocks.\n")
+
+    if timing_report is not None:
+        critical_path, slack_histogram = timing_report
+
+        print("Critical path:")
+
+        for entry in critical_path:
+            print(
+                f"\t{entry.id}\t{entry.mode}\tarrival: {entry.arrival}\tready: {entry.ready}"
+            )
+
+        print("\nSlack histogram:")
+
+        for min_slack, max_slack, logic_count in slack_histogram:
+            slack_range = str(min_slack)
+
+            if max_slack != min_slack:
+                slack_range += f"-{max_slack}"
+
+            print(f"\t{slack_range} ticks: {logic_count}")
+
+        print()
+
+    blocks_count = {}
+
+    for block in blueprint.blocks:
+        block_count = blocks_count.get(block.shape_id, 0)
+
+        blocks_count[block.shape_id] = block_count + 1
+
+    print("Blocks count:")
+
+    for shape_id, block_count in sorted(
+        blocks_count.items(), key=lambda item: item[1], reverse=True
+    ):
+        print(f"\t{shape_id.name}: {block_count}")
+
+    print(f"\n\tTotal: {len(blueprint.blocks)}\n")
+
+    if patch_diff is not None:
+        print(
+            f"Patch: {len(patch_diff['added'])} blocks added, "
+            f"{len(patch_diff['removed'])} removed, "
+            f"{len(patch_diff['changed'])} changed, "
+            f"{patch_diff['unchanged_count']} unchanged "
+            f'(see "{blueprint_path / "blueprint.patch.json"}")\n'
+        )
+
+    if target_blueprint_path is not None:
+        print(f'Blueprint "{saved_blueprint_path}" is updated, reload it in game')
+    else:
+        print(f'Your blueprint is "{saved_blueprint_path}"')
+
+    return BuildSummary(
+        name,
+        args.top,
+        netlist.output_ready_time,
+        {shape_id.name: block_count for shape_id, block_count in blocks_count.items()},
+        len(blueprint.blocks),
+        saved_blueprint_path,
+        stages_times,
+    )
+
+
+def watch(args: argparse.Namespace):
+    """
+    Builds blueprint and then builds it again every time source files (or
+    files included by them) change. Changes are collected until files don't
+    change for `_WATCH_DEBOUNCE` seconds, so burst of saves causes one build.
+
+    Without `--hot-swap` rebuilds replace blueprint created by the first
+    build, so stale copies don't pile up in blueprints directory.
+    """
+
+    if args.hot_swap is None and args.reproducible:
+        raise ValueError("--watch can't be used with --reproducible without --hot-swap")
+
+    args = argparse.Namespace(**vars(args))
+
+    while True:
+        start = time.perf_counter()
+
+        try:
+            summary = build(args)
+        except Exception as error:
+            print(f"\nBuild failed: {error}")
+        else:
+            args.hot_swap = summary.blueprint_path
+
+            stages = ", ".join(
+                f"{stage} {stage_time:.2f}s"
+                for stage, stage_time in summary.stages_times.items()
+            )
+
+            print(f"\nBuilt in {time.perf_counter() - start:.2f}s ({stages})")
+
+        print("Waiting for changes of source files...")
+
+        state = _watched_files_state(args.files)
+
+        while _watched_files_state(args.files) == state:
+            time.sleep(_WATCH_INTERVAL)
+
+        while True:
+            time.sleep(_WATCH_DEBOUNCE)
+
+            new_state = _watched_files_state(args.files)
+
+            if new_state == state:
+                break
+
+            state = new_state
+
+        print()
+
+
+def _watched_files_state(files: list[Path]) -> dict[Path, tuple[int, int]]:
+    """
+    Returns modification time and size of source files and files included by
+    them.
+    """
+
+    result: dict[Path, tuple[int, int]] = {}
+
+    for file in files:
+        for path in included_files(file):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+
+            result[path] = (stat.st_mtime_ns, stat.st_size)
+
+    return result
@@ -0,0 +1,141 @@
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Self
+import json
+
+from .synthesis_cache import included_files
+from .utils import write_text_atomically
+
+
+class BuildGraph:
+    """
+    Dependency graph of incremental build: source files of every module of
+    hierarchical design and netlist synthesized from them. Modules which
+    sources didn't change since previous build are not synthesized and their
+    saved netlists are linked into yosys output instead. Every module is
+    synthesized with other modules turned into blackboxes (see
+    `yosys.compile`), so netlists are the same as in clean build.
+    """
+
+    path: Path
+    key: str
+    # Module name to hashes of its source files and its synthesized netlist.
+    modules: dict[str, tuple[dict[str, str], dict[str, Any]]]
+
+    def __init__(self, path: Path, key: str) -> None:
+        self.path = path
+        self.key = key
+        self.modules = {}
+
+    @classmethod
+    def load(cls, path: Path, key: str) -> Self:
+        """
+        Loads graph saved to `path`. Graph is empty if it wasn't saved yet or
+        if it was saved with other `key` (hash of everything affecting
+        synthesis except contents of source files).
+        """
+
+        graph = cls(path, key)
+
+        try:
+            data = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            return graph
+
+        if data.get("key") == key:
+            graph.modules = {
+                name: (module["sources"], module["netlist"])
+                for name, module in data["modules"].items()
+            }
+
+        return graph
+
+    def save(self):
+        data = {
+            "key": self.key,
+            "modules": {
+                name: {"sources": sources, "netlist": netlist}
+                for name, (sources, netlist) in self.modules.items()
+            },
+        }
+
+        write_text_atomically(self.path, json.dumps(data))
+
+    def reusable_modules(self) -> set[str]:
+        hashes: dict[str, str] = {}
+
+        def file_hash(file: str) -> str:
+            if file not in hashes:
+                try:
+                    hashes[file] = sha256(Path(file).read_bytes()).hexdigest()
+                except OSError:
+                    hashes[file] = ""
+
+            return hashes[file]
+
+        return {
+            name
+            for name, (sources, _) in self.modules.items()
+            if len(sources) != 0
+            and all(file_hash(file) == hash for file, hash in sources.items())
+        }
+
+    def link(self, yosys_output: dict[str, Any], reused: set[str]) -> set[str]:
+        """
+        Replaces blackboxes of `reused` modules in `yosys_output` with saved
+        netlists and saves netlists of synthesized modules. Nothing is changed
+        and reused modules which must be synthesized again are returned if
+        ports of modules they instantiate changed.
+        """
+
+        modules = yosys_output["modules"]
+        reused = reused & modules.keys()
+        stale = set()
+
+        for name in reused:
+            for cell in self.modules[name][1]["cells"].values():
+                if cell["type"] not in modules:
+                    continue
+
+                ports = modules[cell["type"]]["ports"]
+                connections = cell["connections"]
+
+                if ports.keys() != connections.keys() or any(
+                    len(port["bits"]) != len(connections[port_name])
+                    for port_name, port in ports.items()
+                ):
+                    stale.add(name)
+
+        if len(stale) != 0:
+            return stale
+
+        for name, module in modules.items():
+            if name in reused:
+                modules[name] = self.modules[name][1]
+            else:
+                self.modules[name] = (_module_sources(module), module)
+
+        for name in self.modules.keys() - modules.keys():
+            del self.modules[name]
+
+        return set()
+
+
+def _module_sources(module: dict[str, Any]) -> dict[str, str]:
+    """
+    Returns hashes of file in which module is defined and files included by
+    it, taken from `src` attribute of module.
+    """
+
+    result: dict[str, str] = {}
+
+    for location in module["attributes"].get("src", "").split("|"):
+        file = location.rpartition(":")[0]
+
+        if file == "":
+            continue
+
+        for path in included_files(Path(file)):
+            result[str(path)] = sha256(path.read_bytes()).hexdigest()
+
+    return result
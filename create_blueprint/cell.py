@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from functools import cache
 
 from .gate import GateMode
 
@@ -25,7 +26,12 @@ def _input_name(i: int) -> str:
     return result[::-1]
 
 
+@cache
 def generate_cells(inputs_count: int) -> dict[str, Cell]:
+    """
+    Result is cached and must not be modified.
+    """
+
     result: dict[str, Cell] = {
         "NAND1": Cell(GateMode.NAND, [_input_name(0)], "Y"),
         "AND1": Cell(GateMode.AND, [_input_name(0)], "Y"),
@@ -1,6 +1,7 @@
-from functools import cached_property
-from typing import Literal, Self, Tuple, Union, cast
-import json
+from dataclasses import dataclass
+from math import ceil
+from io import StringIO
+from typing import Any, Callable, Literal, Self, Tuple, Union, cast
 
 from .buffer_gate import BufferGate
 from .port import (
@@ -14,8 +15,10 @@ from .output_gate import Output, OutputGate
 from .input_gate import Input, InputGate
 from .group_gate import GroupGate
 from .sync_sr_latch_output import SyncSRLatchOutput
-from .timer import Timer
+from .timer import MAX_TIMER_TICKS, Timer
 from .logic import Logic, LogicId
+from .timing import Timing, topological_order
+from .yosys_json import parse_yosys_output
 from .cell import Cell
 from .gate import Gate, GateMode
 from .utils import (
@@ -26,6 +29,55 @@ from .utils import (
 from .id_generator import IdGenerator
 from .net import Net
 
+_MAX_LOGIC_INPUTS_COUNT = 255
+_MAX_LOGIC_OUTPUTS_COUNT = 255
+
+_INVERTED_MODES = {
+    GateMode.AND: GateMode.NAND,
+    GateMode.OR: GateMode.NOR,
+    GateMode.XOR: GateMode.XNOR,
+    GateMode.NAND: GateMode.AND,
+    GateMode.NOR: GateMode.OR,
+    GateMode.XNOR: GateMode.XOR,
+}
+# Gate mode which computes same function when all inputs are inverted.
+_DE_MORGAN_MODES = {
+    GateMode.AND: GateMode.NOR,
+    GateMode.NAND: GateMode.OR,
+    GateMode.OR: GateMode.NAND,
+    GateMode.NOR: GateMode.AND,
+}
+
+
+# Bit of yosys module: net number or constant ("0", "1", "x" or "z").
+_Bit = Union[int, str]
+# Bit of top module or (instance number, bit) for bits of submodules instances.
+_NetKey = Union[_Bit, tuple[int, int]]
+
+
+@dataclass
+class OptimizationResult:
+    name: str
+    removed_logic_count: int
+    saved_ticks: int
+
+
+@dataclass
+class _ModuleTemplate:
+    """
+    Cells of yosys module which are read once and then stamped for every
+    instance of the module. Gate takes one ID and latch takes three IDs from
+    range of instance IDs, in order of `cells`.
+    """
+
+    logic_count: int
+    # Direction and bits of ports.
+    ports: dict[str, tuple[str, list[_Bit]]]
+    # Gate mode (`None` for latch), output bit and input bits (C, S, R for latch).
+    cells: list[tuple[Union[GateMode, None], _Bit, list[_Bit]]]
+    # Type and connections of instances of other modules.
+    instances: list[tuple[str, dict[str, list[_Bit]]]]
+
 
 class Circuit:
     latch_inputs: list[GroupGate]
@@ -35,20 +87,45 @@ class Circuit:
     inputs: dict[str, Input]
     outputs: dict[str, Output]
     id_generator: IdGenerator
+    delay_blocks_count: int
+    optimization_results: list[OptimizationResult]
+    _timing: Union[Timing, None]
+
+    @property
+    def timing(self) -> Timing:
+        """
+        Created on first access and then kept up to date on circuit edits.
+        """
+
+        if self._timing is None:
+            self._timing = Timing(self)
+
+        return self._timing
 
-    @cached_property
+    @property
     def output_ready_time(self) -> int:
-        return max(logic.output_ready_time for logic in self.all_logic.values())
+        return self.timing.output_ready_time
 
     @classmethod
     def from_yosys_output(
         cls,
         cells: dict[str, Cell],
-        yosys_output: str,
+        yosys_output: Union[str, dict[str, Any]],
         top_module: str,
+        optimize: bool = True,
     ) -> Self:
+        """
+        `yosys_output` is JSON written by yosys or document returned by
+        `parse_yosys_output`. If top module instantiates other modules (design
+        is not flattened), each of them is read once and stamped for every
+        instance.
+        """
+
         c = cls._from_yosys_output(cells, yosys_output, top_module)
 
+        if optimize:
+            c._optimize()
+
         if len(c.latches) != 0:
             c._connect_dffs()
 
@@ -68,26 +145,134 @@ class Circuit:
         self.inputs = {}
         self.outputs = {}
         self.id_generator = IdGenerator()
+        self.delay_blocks_count = 0
+        self.optimization_results = []
+        self._timing = None
 
     @classmethod
     def _from_yosys_output(
-        cls, cells: dict[str, Cell], yosys_output: str, top_module: str
+        cls,
+        cells: dict[str, Cell],
+        yosys_output: Union[str, dict[str, Any]],
+        top_module: str,
     ) -> Self:
-        json_yosys_output = json.loads(yosys_output)
+        if isinstance(yosys_output, str):
+            yosys_output = parse_yosys_output(
+                StringIO(yosys_output), top_module, keep_submodules=True
+            )
+
+        modules = yosys_output["modules"]
 
-        module = json_yosys_output["modules"][top_module]
+        if top_module not in modules:
+            raise ValueError(f'module "{top_module}" not found in yosys output')
 
+        module = modules[top_module]
         ports = module["ports"]
         netnames = module["netnames"]
 
         c = cls()
-        nets: dict[int, Net] = {}
+        nets: dict[_NetKey, Net] = {}
+        # Nets connected through ports of instances.
+        nets_aliases: dict[_NetKey, _NetKey] = {}
+        templates: dict[str, _ModuleTemplate] = {}
         volatile_outputs: list[GroupGate] = []
         always_zero_gate: Union[Gate, None] = None
+        instances_count = 0
 
-        def get_net(net_id: int) -> Net:
+        def get_net(net_id: _NetKey) -> Net:
             return get_or_insert(nets, net_id, lambda: Net())
 
+        def find_net(net_id: _NetKey) -> _NetKey:
+            while net_id in nets_aliases:
+                net_id = nets_aliases[net_id]
+
+            return net_id
+
+        def alias_nets(a: _NetKey, b: _NetKey):
+            a = find_net(a)
+            b = find_net(b)
+
+            if a == b or isinstance(a, str) and isinstance(b, str):
+                return
+
+            # Constant is always kept as representative.
+            if isinstance(a, str):
+                a, b = b, a
+
+            nets_aliases[a] = b
+
+        def get_template(module_name: str) -> _ModuleTemplate:
+            return get_or_insert(
+                templates,
+                module_name,
+                lambda: _create_module_template(modules[module_name], cells, modules),
+            )
+
+        def instantiate(template: _ModuleTemplate, net_key: Callable[[_Bit], _NetKey]):
+            nonlocal instances_count
+
+            ids = iter(c.id_generator.next_range(template.logic_count))
+
+            for mode, output_bit, input_bits in template.cells:
+                if mode is None:
+                    clk_and_set = GroupGate(next(ids), c.latch_inputs, GateMode.AND)
+                    c._register_logic(clk_and_set, "middle")
+                    clk_and_reset = GroupGate(next(ids), c.latch_inputs, GateMode.AND)
+                    c._register_logic(clk_and_reset, "middle")
+
+                    c.latch_inputs.extend((clk_and_set, clk_and_reset))
+
+                    clk_bit, set_bit, reset_bit = input_bits
+
+                    get_net(net_key(clk_bit)).outputs_ids.extend(
+                        (clk_and_set.id, clk_and_reset.id)
+                    )
+                    get_net(net_key(set_bit)).outputs_ids.append(clk_and_set.id)
+                    get_net(net_key(reset_bit)).outputs_ids.append(clk_and_reset.id)
+
+                    latch = SyncSRLatchOutput(next(ids), clk_and_set, clk_and_reset)
+                    c.latches.append(latch)
+                    c._register_logic(latch, "middle")
+
+                    get_net(net_key(output_bit)).input_id = latch.id
+                else:
+                    gate = Gate(next(ids), mode)
+                    c._register_logic(gate, "middle")
+
+                    get_net(net_key(output_bit)).input_id = gate.id
+
+                    for input_bit in input_bits:
+                        get_net(net_key(input_bit)).outputs_ids.append(gate.id)
+
+            for module_type, connections in template.instances:
+                submodule = get_template(module_type)
+                ports_nets: dict[_Bit, _NetKey] = {}
+
+                instances_count += 1
+
+                for port_name, (direction, bits) in submodule.ports.items():
+                    for bit, parent_bit in zip(bits, connections.get(port_name, [])):
+                        parent_net = net_key(parent_bit)
+
+                        if isinstance(bit, str):
+                            alias_nets(parent_net, bit)
+                        elif bit in ports_nets:
+                            alias_nets(parent_net, ports_nets[bit])
+                        elif direction == "input" or not isinstance(parent_net, str):
+                            ports_nets[bit] = parent_net
+
+                def submodule_net_key(
+                    bit: _Bit,
+                    ports_nets: dict[_Bit, _NetKey] = ports_nets,
+                    instance: int = instances_count,
+                ) -> _NetKey:
+                    if isinstance(bit, str):
+                        return bit
+
+                    return ports_nets.get(bit, (instance, bit))
+
+                instantiate(submodule, submodule_net_key)
+
         for port_name in ports:
             attributes = netnames[port_name]["attributes"]
             port = ports[port_name]
@@ -177,7 +362,7 @@ class Circuit:
                                 )
                                 c._register_logic(gate, None)
 
-                                _link(always_zero_gate, gate)
+                                c._link(always_zero_gate, gate)
                             case _:
                                 gate = OutputGate(
                                     c.id_generator.next(), volatile_outputs, output
@@ -190,112 +375,561 @@ class Circuit:
 
                         output.gates.append(gate)
 
-        for cell in module["cells"].values():
-            connections = cell["connections"]
+        instantiate(get_template(top_module), lambda bit: bit)
 
-            match cell["type"]:
-                case "SYNC_SR_LATCH":
-                    clk_and_set = GroupGate(
-                        c.id_generator.next(), c.latch_inputs, GateMode.AND
-                    )
-                    c._register_logic(clk_and_set, "middle")
-                    clk_and_reset = GroupGate(
-                        c.id_generator.next(), c.latch_inputs, GateMode.AND
-                    )
-                    c._register_logic(clk_and_reset, "middle")
+        for net_id in nets_aliases:
+            net = nets.pop(net_id, None)
 
-                    c.latch_inputs.extend((clk_and_set, clk_and_reset))
+            if net is None:
+                continue
 
-                    get_net(connections["C"][0]).outputs_ids.extend(
-                        (clk_and_set.id, clk_and_reset.id)
-                    )
-                    get_net(connections["S"][0]).outputs_ids.append(clk_and_set.id)
-                    get_net(connections["R"][0]).outputs_ids.append(clk_and_reset.id)
+            representative = get_net(find_net(net_id))
 
-                    latch = SyncSRLatchOutput(
-                        c.id_generator.next(), clk_and_set, clk_and_reset
-                    )
-                    c.latches.append(latch)
-                    c._register_logic(latch, "middle")
+            if representative.input_id is None:
+                representative.input_id = net.input_id
+
+            representative.outputs_ids.extend(net.outputs_ids)
 
-                    get_net(connections["Q"][0]).input_id = latch.id
-                case _:
-                    gate = c._create_gate("middle")
+        for bit, net in nets.items():
+            # Constant bits ("0", "1", "x", "z") and undriven nets.
+            if net.input_id is None:
+                if always_zero_gate is None:
+                    always_zero_gate = c._create_gate("middle")
 
-                    cell_info = cells[cell["type"]]
+                if bit == "1":
+                    always_one_gate = c._create_gate("middle", GateMode.NAND)
 
-                    gate.mode = cell_info.mode
-                    get_net(connections[cell_info.output][0]).input_id = gate.id
+                    c._link(always_zero_gate, always_one_gate)
 
-                    for input in cell_info.inputs:
-                        get_net(connections[input][0]).outputs_ids.append(gate.id)
+                    net.input_id = always_one_gate.id
+                else:
+                    net.input_id = always_zero_gate.id
 
-        for net in nets.values():
             for output_logic_id in net.outputs_ids:
-                _link(
+                c._link(
                     c.all_logic[cast(int, net.input_id)], c.all_logic[output_logic_id]
                 )
 
         return c
 
+    def _optimize(self):
+        """
+        Must be called before `_connect_dffs`, when circuit has no loops.
+        """
+
+        self._run_optimization("constant propagation", self._propagate_constants)
+        self._run_optimization("structural hashing", self._merge_duplicates)
+        self._run_optimization("wide gates collapsing", self._collapse_wide_gates)
+        self._run_optimization("inverter absorption", self._absorb_inverters)
+        self._run_optimization("dead logic removal", self._remove_dead_logic)
+
+    def _run_optimization(self, name: str, optimization: Callable[[], None]):
+        logic_count = len(self.all_logic)
+        output_ready_time = self.output_ready_time
+
+        optimization()
+
+        self.optimization_results.append(
+            OptimizationResult(
+                name,
+                logic_count - len(self.all_logic),
+                output_ready_time - self.output_ready_time,
+            )
+        )
+
+    def _propagate_constants(self):
+        """
+        Folds constant inputs into gates. Gate which becomes constant is
+        turned into gate without inputs (always off) or NAND gate connected to
+        it (always on) and is removed if nothing uses it.
+        """
+
+        constants: dict[LogicId, bool] = {}
+        always_off_gate: Union[Gate, None] = None
+
+        for id in topological_order(self.all_logic, self._inputs_ids):
+            logic = self.all_logic[id]
+
+            if not self._is_optimizable(logic):
+                continue
+
+            # Timers are created only after optimization.
+            logic = cast(Gate, logic)
+            value = self._fold_constant_inputs(logic, constants)
+
+            if value is None:
+                continue
+
+            constants[id] = value
+
+            for input in list(logic.inputs):
+                self._unlink(input, logic)
+
+            if value:
+                if always_off_gate is None:
+                    always_off_gate = self._create_gate("middle")
+                    constants[always_off_gate.id] = False
+
+                logic.mode = GateMode.NAND
+
+                self._link(always_off_gate, logic)
+            else:
+                logic.mode = GateMode.AND
+
+                if always_off_gate is None:
+                    always_off_gate = logic
+
+        for id in constants:
+            logic = self.all_logic[id]
+
+            if len(logic.outputs) == 0:
+                self._remove_logic(logic)
+
+    def _fold_constant_inputs(
+        self, gate: Gate, constants: dict[LogicId, bool]
+    ) -> Union[bool, None]:
+        """
+        Removes constant inputs of `gate`. Returns value of `gate` if it becomes
+        constant.
+        """
+
+        if len(gate.inputs) == 0:
+            return False
+
+        constant_inputs = [input for input in gate.inputs if input.id in constants]
+
+        if len(constant_inputs) == 0:
+            return None
+
+        values = [constants[input.id] for input in constant_inputs]
+
+        match gate.mode:
+            case GateMode.AND | GateMode.NAND:
+                if not all(values):
+                    return gate.mode == GateMode.NAND
+            case GateMode.OR | GateMode.NOR:
+                if any(values):
+                    return gate.mode == GateMode.OR
+            case GateMode.XOR | GateMode.XNOR:
+                if sum(values) % 2 == 1:
+                    gate.mode = (
+                        GateMode.XNOR if gate.mode == GateMode.XOR else GateMode.XOR
+                    )
+
+        for input in constant_inputs:
+            self._unlink(input, gate)
+
+        if len(gate.inputs) == 0:
+            return gate.mode in (GateMode.AND, GateMode.NOR, GateMode.XNOR)
+
+        return None
+
+    def _merge_duplicates(self):
+        """
+        Replaces logic of same kind with same inputs with single instance.
+        Repeated inputs of AND, OR, NAND and NOR gates are removed first.
+        """
+
+        representatives: dict[tuple, Logic] = {}
+
+        for id in topological_order(self.all_logic, self._inputs_ids):
+            logic = self.all_logic[id]
+
+            if not self._is_optimizable(logic):
+                continue
+
+            if isinstance(logic, Gate):
+                if logic.mode not in (GateMode.XOR, GateMode.XNOR):
+                    self._remove_repeated_inputs(logic)
+
+                key: tuple = (Gate, logic.mode)
+            else:
+                key = (Timer, cast(Timer, logic).ticks)
+
+            key += tuple(sorted(input.id for input in logic.inputs))
+
+            representative = representatives.setdefault(key, logic)
+
+            if representative is not logic:
+                for output in list(logic.outputs):
+                    self._relink_merged(logic, representative, output)
+
+                if len(logic.outputs) == 0:
+                    self._remove_logic(logic)
+
+    def _relink_merged(self, logic: Logic, representative: Logic, output: Logic):
+        """
+        Replaces input `logic` of `output` with `representative` which has same
+        value. Game keeps only one connection between two blocks, so if
+        `output` already has `representative` as input, repeated input of AND,
+        OR, NAND and NOR gate is dropped and pair of equal inputs of XOR and
+        XNOR gate cancels out. Other outputs stay connected to `logic`.
+        """
+
+        if representative not in output.inputs:
+            self._unlink(logic, output)
+            self._link(representative, output)
+
+            return
+
+        if not self._is_optimizable(output) or not isinstance(output, Gate):
+            return
+
+        if output.mode in (GateMode.XOR, GateMode.XNOR):
+            # Gate without inputs is always off, XNOR gate would be wrong.
+            if len(output.inputs) == 2:
+                return
+
+            self._unlink(representative, output)
+
+        self._unlink(logic, output)
+
+    def _remove_repeated_inputs(self, gate: Gate):
+        inputs_ids: set[LogicId] = set()
+
+        for input in list(gate.inputs):
+            if input.id in inputs_ids:
+                self._unlink(input, gate)
+            else:
+                inputs_ids.add(input.id)
+
+    def _collapse_wide_gates(self):
+        """
+        Merges trees of AND and OR gates into wide gates, each merge removes
+        one tick from paths going through merged gate. Input computing same
+        function as gate (AND for AND and NAND, OR for OR and NOR, AND or OR
+        with single input for any of them) is replaced with its own inputs.
+        Gate which inputs all compute inverted function (NOR for AND, NAND for
+        OR, NAND or NOR with single input for any of them) is replaced with
+        inverted gate of other function (De Morgan's laws).
+        """
+
+        for id in topological_order(self.all_logic, self._inputs_ids):
+            gate = self.all_logic[id]
+
+            if (
+                not self._is_optimizable(gate)
+                or not isinstance(gate, Gate)
+                or len(gate.inputs) == 0
+            ):
+                continue
+
+            if gate.mode not in _DE_MORGAN_MODES:
+                continue
+
+            inputs = list(gate.inputs)
+            inverted_function = (
+                GateMode.NOR
+                if gate.mode in (GateMode.AND, GateMode.NAND)
+                else GateMode.NAND
+            )
+
+            if all(
+                self._computes_function(input, inverted_function) for input in inputs
+            ) and self._inline_inputs(gate, inputs):
+                gate.mode = _DE_MORGAN_MODES[gate.mode]
+
+            function = (
+                GateMode.AND
+                if gate.mode in (GateMode.AND, GateMode.NAND)
+                else GateMode.OR
+            )
+
+            for input in list(gate.inputs):
+                if self._computes_function(input, function):
+                    self._inline_inputs(gate, [input])
+
+    def _computes_function(self, logic: Logic, mode: GateMode) -> bool:
+        """
+        Returns `True` if `logic` is gate with `mode` which can be replaced
+        with its inputs.
+        """
+
+        if not self._is_optimizable(logic) or not isinstance(logic, Gate):
+            return False
+
+        if len(logic.inputs) == 1:
+            if mode in (GateMode.AND, GateMode.OR):
+                return logic.mode in (GateMode.AND, GateMode.OR)
+
+            return logic.mode in (GateMode.NAND, GateMode.NOR)
+
+        return len(logic.inputs) != 0 and logic.mode == mode
+
+    def _inline_inputs(self, gate: Gate, inputs: list[Logic]) -> bool:
+        """
+        Replaces `inputs` of `gate` with their own inputs, inputs left without
+        outputs are removed. Does nothing and returns `False` if that would
+        exceed connection limits.
+        """
+
+        inputs_ids = {input.id for input in inputs}
+        new_inputs_ids = {
+            input.id for input in gate.inputs if input.id not in inputs_ids
+        }
+        added_inputs: list[Logic] = []
+
+        for input in inputs:
+            for input_input in input.inputs:
+                if input_input.id not in new_inputs_ids:
+                    new_inputs_ids.add(input_input.id)
+                    added_inputs.append(input_input)
+
+        if len(new_inputs_ids) > _MAX_LOGIC_INPUTS_COUNT or any(
+            len(input.outputs) >= _MAX_LOGIC_OUTPUTS_COUNT for input in added_inputs
+        ):
+            return False
+
+        for input in inputs:
+            self._unlink(input, gate)
+
+        for input in added_inputs:
+            self._link(input, gate)
+
+        for input in inputs:
+            if len(input.outputs) == 0:
+                self._remove_logic(input)
+
+        return True
+
+    def _absorb_inverters(self):
+        """
+        Removes single-input NAND and NOR gates (inverters). XOR and XNOR
+        consumers take inverter input directly and get inverted mode. If
+        inverter still has outputs and its input is gate which has no other
+        outputs, that gate gets inverted mode and takes inverter outputs.
+        Otherwise inverter is turned into inverted copy of its input gate,
+        which keeps gates count and saves one tick. Copy is not made if some
+        input would exceed outputs limit, because buffers needed for that cost
+        more than saved tick.
+        """
+
+        for id in topological_order(self.all_logic, self._inputs_ids):
+            inverter = self.all_logic[id]
+
+            if (
+                not self._is_optimizable(inverter)
+                or not isinstance(inverter, Gate)
+                or inverter.mode not in (GateMode.NAND, GateMode.NOR)
+                or len(inverter.inputs) != 1
+            ):
+                continue
+
+            input = inverter.inputs[0]
+
+            for output in list(inverter.outputs):
+                if (
+                    self._is_optimizable(output)
+                    and isinstance(output, Gate)
+                    and output.mode in (GateMode.XOR, GateMode.XNOR)
+                    and input not in output.inputs
+                    and len(input.outputs) < _MAX_LOGIC_OUTPUTS_COUNT
+                ):
+                    self._unlink(inverter, output)
+                    self._link(input, output)
+
+                    output.mode = _INVERTED_MODES[output.mode]
+
+            if len(inverter.outputs) == 0:
+                self._remove_logic(inverter)
+
+                continue
+
+            if (
+                not self._is_optimizable(input)
+                or not isinstance(input, Gate)
+                or len(input.inputs) == 0
+            ):
+                continue
+
+            if len(input.outputs) == 1:
+                input.mode = _INVERTED_MODES[input.mode]
+
+                for output in list(inverter.outputs):
+                    self._unlink(inverter, output)
+                    self._link(input, output)
+
+                self._remove_logic(inverter)
+            elif all(
+                len(input_input.outputs) < _MAX_LOGIC_OUTPUTS_COUNT
+                for input_input in input.inputs
+            ):
+                inverter.mode = _INVERTED_MODES[input.mode]
+
+                self._unlink(input, inverter)
+
+                for input_input in input.inputs:
+                    self._link(input_input, inverter)
+
+    def _remove_dead_logic(self):
+        """
+        Removes logic which doesn't affect any output.
+        """
+
+        live_ids: set[LogicId] = set()
+        stack: list[Logic] = [
+            gate for output in self.outputs.values() for gate in output.gates
+        ]
+
+        while len(stack) != 0:
+            logic = stack.pop()
+
+            if logic.id in live_ids:
+                continue
+
+            live_ids.add(logic.id)
+
+            stack.extend(logic.inputs)
+
+            if isinstance(logic, SyncSRLatchOutput):
+                stack.extend((logic.clk_and_set, logic.clk_and_reset))
+
+        dead_latches = [latch for latch in self.latches if latch.id not in live_ids]
+
+        for latch in dead_latches:
+            self._remove_logic(latch)
+
+        self.latches = [latch for latch in self.latches if latch.id in live_ids]
+        # List is shared with latch inputs as their group.
+        self.latch_inputs[:] = [
+            gate for gate in self.latch_inputs if gate.id in live_ids
+        ]
+
+        for logic in list(self.middle_logic.values()):
+            if logic.id not in live_ids:
+                self._remove_logic(logic)
+
+    def _is_optimizable(self, logic: Logic) -> bool:
+        return type(logic) in (Gate, Timer) and logic.id in self.middle_logic
+
+    def _inputs_ids(self, id: LogicId) -> list[LogicId]:
+        return [input.id for input in self.all_logic[id].inputs]
+
     def _connect_dffs(self):
         for latch in self.latches:
             reset_loop_gate = self._create_gate("middle", GateMode.OR)
             set_loop_gate = self._create_gate("middle", GateMode.NOR)
 
-            _link(latch.clk_and_set, set_loop_gate)
-            _link(latch.clk_and_reset, reset_loop_gate)
+            self._link(latch.clk_and_set, set_loop_gate)
+            self._link(latch.clk_and_reset, reset_loop_gate)
 
-            _link(reset_loop_gate, latch)
-            _link(latch, set_loop_gate, True)
-            _link(set_loop_gate, reset_loop_gate)
+            self._link(reset_loop_gate, latch)
+            self._link(latch, set_loop_gate, True)
+            self._link(set_loop_gate, reset_loop_gate)
 
     def _insert_buffers(self):
-        for gate in self.all_logic.copy().values():
-            outputs: list[Tuple[int, Logic]] = [
-                (
-                    output_gate.output_ready_time - gate.output_ready_time - 1,
-                    output_gate,
-                )
-                for output_gate in gate.outputs
-            ]
+        """
+        Delays inputs of logic which requires inputs buffering, so all of them
+        change at the same tick.
 
-            outputs.sort(key=lambda t: t[0])
+        Outputs of one source which need same delay share tap of one delay
+        line. If all outputs of source need delay, part of it is absorbed by
+        source itself (timer gets more ticks, buffer or single input
+        non-inverting gate is replaced with timer).
+        """
 
-            last_buffer: Logic = gate
-            last_buffer_total_delay = 0
+        timing = self.timing
+
+        for source in list(self.all_logic.values()):
+            source_ready_time = timing.ready_time(source)
+            depends_on_latch = timing.depends_on_latch(source)
+
+            taps: dict[int, list[Logic]] = {}
+
+            for output in source.outputs:
+                required_delay = timing.ready_time(output) - source_ready_time - 1
 
-            for required_delay, output_gate in outputs:
                 if (
-                    not output_gate.requires_inputs_buffering
-                    or output_gate.depends_on_latch != gate.depends_on_latch
+                    required_delay > 0
+                    and output.requires_inputs_buffering
+                    and timing.depends_on_latch(output) == depends_on_latch
                 ):
+                    taps.setdefault(required_delay, []).append(output)
+
+            if len(taps) == 0:
+                continue
+
+            delays = sorted(taps)
+
+            last_buffer = source
+            last_buffer_total_delay = 0
+
+            if sum(len(outputs) for outputs in taps.values()) == len(source.outputs):
+                last_buffer, last_buffer_total_delay = self._absorb_delay(
+                    source, delays[0]
+                )
+                source = last_buffer
+
+            for delay in delays:
+                if delay > last_buffer_total_delay:
+                    last_buffer = self._create_delay_line(
+                        last_buffer, delay - last_buffer_total_delay
+                    )
+                    last_buffer_total_delay = delay
+
+                if last_buffer is source:
                     continue
 
-                _unlink(gate, output_gate)
+                for output in taps[delay]:
+                    self._unlink(source, output)
+                    self._link(last_buffer, output)
+
+    def _absorb_delay(self, logic: Logic, delay: int) -> Tuple[Logic, int]:
+        """
+        Tries to increase delay of `logic` by up to `delay` ticks. Returns logic
+        which replaced `logic` and count of absorbed ticks.
+        """
+
+        if logic.id not in self.middle_logic:
+            return logic, 0
+
+        if isinstance(logic, Timer):
+            absorbed_delay = min(delay, MAX_TIMER_TICKS - logic.ticks)
+
+            logic.ticks += absorbed_delay
+
+            self.timing.invalidate(logic)
+
+            return logic, absorbed_delay
+
+        if (
+            type(logic) in (Gate, BufferGate)
+            and cast(Gate, logic).mode in (GateMode.AND, GateMode.OR, GateMode.XOR)
+            and len(logic.inputs) == 1
+        ):
+            timer = Timer(self.id_generator.next(), min(delay, MAX_TIMER_TICKS))
 
-                new_buffer_delay = required_delay - last_buffer_total_delay
+            self._register_logic(timer, "middle")
+            self._replace(logic, timer)
+            self._unregister_logic(logic)
 
-                if new_buffer_delay > 0:
-                    buffer = Timer(self.id_generator.next(), new_buffer_delay - 1)
+            return timer, timer.ticks
 
-                    self._register_logic(buffer, "middle")
+        return logic, 0
 
-                    if isinstance(last_buffer, BufferGate):
-                        buffer.ticks += 1
+    def _create_delay_line(self, input: Logic, delay: int) -> Logic:
+        """
+        Returns last logic of chain which output is `input` delayed by `delay`
+        ticks.
+        """
 
-                        _replace(last_buffer, buffer)
-                        gate = buffer
+        for _ in range(_delay_line_length(delay)):
+            part = min(delay, MAX_TIMER_TICKS + 1)
+            delay -= part
 
-                        del self.all_logic[last_buffer.id]
-                        del self.middle_logic[last_buffer.id]
-                    else:
-                        _link(last_buffer, buffer)
+            if part == 1:
+                buffer: Logic = BufferGate(self.id_generator.next())
+            else:
+                buffer = Timer(self.id_generator.next(), part - 1)
 
-                    last_buffer = buffer
-                    last_buffer_total_delay = required_delay
+            self._register_logic(buffer, "middle")
+            self._link(input, buffer)
 
-                _link(last_buffer, output_gate)
+            self.delay_blocks_count += 1
+
+            input = buffer
+
+        return input
 
     def _handle_ignore_timings_outputs(self):
         for output in self.outputs.values():
@@ -306,41 +940,93 @@ class Circuit:
                     and not gate.requires_inputs_buffering
                     and gate.inputs[0].id in self.middle_logic
                 ):
-                    del self.middle_logic[gate.inputs[0].id]
+                    input = gate.inputs[0]
 
-                    del self.all_logic[gate.id]
+                    del self.middle_logic[input.id]
 
-                    output.gates[i] = gate.inputs[0]
+                    output.gates[i] = input
 
-                    _unlink(gate.inputs[0], gate)
+                    self._unlink(input, gate)
+                    self._unregister_logic(gate)
 
     def _ensure_connection_limit(self):
-        MAX_LOGIC_OUTPUTS_COUNT = 255
+        """
+        Moves outputs of logic with too many outputs behind balanced trees of
+        buffers. Outputs with least slack stay connected directly, so circuit
+        delay grows only if there is not enough slack. Feedback link of latch
+        always stays direct, latch doesn't hold its value if it is delayed.
+        """
+
+        timing = self.timing
+        required_times = timing.required_times()
+
+        # Logic is split in order of ready time, so connections delayed by
+        # earlier splits are never in fan-out cones of outputs of logic split
+        # later and `required_times` stay valid for them.
+        for logic in sorted(
+            (
+                logic
+                for logic in self.all_logic.values()
+                if len(logic.outputs) > _MAX_LOGIC_OUTPUTS_COUNT
+            ),
+            key=timing.ready_time,
+        ):
+            outputs = [
+                output
+                for _, output in sorted(
+                    zip(timing.connection_slacks(logic, required_times), logic.outputs),
+                    key=lambda t: t[0],
+                )
+                if not _is_latch_feedback(logic, output)
+            ]
 
-        gates_to_insert: list[BufferGate] = []
+            for output in outputs:
+                self._unlink(logic, output)
 
-        for logic in self.all_logic.values():
-            if len(logic.outputs) <= MAX_LOGIC_OUTPUTS_COUNT:
-                continue
+            self._link_through_buffers(
+                logic, outputs, _MAX_LOGIC_OUTPUTS_COUNT - len(logic.outputs)
+            )
 
-            new_outputs: list[BufferGate] = [BufferGate(self.id_generator.next())]
+    def _link_through_buffers(
+        self,
+        logic: Logic,
+        outputs: list[Logic],
+        max_outputs_count: int = _MAX_LOGIC_OUTPUTS_COUNT,
+    ):
+        """
+        `outputs` must be sorted by slack, first ones are linked directly.
+        `max_outputs_count` is count of outputs which `logic` still can have.
+        """
 
-            while len(new_outputs) + len(logic.outputs) > MAX_LOGIC_OUTPUTS_COUNT:
-                if len(new_outputs[-1].outputs) == MAX_LOGIC_OUTPUTS_COUNT:
-                    new_outputs.append(BufferGate(self.id_generator.next()))
+        if len(outputs) <= max_outputs_count:
+            for output in outputs:
+                self._link(logic, output)
 
-                gate = logic.outputs[-1]
+            return
 
-                _unlink(logic, gate)
-                _link(new_outputs[-1], gate)
+        # Each buffer takes place of one direct output and can hold
+        # `_MAX_LOGIC_OUTPUTS_COUNT` outputs.
+        buffers_count = min(
+            max_outputs_count,
+            ceil((len(outputs) - max_outputs_count) / (_MAX_LOGIC_OUTPUTS_COUNT - 1)),
+        )
+        direct_count = max_outputs_count - buffers_count
 
-            for new_output in new_outputs:
-                gates_to_insert.append(new_output)
+        for output in outputs[:direct_count]:
+            self._link(logic, output)
 
-                _link(logic, new_output)
+        buffered_outputs = outputs[direct_count:]
 
-        for gate in gates_to_insert:
-            self._register_logic(gate, "middle")
+        for i in range(buffers_count):
+            buffer = BufferGate(self.id_generator.next())
+
+            self._register_logic(buffer, "middle")
+            self._link(logic, buffer)
+
+            start = i * len(buffered_outputs) // buffers_count
+            end = (i + 1) * len(buffered_outputs) // buffers_count
+
+            self._link_through_buffers(buffer, buffered_outputs[start:end])
 
     def _register_logic(self, logic: Logic, kind: Union[Literal["middle"], None]):
         self.all_logic[logic.id] = logic
@@ -349,6 +1035,49 @@ class Circuit:
             case "middle":
                 self.middle_logic[logic.id] = logic
 
+        if self._timing is not None:
+            self._timing.add(logic)
+
+    def _unregister_logic(self, logic: Logic):
+        del self.all_logic[logic.id]
+        self.middle_logic.pop(logic.id, None)
+
+        if self._timing is not None:
+            self._timing.remove(logic)
+
+    def _remove_logic(self, logic: Logic):
+        for input in list(logic.inputs):
+            self._unlink(input, logic)
+
+        for output in list(logic.outputs):
+            self._unlink(logic, output)
+
+        self._unregister_logic(logic)
+
+    def _link(self, input: Logic, output: Logic, insert_front: bool = False):
+        _link(input, output, insert_front)
+
+        if self._timing is not None:
+            self._timing.invalidate(output)
+
+    def _unlink(self, input: Logic, output: Logic):
+        _unlink(input, output)
+
+        if self._timing is not None:
+            self._timing.invalidate(output)
+
+    def _replace(self, source: Logic, target: Logic):
+        outputs = list(source.outputs)
+
+        _replace(source, target)
+
+        if self._timing is not None:
+            self._timing.invalidate(source)
+            self._timing.invalidate(target)
+
+            for output in outputs:
+                self._timing.invalidate(output)
+
     def _create_gate(
         self,
         kind: Union[Literal["middle"], None],
@@ -361,20 +1090,69 @@ class Circuit:
         return gate
 
 
+def _create_module_template(
+    module: dict[str, Any], cells: dict[str, Cell], modules: dict[str, Any]
+) -> _ModuleTemplate:
+    template = _ModuleTemplate(
+        0,
+        {
+            name: (port["direction"], port["bits"])
+            for name, port in module["ports"].items()
+        },
+        [],
+        [],
+    )
+
+    for cell in module["cells"].values():
+        cell_type = cell["type"]
+        connections = cell["connections"]
+
+        # Names of flattened instances, added by `flatten` of newer yosys.
+        if cell_type == "$scopeinfo":
+            continue
+
+        if cell_type == "SYNC_SR_LATCH":
+            template.logic_count += 3
+            template.cells.append(
+                (
+                    None,
+                    connections["Q"][0],
+                    [connections[pin][0] for pin in ("C", "S", "R")],
+                )
+            )
+        elif cell_type in cells:
+            cell_info = cells[cell_type]
+
+            template.logic_count += 1
+            template.cells.append(
+                (
+                    cell_info.mode,
+                    connections[cell_info.output][0],
+                    [connections[input][0] for input in cell_info.inputs],
+                )
+            )
+        elif cell_type in modules:
+            template.instances.append((cell_type, connections))
+        else:
+            raise ValueError(f'unknown cell type "{cell_type}"')
+
+    return template
+
+
 def _replace(source: Logic, target: Logic):
-    for input in source.inputs[:]:
+    for input in list(source.inputs):
         _unlink(input, source)
         _link(input, target)
 
-    for output in source.outputs[:]:
+    for output in list(source.outputs):
         _unlink(source, output)
         _link(target, output)
 
 
 def _link(input: Logic, output: Logic, insert_front: bool = False):
     if insert_front:
-        input.outputs.insert(0, output)
-        output.inputs.insert(0, input)
+        input.outputs.insert_front(output)
+        output.inputs.insert_front(input)
     else:
         input.outputs.append(output)
         output.inputs.append(input)
@@ -383,3 +1161,15 @@ def _link(input: Logic, output: Logic, insert_front: bool = False):
 def _unlink(input: Logic, output: Logic):
     input.outputs.remove(output)
     output.inputs.remove(input)
+
+
+def _is_latch_feedback(input: Logic, output: Logic) -> bool:
+    """
+    Returns True if `output` is gate of set loop of latch `input`.
+    """
+
+    return isinstance(input, SyncSRLatchOutput) and input.clk_and_set in output.inputs
+
+
+def _delay_line_length(delay: int) -> int:
+    return ceil(delay / (MAX_TIMER_TICKS + 1))
@@ -0,0 +1,136 @@
+"""
+Thin client of `create_blueprint.daemon` with the same command line as
+`create_blueprint`. Only standard library is imported unless daemon is not
+running, so builds don't pay for startup and imports.
+"""
+
+from pathlib import Path
+from typing import Union
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+
+# `struct ucred` returned by `SO_PEERCRED`: pid, uid and gid.
+_UCRED_FORMAT = "3i"
+
+
+def default_socket_path() -> Path:
+    if "SM_VERILOG_SOCKET" in os.environ:
+        return Path(os.environ["SM_VERILOG_SOCKET"])
+
+    if "XDG_RUNTIME_DIR" in os.environ:
+        return Path(os.environ["XDG_RUNTIME_DIR"]) / f"sm-verilog-{os.getuid()}.sock"
+
+    return private_socket_directory() / "daemon.sock"
+
+
+def private_socket_directory() -> Path:
+    """
+    Directory for socket in temporary directory, where anyone can create
+    files. Daemon creates it accessible only by its user.
+    """
+
+    return Path(tempfile.gettempdir()) / f"sm-verilog-{os.getuid()}"
+
+
+def create_private_directory(path: Path):
+    """
+    Creates directory accessible only by current user. Existing directory is
+    accepted only if it is owned by current user and is not accessible by
+    others.
+    """
+
+    try:
+        path.mkdir(mode=0o700)
+    except FileExistsError:
+        pass
+
+    info = os.lstat(path)
+
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or info.st_mode & 0o077 != 0
+    ):
+        raise ValueError(
+            f'"{path}" must be a directory owned by current user and not '
+            "accessible by others"
+        )
+
+
+def peer_uid(connection: socket.socket) -> Union[int, None]:
+    """
+    Returns user ID of process on the other side of Unix socket or `None` if
+    platform doesn't support `SO_PEERCRED`.
+    """
+
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+
+    _, uid, _ = struct.unpack(
+        _UCRED_FORMAT,
+        connection.getsockopt(
+            socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize(_UCRED_FORMAT)
+        ),
+    )
+
+    return uid
+
+
+def main():
+    socket_path = default_socket_path()
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        client.connect(str(socket_path))
+    except (FileNotFoundError, ConnectionRefusedError):
+        client.close()
+
+        print("Daemon is not running, building without it.", file=sys.stderr)
+
+        from .build import create_argument_parser, run
+
+        run(create_argument_parser().parse_args())
+
+        return
+
+    uid = peer_uid(client)
+
+    if uid is None:
+        uid = os.stat(socket_path).st_uid
+
+    # Environment and file descriptors are sent only to daemon of same user.
+    if uid != os.getuid():
+        client.close()
+
+        raise ValueError(f'socket "{socket_path}" belongs to other user ({uid})')
+
+    request = {"args": sys.argv[1:], "cwd": os.getcwd(), "env": dict(os.environ)}
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    with client:
+        # Daemon writes build output directly to our stdout and stderr.
+        socket.send_fds(
+            client,
+            [json.dumps(request).encode() + b"\n"],
+            [sys.stdout.fileno(), sys.stderr.fileno()],
+        )
+
+        response = json.loads(client.makefile("rb").readline() or "{}")
+
+    if "exit_code" not in response:
+        print("Daemon closed connection before build ended.", file=sys.stderr)
+
+        sys.exit(1)
+
+    sys.exit(response["exit_code"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Long-lived build server which keeps modules imported and caches (font, cells,
+yosys version) warm. Requests are accepted over Unix socket from
+`create_blueprint.client`, each of them is built in forked child process.
+"""
+
+from pathlib import Path
+from typing import Any
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import traceback
+
+from .build import create_argument_parser, run
+from .blueprint import icon_font
+from .cell import generate_cells
+from .client import (
+    create_private_directory,
+    default_socket_path,
+    peer_uid,
+    private_socket_directory,
+)
+from .yosys import temporary_cells_path, yosys_version
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Request is JSON line with command line arguments, working directory and
+    environment of client, sent together with client stdout and stderr file
+    descriptors. Response is JSON line with exit code of build. Requests are
+    accepted only from processes of the same user.
+    """
+
+    def handle(self):
+        uid = peer_uid(self.connection)
+
+        if uid is not None and uid != os.getuid():
+            print(f"Rejected connection of other user ({uid})", file=sys.stderr)
+
+            return
+
+        message, fds, _, _ = socket.recv_fds(self.connection, 1 << 16, 2)
+
+        while not message.endswith(b"\n"):
+            chunk = self.connection.recv(1 << 16)
+
+            if chunk == b"":
+                return
+
+            message += chunk
+
+        request = json.loads(message)
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        # Handler runs in forked child, so process state can be changed freely.
+        for fd, client_fd in zip((1, 2), fds):
+            os.dup2(client_fd, fd)
+            os.close(client_fd)
+
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+
+        exit_code: Any = 0
+
+        try:
+            run(create_argument_parser().parse_args(request["args"]))
+        except SystemExit as error:
+            exit_code = error.code
+        except BaseException:
+            traceback.print_exc()
+
+            exit_code = 1
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        self.wfile.write(json.dumps({"exit_code": exit_code}).encode() + b"\n")
+
+
+class _Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    pass
+
+
+def _remove_stale_socket(path: Path):
+    """
+    Removes socket left by daemon which didn't exit cleanly.
+    """
+
+    if not path.exists():
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(str(path))
+        except ConnectionRefusedError:
+            path.unlink()
+
+            return
+
+    raise ValueError(f'daemon is already running on "{path}"')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="create_blueprint.daemon",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+
+    parser.add_argument(
+        "--socket",
+        help="path to a Unix socket to listen on (also read by client from SM_VERILOG_SOCKET)",
+        type=Path,
+        default=default_socket_path(),
+    )
+
+    args = parser.parse_args()
+
+    # Everything which is loaded here is shared with forked children.
+    icon_font()
+    temporary_cells_path(
+        generate_cells(create_argument_parser().get_default("cell_max_inputs"))
+    )
+    yosys_version()
+
+    if args.socket.parent == private_socket_directory():
+        create_private_directory(args.socket.parent)
+
+    _remove_stale_socket(args.socket)
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit())
+
+    with _Server(str(args.socket), _RequestHandler) as server:
+        args.socket.chmod(0o600)
+
+        print(f'Listening on "{args.socket}"')
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            # Socket file is not removed when server is closed.
+            args.socket.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+from collections.abc import Iterator
+from itertools import chain
+from typing import Generic, TypeVar, Union
+
+T = TypeVar("T")
+
+_SMALL_SIZE = 32
+
+
+class EdgeList(Generic[T]):
+    """
+    Ordered list of logic connections with O(1) `append`, `insert_front` and
+    `remove`. Same item can be stored several times, `remove` deletes its
+    first occurrence, so order is always same as with plain `list`.
+
+    Up to `_SMALL_SIZE` items are stored in plain list (operations on it are
+    bounded by constant and it takes less memory). Bigger lists give every
+    item integer key: appended items get growing positive keys and items
+    inserted to the front get falling negative keys, so order of items is
+    order of their keys.
+    """
+
+    __slots__ = ("_items", "_back", "_front", "_keys", "_next_key")
+
+    _items: Union[list[T], None]
+    _back: dict[int, T]
+    _front: dict[int, T]
+    _keys: dict[T, Union[int, list[int]]]
+    _next_key: int
+
+    def __init__(self) -> None:
+        self._items = []
+
+    def append(self, item: T):
+        if self._items is not None:
+            self._items.append(item)
+
+            if len(self._items) > _SMALL_SIZE:
+                self._convert()
+
+            return
+
+        key = self._next_key
+        self._next_key += 1
+
+        self._back[key] = item
+        self._add_key(item, key)
+
+    def insert_front(self, item: T):
+        if self._items is not None:
+            self._items.insert(0, item)
+
+            if len(self._items) > _SMALL_SIZE:
+                self._convert()
+
+            return
+
+        key = -self._next_key
+        self._next_key += 1
+
+        self._front[key] = item
+        self._add_key(item, key)
+
+    def remove(self, item: T):
+        if self._items is not None:
+            self._items.remove(item)
+
+            return
+
+        if item not in self._keys:
+            raise ValueError("item is not in EdgeList")
+
+        keys = self._keys[item]
+
+        if isinstance(keys, int):
+            key = keys
+
+            del self._keys[item]
+        else:
+            key = min(keys)
+
+            keys.remove(key)
+
+            if len(keys) == 1:
+                self._keys[item] = keys[0]
+
+        if key > 0:
+            del self._back[key]
+        else:
+            del self._front[key]
+
+    def __len__(self) -> int:
+        if self._items is not None:
+            return len(self._items)
+
+        return len(self._back) + len(self._front)
+
+    def __iter__(self) -> Iterator[T]:
+        if self._items is not None:
+            return iter(self._items)
+
+        return chain(reversed(self._front.values()), self._back.values())
+
+    def __contains__(self, item: object) -> bool:
+        if self._items is not None:
+            return item in self._items
+
+        return item in self._keys
+
+    def __getitem__(self, index: int) -> T:
+        """
+        O(1) for first and last item, O(n) for others.
+        """
+
+        if self._items is not None:
+            return self._items[index]
+
+        if index == -1 and len(self._back) != 0:
+            return next(reversed(self._back.values()))
+        if index == 0 and len(self._front) != 0:
+            return next(reversed(self._front.values()))
+
+        length = len(self)
+
+        if index < 0:
+            index += length
+
+        if not 0 <= index < length:
+            raise IndexError("EdgeList index out of range")
+
+        for i, item in enumerate(self):
+            if i == index:
+                return item
+
+        raise AssertionError()
+
+    def __repr__(self) -> str:
+        return f"EdgeList({list(self)!r})"
+
+    def _convert(self):
+        items = self._items
+
+        self._items = None
+        self._back = {}
+        self._front = {}
+        self._keys = {}
+        self._next_key = 1
+
+        for item in items:  # type: ignore
+            self.append(item)
+
+    def _add_key(self, item: T, key: int):
+        keys = self._keys.get(item)
+
+        if keys is None:
+            self._keys[item] = key
+        elif isinstance(keys, int):
+            self._keys[item] = [keys, key]
+        else:
+            keys.append(key)
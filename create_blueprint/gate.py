@@ -1,5 +1,4 @@
 from enum import IntEnum
-from typing import Union
 
 from .logic import Logic, LogicId
 
@@ -18,8 +17,14 @@ class GateMode(IntEnum):
 
 
 class Gate(Logic):
+    __slots__ = ("mode",)
+
     mode: GateMode
 
+    @property
+    def delay(self) -> int:
+        return 1
+
     def __init__(self, id: LogicId, mode: GateMode = GateMode.AND) -> None:
         super().__init__(id)
 
@@ -27,6 +32,3 @@ class Gate(Logic):
 
     def _render_name(self) -> str:
         return self.mode.name
-
-    def _compute_output_ready_time(self) -> Union[int, None]:
-        return self._max_arrival_time(-1) + 1
@@ -1,11 +1,12 @@
-from typing import Iterable
+from typing import Iterable, Union
 from graphviz import Digraph
 
 from .port import Port
 from .circuit import Circuit
+from .netlist import Netlist
 
 
-def render_circuit(circuit: Circuit) -> str:
+def render_circuit(circuit: Union[Circuit, Netlist]) -> str:
     graph = Digraph()
 
     graph.attr(rankdir="LR")
@@ -15,7 +16,7 @@ def render_circuit(circuit: Circuit) -> str:
     _render_ports(graph, circuit.outputs.values(), "sink")
 
     for logic in circuit.all_logic.values():
-        logic.render(graph)
+        logic.render(graph, circuit.timing)
 
     return graph.source
 
@@ -1,16 +1,16 @@
-from functools import cached_property
-from typing import Union
-
 from .logic import LogicId
 from .gate import Gate, GateMode
 
 
 class GroupGate(Gate):
-    _group_gates: list["GroupGate"]
+    """
+    Gate which output ready time is max of own ready times of all gates in its
+    group.
+    """
+
+    __slots__ = ("group_gates",)
 
-    @cached_property
-    def _output_ready_time(self) -> int:
-        return self._max_arrival_time(-1) + 1
+    group_gates: list["GroupGate"]
 
     @property
     def requires_inputs_buffering(self) -> bool:
@@ -21,7 +21,4 @@ class GroupGate(Gate):
     ) -> None:
         super().__init__(id, mode)
 
-        self._group_gates = group_gates
-
-    def _compute_output_ready_time(self) -> Union[int, None]:
-        return max((gate._output_ready_time for gate in self._group_gates), default=0)
+        self.group_gates = group_gates
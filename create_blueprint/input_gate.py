@@ -7,11 +7,12 @@ from .gate import Gate, GateMode
 
 
 @dataclass
-class Input(Port):
-    ...
+class Input(Port): ...
 
 
 class InputGate(Gate):
+    __slots__ = ("_input",)
+
     _input: Input
 
     def __init__(self, id: LogicId, input: Input) -> None:
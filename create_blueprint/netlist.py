@@ -0,0 +1,358 @@
+from collections.abc import Collection, Iterator, Mapping, Sequence, ValuesView
+from dataclasses import replace
+from enum import IntEnum
+from typing import Self, TypeVar
+import numpy as np
+from numpy.typing import NDArray
+
+from .utils import port_gate_render_name
+from .sync_sr_latch_output import SyncSRLatchOutput
+from .output_gate import Output, OutputGate
+from .input_gate import Input, InputGate
+from .circuit import Circuit
+from .timer import Timer
+from .logic import Logic, LogicId
+from .edge_list import EdgeList
+from .gate import Gate, GateMode
+from .id_generator import IdGenerator
+from .port import Port
+
+P = TypeVar("P", bound=Port)
+
+
+class LogicKind(IntEnum):
+    GATE = 0
+    TIMER = 1
+    SYNC_SR_LATCH_OUTPUT = 2
+
+
+_TIMER_KIND = int(LogicKind.TIMER)
+_SYNC_SR_LATCH_OUTPUT_KIND = int(LogicKind.SYNC_SR_LATCH_OUTPUT)
+# Indexing is much faster than `GateMode` constructor.
+_GATE_MODES = tuple(GateMode)
+
+
+class Netlist:
+    """
+    Compact read-only copy of finished `Circuit`. Logic is stored in typed
+    arrays indexed by position (not `LogicId`), inputs of logic `i` are
+    `fanin[fanin_offsets[i]:fanin_offsets[i + 1]]` and outputs are stored the
+    same way in `fanout`.
+
+    `all_logic`, `middle_logic`, `inputs` and `outputs` return thin views, so
+    netlist can be used in place of circuit for placement and rendering.
+    """
+
+    ids: NDArray[np.int32]
+    kinds: NDArray[np.uint8]
+    modes: NDArray[np.uint8]
+    ticks: NDArray[np.uint32]
+    fanin_offsets: NDArray[np.int32]
+    fanin: NDArray[np.int32]
+    fanout_offsets: NDArray[np.int32]
+    fanout: NDArray[np.int32]
+    arrival: NDArray[np.int32]
+    ready: NDArray[np.int32]
+    all_logic: "LogicViews"
+    middle_logic: "LogicViews"
+    inputs: dict[str, Input]
+    outputs: dict[str, Output]
+    id_generator: IdGenerator
+    _indices: NDArray[np.int32]
+    _ports: dict[int, Port]
+
+    @property
+    def timing(self) -> "NetlistTiming":
+        return NetlistTiming(self)
+
+    @property
+    def output_ready_time(self) -> int:
+        return int(self.ready.max(initial=0))
+
+    @classmethod
+    def from_circuit(cls, circuit: Circuit) -> Self:
+        netlist = cls()
+        logic = list(circuit.all_logic.values())
+        timing = circuit.timing
+
+        indices = {l.id: i for i, l in enumerate(logic)}
+
+        netlist.ids = np.fromiter((l.id for l in logic), np.int32, len(logic))
+        netlist.kinds = np.fromiter((_kind(l) for l in logic), np.uint8, len(logic))
+        netlist.modes = np.fromiter(
+            (l.mode if isinstance(l, Gate) else 0 for l in logic), np.uint8, len(logic)
+        )
+        netlist.ticks = np.fromiter(
+            (l.ticks if isinstance(l, Timer) else 0 for l in logic),
+            np.uint32,
+            len(logic),
+        )
+        netlist.fanin_offsets, netlist.fanin = _pack_links(
+            [l.inputs for l in logic], indices
+        )
+        netlist.fanout_offsets, netlist.fanout = _pack_links(
+            [l.outputs for l in logic], indices
+        )
+        netlist.arrival = np.fromiter(
+            (timing.arrival_time(l) for l in logic), np.int32, len(logic)
+        )
+        netlist.ready = np.fromiter(
+            (timing.ready_time(l) for l in logic), np.int32, len(logic)
+        )
+
+        netlist._indices = np.full(
+            int(netlist.ids.max(initial=-1)) + 1, -1, dtype=np.int32
+        )
+        netlist._indices[netlist.ids] = np.arange(len(logic), dtype=np.int32)
+
+        netlist.all_logic = LogicViews(netlist, np.arange(len(logic), dtype=np.int32))
+        netlist.middle_logic = LogicViews(
+            netlist,
+            np.fromiter(
+                (indices[id] for id in circuit.middle_logic),
+                np.int32,
+                len(circuit.middle_logic),
+            ),
+        )
+
+        netlist._ports = {}
+        netlist.inputs = {
+            name: netlist._copy_port(input, indices)
+            for name, input in circuit.inputs.items()
+        }
+        netlist.outputs = {
+            name: netlist._copy_port(output, indices)
+            for name, output in circuit.outputs.items()
+        }
+        netlist.id_generator = circuit.id_generator
+
+        return netlist
+
+    def index(self, id: LogicId) -> int:
+        if not 0 <= id < len(self._indices) or self._indices[id] == -1:
+            raise KeyError(id)
+
+        return int(self._indices[id])
+
+    def view(self, index: int) -> Logic:
+        if self.kinds.item(index) == _TIMER_KIND:
+            return TimerView(self, index)
+
+        return GateView(self, index)
+
+    def _copy_port(self, port: P, indices: dict[LogicId, int]) -> P:
+        result = replace(
+            port, gates=[GateView(self, indices[gate.id]) for gate in port.gates]
+        )
+
+        for gate in port.gates:
+            if isinstance(gate, (InputGate, OutputGate)):
+                self._ports[indices[gate.id]] = result
+
+        return result
+
+
+class NetlistTiming:
+    """
+    Timing computed by `Circuit.timing` before netlist was created.
+    """
+
+    _netlist: Netlist
+
+    @property
+    def output_ready_time(self) -> int:
+        return self._netlist.output_ready_time
+
+    def __init__(self, netlist: Netlist) -> None:
+        self._netlist = netlist
+
+    def arrival_time(self, logic: Logic) -> int:
+        return int(self._netlist.arrival[self._netlist.index(logic.id)])
+
+    def ready_time(self, logic: Logic) -> int:
+        return int(self._netlist.ready[self._netlist.index(logic.id)])
+
+
+class LogicViews(Mapping[LogicId, Logic]):
+    """
+    Read-only `LogicId` to logic mapping over subset of netlist, keeps order in
+    which logic was added to circuit.
+    """
+
+    _netlist: Netlist
+    _indices: NDArray[np.int32]
+    _mask: NDArray[np.bool_]
+
+    def __init__(self, netlist: Netlist, indices: NDArray[np.int32]) -> None:
+        self._netlist = netlist
+        self._indices = indices
+        self._mask = np.zeros(len(netlist.ids), dtype=np.bool_)
+        self._mask[indices] = True
+
+    def __getitem__(self, id: LogicId) -> Logic:
+        index = self._netlist.index(id)
+
+        if not self._mask[index]:
+            raise KeyError(id)
+
+        return self._netlist.view(index)
+
+    def __iter__(self) -> Iterator[LogicId]:
+        return iter(self._netlist.ids[self._indices].tolist())
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def values(self) -> ValuesView[Logic]:
+        return _LogicViewsValues(self)
+
+
+class _LogicViewsValues(ValuesView[Logic]):
+    """
+    Creates views directly from indices, without looking up every `LogicId`.
+    """
+
+    _mapping: LogicViews
+
+    def __iter__(self) -> Iterator[Logic]:
+        view = self._mapping._netlist.view
+
+        return (view(index) for index in self._mapping._indices.tolist())
+
+
+class _LogicView:
+    """
+    Common part of `GateView` and `TimerView`. Subclasses must be derived from
+    `Logic` and have `_netlist` and `_index` slots. Fields are copied to slots
+    of `Logic`, linked logic is read from netlist when it is accessed.
+    """
+
+    __slots__ = ()
+
+    id: LogicId
+    inputs: EdgeList[Logic]
+    outputs: EdgeList[Logic]
+    _netlist: Netlist
+    _index: int
+
+    def __init__(self, netlist: Netlist, index: int) -> None:
+        self._netlist = netlist
+        self._index = index
+
+        self.id = netlist.ids.item(index)
+        self.inputs = NetlistEdges(netlist, netlist.fanin_offsets, netlist.fanin, index)
+        self.outputs = NetlistEdges(
+            netlist, netlist.fanout_offsets, netlist.fanout, index
+        )
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, _LogicView)
+            and self._netlist is other._netlist
+            and self._index == other._index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self._netlist), self._index))
+
+
+class GateView(_LogicView, Gate):
+    __slots__ = ("_netlist", "_index")
+
+    def __init__(self, netlist: Netlist, index: int) -> None:
+        super().__init__(netlist, index)
+
+        self.mode = _GATE_MODES[netlist.modes.item(index)]
+
+    def _render_name(self) -> str:
+        port = self._netlist._ports.get(self._index)
+
+        if port is not None:
+            return port_gate_render_name(self, port)
+
+        if self._netlist.kinds[self._index] == _SYNC_SR_LATCH_OUTPUT_KIND:
+            return f"SYNC_SR_LATCH output ({super()._render_name()})"
+
+        return super()._render_name()
+
+
+class TimerView(_LogicView, Timer):
+    __slots__ = ("_netlist", "_index")
+
+    def __init__(self, netlist: Netlist, index: int) -> None:
+        super().__init__(netlist, index)
+
+        self.ticks = netlist.ticks.item(index)
+
+
+class NetlistEdges(EdgeList[Logic]):
+    """
+    Read-only inputs or outputs of netlist logic.
+    """
+
+    __slots__ = ("_netlist", "_offsets", "_links", "_index")
+
+    _netlist: Netlist
+    _offsets: NDArray[np.int32]
+    _links: NDArray[np.int32]
+    _index: int
+
+    def __init__(
+        self,
+        netlist: Netlist,
+        offsets: NDArray[np.int32],
+        links: NDArray[np.int32],
+        index: int,
+    ) -> None:
+        self._netlist = netlist
+        self._offsets = offsets
+        self._links = links
+        self._index = index
+
+    def append(self, item: Logic):
+        raise TypeError("netlist is read-only")
+
+    def insert_front(self, item: Logic):
+        raise TypeError("netlist is read-only")
+
+    def remove(self, item: Logic):
+        raise TypeError("netlist is read-only")
+
+    def __len__(self) -> int:
+        return int(self._offsets[self._index + 1] - self._offsets[self._index])
+
+    def __iter__(self) -> Iterator[Logic]:
+        view = self._netlist.view
+
+        return (view(index) for index in self._indices().tolist())
+
+    def __contains__(self, item: object) -> bool:
+        return any(logic == item for logic in self)
+
+    def __getitem__(self, index: int) -> Logic:
+        return self._netlist.view(int(self._indices()[index]))
+
+    def _indices(self) -> NDArray[np.int32]:
+        return self._links[self._offsets[self._index] : self._offsets[self._index + 1]]
+
+
+def _kind(logic: Logic) -> LogicKind:
+    if isinstance(logic, SyncSRLatchOutput):
+        return LogicKind.SYNC_SR_LATCH_OUTPUT
+    if isinstance(logic, Timer):
+        return LogicKind.TIMER
+
+    return LogicKind.GATE
+
+
+def _pack_links(
+    links: Sequence[Collection[Logic]], indices: dict[LogicId, int]
+) -> tuple[NDArray[np.int32], NDArray[np.int32]]:
+    offsets = np.zeros(len(links) + 1, dtype=np.int32)
+    offsets[1:] = np.cumsum([len(l) for l in links])
+
+    packed = np.fromiter(
+        (indices[logic.id] for l in links for logic in l), np.int32, int(offsets[-1])
+    )
+
+    return offsets, packed
@@ -13,6 +13,8 @@ class Output(Port):
 
 
 class OutputGate(GroupGate):
+    __slots__ = ("_output",)
+
     _output: Output
 
     @property
@@ -0,0 +1,536 @@
+"""
+Patching of previously built blueprint. Logic of new build is matched with
+logic of previous build by structural signatures, matched logic keeps its ID
+and position and new logic takes free positions, so only blocks of changed
+logic change in `blueprint.json`.
+"""
+
+from array import array
+from collections import deque
+from dataclasses import replace
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, Self, Union
+import json
+
+from .block_placer import BlockPlacer, BlockPlacerOptions
+from .blueprint import Blueprint
+from .circuit import Circuit
+from .gate import Gate
+from .logic import Logic, LogicId
+from .netlist import Netlist
+from .shape_id import ShapeId
+from .timer import Timer
+from .utils import write_text_atomically
+
+_STATE_VERSION = 1
+# Signature of logic describes its inputs up to this depth, so change of
+# logic doesn't change signatures of logic further than this from it.
+_SIGNATURE_DEPTH = 8
+# Candidates for matching are taken from matched neighbours with at most this
+# many connections, so nets with large fanout (like clock) are not scanned
+# for every logic connected to them.
+_MAX_CANDIDATES_SOURCE_DEGREE = 64
+
+
+class _LogicRecord:
+    __slots__ = ("label", "signature", "inputs", "slot")
+
+    # Hash of kind and mode of logic or of port and bit for port gates.
+    label: int
+    # Hash of label and signatures of inputs.
+    signature: int
+    inputs: list[LogicId]
+    # Slot of middle logic, None for port gates.
+    slot: Union[int, None]
+
+    def __init__(
+        self,
+        label: int,
+        signature: int,
+        inputs: list[LogicId],
+        slot: Union[int, None],
+    ) -> None:
+        self.label = label
+        self.signature = signature
+        self.inputs = inputs
+        self.slot = slot
+
+
+class PatchState:
+    """
+    Logic of previous build (labels, signatures, connections and slots with
+    IDs kept in blueprint), placement geometry and path of previous
+    blueprint. Saved next to blueprint directory of every patched build.
+    """
+
+    path: Path
+    height: int
+    compact: bool
+    cubic: bool
+    next_id: LogicId
+    logic: dict[LogicId, _LogicRecord]
+    blueprint_path: Union[Path, None]
+    # Stable IDs of attachments by stable ID of their gate.
+    attachments: dict[LogicId, LogicId]
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.height = 0
+        self.compact = False
+        self.cubic = False
+        self.next_id = 0
+        self.logic = {}
+        self.blueprint_path = None
+        self.attachments = {}
+
+    @classmethod
+    def load(cls, path: Path, options: BlockPlacerOptions) -> Self:
+        """
+        Loads state saved to `path`. State is empty if it wasn't saved yet or
+        if it was saved with placement options which give other geometry.
+        """
+
+        state = cls(path)
+
+        try:
+            data = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            return state
+
+        if (
+            data.get("version") != _STATE_VERSION
+            or data["compact"] != options.compact
+            or data["cubic"] != options.cubic
+            or options.height not in (None, data["height"])
+        ):
+            return state
+
+        state.height = data["height"]
+        state.compact = data["compact"]
+        state.cubic = data["cubic"]
+        state.next_id = data["next_id"]
+        state.logic = {
+            id: _LogicRecord(label, signature, inputs, slot)
+            for id, label, signature, inputs, slot in data["logic"]
+        }
+        state.blueprint_path = Path(data["blueprint_path"])
+        state.attachments = {gate_id: id for gate_id, id in data["attachments"]}
+
+        return state
+
+    def save(self, blueprint_path: Path):
+        self.blueprint_path = blueprint_path
+
+        data = {
+            "version": _STATE_VERSION,
+            "height": self.height,
+            "compact": self.compact,
+            "cubic": self.cubic,
+            "next_id": self.next_id,
+            "logic": [
+                [id, record.label, record.signature, record.inputs, record.slot]
+                for id, record in self.logic.items()
+            ],
+            "blueprint_path": str(blueprint_path),
+            "attachments": list(self.attachments.items()),
+        }
+
+        write_text_atomically(self.path, json.dumps(data))
+
+    def place(
+        self, circuit: Union[Circuit, Netlist], options: BlockPlacerOptions
+    ) -> Blueprint:
+        """
+        Places blocks with IDs and positions of matched logic of previous
+        build and updates state to describe new build. Blocks are sorted by
+        position (solids) and ID, so unchanged blocks keep their order in
+        `blueprint.json`.
+        """
+
+        if len(self.logic) == 0:
+            self.height = BlockPlacer.middle_logic_height(circuit, options)
+            self.compact = options.compact
+            self.cubic = options.cubic
+
+        records = _logic_records(circuit)
+        matches = _match_logic(records, self.logic)
+
+        slots = _assign_slots(circuit, matches, self.logic, self.compact)
+        blueprint = BlockPlacer.place(
+            circuit, replace(options, height=self.height), slots
+        )
+
+        ids: dict[LogicId, LogicId] = {}
+
+        for id in sorted(records):
+            if id in matches:
+                ids[id] = matches[id]
+            else:
+                ids[id] = self.next_id
+                self.next_id += 1
+
+        attachments: dict[LogicId, LogicId] = {}
+
+        for block in blueprint.blocks:
+            if block.shape_id not in (ShapeId.Switch, ShapeId.Sensor):
+                continue
+
+            if block.id is None:
+                continue
+
+            # Attachment controls only its gate.
+            gate_id = ids[block.controllers[0]]
+
+            if gate_id in self.attachments:
+                ids[block.id] = self.attachments[gate_id]
+            else:
+                ids[block.id] = self.next_id
+                self.next_id += 1
+
+            attachments[gate_id] = ids[block.id]
+
+        for block in blueprint.blocks:
+            if block.id is not None:
+                block.id = ids[block.id]
+                block.controllers = tuple(ids[id] for id in block.controllers)
+
+        blueprint.blocks.sort(
+            key=lambda block: (
+                block.id is not None,
+                block.id or 0,
+                block.x,
+                block.y,
+                block.z,
+            )
+        )
+
+        self.logic = {
+            ids[id]: _LogicRecord(
+                record.label,
+                record.signature,
+                [ids[input] for input in record.inputs],
+                slots.get(id),
+            )
+            for id, record in records.items()
+        }
+        self.attachments = attachments
+
+        return blueprint
+
+
+def diff_blueprints(old_path: Path, blueprint: Blueprint) -> dict[str, Any]:
+    """
+    Returns blocks of `blueprint` which are not in `blueprint.json` in
+    `old_path` directory (`added`), blocks of it which are not in `blueprint`
+    (`removed`) and blocks which changed (`changed`, pairs of old and new
+    block). Blocks with ID are compared by ID, solids by position.
+    """
+
+    def key(block: dict[str, Any]) -> tuple:
+        if "controller" in block:
+            return ("id", block["controller"]["id"])
+
+        position = block["pos"]
+
+        return ("pos", position["x"], position["y"], position["z"])
+
+    def blocks(document: dict[str, Any]) -> dict[tuple, dict[str, Any]]:
+        return {
+            key(block): block for body in document["bodies"] for block in body["childs"]
+        }
+
+    try:
+        old_blocks = blocks(json.loads((old_path / "blueprint.json").read_text()))
+    except (FileNotFoundError, ValueError):
+        old_blocks = {}
+
+    new_blocks = blocks(json.loads(blueprint.to_json()))
+
+    return {
+        "added": [block for key, block in new_blocks.items() if key not in old_blocks],
+        "removed": [
+            block for key, block in old_blocks.items() if key not in new_blocks
+        ],
+        "changed": [
+            {"old": old_blocks[key], "new": block}
+            for key, block in new_blocks.items()
+            if key in old_blocks and old_blocks[key] != block
+        ],
+        "unchanged_count": sum(
+            1
+            for key, block in new_blocks.items()
+            if key in old_blocks and old_blocks[key] == block
+        ),
+    }
+
+
+def _hash(*values: Any) -> int:
+    return _hash_bytes(json.dumps(values).encode())
+
+
+def _hash_ints(values: list[int]) -> int:
+    return _hash_bytes(array("Q", values).tobytes())
+
+
+def _hash_bytes(data: bytes) -> int:
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), "little")
+
+
+def _logic_records(circuit: Union[Circuit, Netlist]) -> dict[LogicId, _LogicRecord]:
+    labels: dict[LogicId, int] = {}
+    inputs: dict[LogicId, list[LogicId]] = {}
+
+    for logic in circuit.all_logic.values():
+        labels[logic.id] = _local_label(logic)
+        inputs[logic.id] = [input.id for input in logic.inputs]
+
+    for direction, ports in (("input", circuit.inputs), ("output", circuit.outputs)):
+        for name, port in ports.items():
+            for i, gate in enumerate(port.gates):
+                labels[gate.id] = _hash(direction, name, i)
+
+    signatures = labels
+
+    for _ in range(_SIGNATURE_DEPTH):
+        signatures = {
+            id: _hash_ints([label, *sorted(signatures[input] for input in inputs[id])])
+            for id, label in labels.items()
+        }
+
+    return {
+        id: _LogicRecord(label, signatures[id], inputs[id], None)
+        for id, label in labels.items()
+    }
+
+
+def _local_label(logic: Logic) -> int:
+    if isinstance(logic, Timer):
+        return _hash("timer", logic.ticks)
+    elif isinstance(logic, Gate):
+        return _hash("gate", int(logic.mode))
+    else:
+        raise ValueError(f'unknown logic "{logic}"')
+
+
+def _match_logic(
+    new: dict[LogicId, _LogicRecord], old: dict[LogicId, _LogicRecord]
+) -> dict[LogicId, LogicId]:
+    """
+    Returns IDs of matched old logic by IDs of new logic. Logic with unique
+    signature (or unique label, like port gates) is matched first. Then
+    matches are propagated: unmatched logic is matched with logic of the same
+    label which is connected the same way to already matched logic, if there
+    is only one best candidate. When nothing can be propagated, ties are
+    broken in order of IDs.
+    """
+
+    matches: dict[LogicId, LogicId] = {}
+    matched_old: set[LogicId] = set()
+
+    for attribute in ("signature", "label"):
+        new_groups = _group(new, attribute, matches.keys())
+        old_groups = _group(old, attribute, matched_old)
+
+        for value, new_ids in new_groups.items():
+            old_ids = old_groups.get(value, [])
+
+            if len(new_ids) == 1 and len(old_ids) == 1:
+                matches[new_ids[0]] = old_ids[0]
+                matched_old.add(old_ids[0])
+
+    new_neighbours = _neighbours(new)
+    old_neighbours = _neighbours(old)
+    old_adjacent = {id: set(neighbours) for id, neighbours in old_neighbours.items()}
+
+    def best_candidate(id: LogicId, unique: bool) -> Union[LogicId, None]:
+        record = new[id]
+        # Old logic of matched neighbours with direction from `id`.
+        mapped_neighbours = [
+            (is_output, matches[neighbour])
+            for is_output, neighbour in new_neighbours[id]
+            if neighbour in matches
+        ]
+
+        if len(mapped_neighbours) == 0:
+            return None
+
+        sources = [
+            mapped_neighbour
+            for mapped_neighbour in mapped_neighbours
+            if len(old_neighbours[mapped_neighbour[1]]) <= _MAX_CANDIDATES_SOURCE_DEGREE
+        ] or [min(mapped_neighbours, key=lambda item: len(old_neighbours[item[1]]))]
+        candidates = {
+            candidate
+            for is_output, old_neighbour in sources
+            for candidate_is_output, candidate in old_neighbours[old_neighbour]
+            if candidate_is_output != is_output
+            and candidate not in matched_old
+            and old[candidate].label == record.label
+        }
+        scores = {
+            candidate: sum(
+                1
+                for mapped_neighbour in mapped_neighbours
+                if mapped_neighbour in old_adjacent[candidate]
+            )
+            for candidate in candidates
+        }
+
+        ranked = sorted(
+            scores,
+            key=lambda candidate: (
+                -scores[candidate],
+                old[candidate].signature != record.signature,
+                candidate,
+            ),
+        )
+
+        if len(ranked) == 0:
+            return None
+
+        if (
+            unique
+            and len(ranked) > 1
+            and scores[ranked[0]] == scores[ranked[1]]
+            and (old[ranked[1]].signature == record.signature)
+            >= (old[ranked[0]].signature == record.signature)
+        ):
+            return None
+
+        return ranked[0]
+
+    def propagate(worklist: deque[LogicId]):
+        while len(worklist) != 0:
+            id = worklist.popleft()
+
+            if id in matches:
+                continue
+
+            candidate = best_candidate(id, True)
+
+            if candidate is None:
+                continue
+
+            matches[id] = candidate
+            matched_old.add(candidate)
+
+            worklist.extend(
+                sorted(
+                    neighbour
+                    for _, neighbour in new_neighbours[id]
+                    if neighbour not in matches
+                )
+            )
+
+    propagate(
+        deque(
+            sorted(
+                neighbour
+                for id in matches
+                for _, neighbour in new_neighbours[id]
+                if neighbour not in matches
+            )
+        )
+    )
+
+    for id in sorted(new):
+        if id in matches:
+            continue
+
+        candidate = best_candidate(id, False)
+
+        if candidate is not None:
+            matches[id] = candidate
+            matched_old.add(candidate)
+
+            propagate(
+                deque(
+                    sorted(
+                        neighbour
+                        for _, neighbour in new_neighbours[id]
+                        if neighbour not in matches
+                    )
+                )
+            )
+
+    new_groups = _group(new, "signature", matches.keys())
+    old_groups = _group(old, "signature", matched_old)
+
+    for value, new_ids in new_groups.items():
+        for new_id, old_id in zip(new_ids, old_groups.get(value, [])):
+            matches[new_id] = old_id
+
+    return matches
+
+
+def _group(
+    records: dict[LogicId, _LogicRecord], attribute: str, excluded: Any
+) -> dict[int, list[LogicId]]:
+    result: dict[int, list[LogicId]] = {}
+
+    for id in sorted(records):
+        if id not in excluded:
+            result.setdefault(getattr(records[id], attribute), []).append(id)
+
+    return result
+
+
+def _neighbours(
+    records: dict[LogicId, _LogicRecord],
+) -> dict[LogicId, list[tuple[bool, LogicId]]]:
+    """
+    Returns inputs (`False`) and outputs (`True`) of every logic.
+    """
+
+    result: dict[LogicId, list[tuple[bool, LogicId]]] = {
+        id: [(False, input) for input in record.inputs]
+        for id, record in records.items()
+    }
+
+    for id, record in records.items():
+        for input in record.inputs:
+            result[input].append((True, id))
+
+    return result
+
+
+def _assign_slots(
+    circuit: Union[Circuit, Netlist],
+    matches: dict[LogicId, LogicId],
+    old: dict[LogicId, _LogicRecord],
+    compact: bool,
+) -> dict[LogicId, int]:
+    """
+    Matched middle logic keeps its slot, new middle logic takes the lowest
+    free slots.
+    """
+
+    if compact:
+        return {id: 0 for id in circuit.middle_logic}
+
+    slots: dict[LogicId, int] = {}
+
+    for id in circuit.middle_logic:
+        if id not in matches:
+            continue
+
+        slot = old[matches[id]].slot
+
+        if slot is not None:
+            slots[id] = slot
+
+    used_slots = set(slots.values())
+    free_slot = 0
+
+    for id in circuit.middle_logic:
+        if id in slots:
+            continue
+
+        while free_slot in used_slots:
+            free_slot += 1
+
+        slots[id] = free_slot
+        used_slots.add(free_slot)
+
+    return slots
@@ -0,0 +1,323 @@
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from typing import Sequence, Union
+import numpy as np
+from numpy.typing import NDArray
+
+from .circuit import Circuit
+from .logic import Logic, LogicId
+from .input_gate import InputGate
+from .timer import Timer
+from .gate import Gate, GateMode
+from .port import Port
+
+_OPERATIONS: dict[GateMode, np.ufunc] = {
+    GateMode.AND: np.bitwise_and,
+    GateMode.OR: np.bitwise_or,
+    GateMode.XOR: np.bitwise_xor,
+    GateMode.NAND: np.bitwise_and,
+    GateMode.NOR: np.bitwise_or,
+    GateMode.XNOR: np.bitwise_xor,
+}
+
+_INVERTED_MODES = (GateMode.NAND, GateMode.NOR, GateMode.XNOR)
+
+
+class _LogicGroup:
+    """
+    Logic which output is computed with same operation. Inputs of `rows[i]` are
+    `sources[offsets[i]:offsets[i + 1]]`, every row has at least one input.
+    """
+
+    operation: np.ufunc
+    rows: NDArray[np.intp]
+    sources: NDArray[np.intp]
+    offsets: NDArray[np.intp]
+    inverted: NDArray
+
+    def __init__(self, operation: np.ufunc, logic: Sequence[Logic], inverted: NDArray):
+        self.operation = operation
+        self.rows = np.array([l.id for l in logic], dtype=np.intp)
+        self.sources = np.array(
+            [input.id for l in logic for input in l.inputs], dtype=np.intp
+        )
+        self.offsets = np.cumsum([0] + [len(l.inputs) for l in logic], dtype=np.intp)[
+            :-1
+        ]
+        self.inverted = inverted
+
+    def evaluate(self, state: NDArray) -> NDArray:
+        return (
+            self.operation.reduceat(state[self.sources], self.offsets, axis=0)
+            ^ self.inverted
+        )
+
+
+class _SimulatorBase(ABC):
+    """
+    Tick-accurate simulation of compiled circuit, shared by `Simulator` and
+    `BitParallelSimulator` which differ in representation of logic state.
+
+    Follows Scrap Mechanic semantics: every gate output is computed from values
+    its inputs had on the previous tick, timer with N ticks delays signal by
+    N + 1 ticks and logic without inputs is always off. Input gates are set
+    directly using `set_input`.
+
+    State of all logic is stored in array indexed by `LogicId`.
+    """
+
+    tick: int
+    _circuit: Circuit
+    _state: NDArray
+    _next_state: NDArray
+    _gate_groups: list[_LogicGroup]
+    _timers: _LogicGroup
+    _timers_ticks: NDArray[np.intp]
+    _timers_columns: NDArray[np.intp]
+    _timers_history: NDArray
+
+    def __init__(self, circuit: Circuit) -> None:
+        self.tick = 0
+        self._circuit = circuit
+
+        size = max(circuit.all_logic, default=-1) + 1
+
+        self._state = self._create_state(size)
+        self._next_state = self._create_state(size)
+
+        groups: dict[np.ufunc, tuple[list[Logic], list[bool]]] = {}
+        timers: list[Timer] = []
+
+        for logic in circuit.all_logic.values():
+            if len(logic.inputs) == 0 or isinstance(logic, InputGate):
+                continue
+
+            if isinstance(logic, Gate):
+                group = groups.setdefault(_OPERATIONS[logic.mode], ([], []))
+
+                group[0].append(logic)
+                group[1].append(logic.mode in _INVERTED_MODES)
+            elif isinstance(logic, Timer):
+                timers.append(logic)
+
+        self._gate_groups = [
+            _LogicGroup(operation, logic, self._create_mask(inverted))
+            for operation, (logic, inverted) in groups.items()
+        ]
+
+        self._timers = _LogicGroup(
+            np.bitwise_or, timers, self._create_mask([False] * len(timers))
+        )
+        self._timers_ticks = np.array([timer.ticks for timer in timers], dtype=np.intp)
+        self._timers_columns = np.arange(len(timers), dtype=np.intp)
+        self._timers_history = np.zeros(
+            (int(self._timers_ticks.max(initial=0)) + 1, len(timers))
+            + self._state.shape[1:],
+            dtype=self._state.dtype,
+        )
+
+    def step(self, ticks: int = 1):
+        for _ in range(ticks):
+            self._step()
+
+    def _step(self):
+        state = self._state
+        next_state = self._next_state
+
+        np.copyto(next_state, state)
+
+        for group in self._gate_groups:
+            next_state[group.rows] = group.evaluate(state)
+
+        if len(self._timers.rows) != 0:
+            history = self._timers_history
+
+            history[self.tick % len(history)] = self._timers.evaluate(state)
+
+            next_state[self._timers.rows] = history[
+                (self.tick - self._timers_ticks) % len(history),
+                self._timers_columns,
+            ]
+
+        self._state = next_state
+        self._next_state = state
+        self.tick += 1
+
+    @abstractmethod
+    def _create_state(self, size: int) -> NDArray:
+        pass
+
+    @abstractmethod
+    def _create_mask(self, flags: list[bool]) -> NDArray:
+        pass
+
+    @staticmethod
+    def _get_port(ports: Mapping[str, Port], name: str) -> Port:
+        if name not in ports:
+            raise ValueError(f'port "{name}" doesn\'t exist')
+
+        return ports[name]
+
+
+class Simulator(_SimulatorBase):
+    """
+    Simulator of one input vector, state of every logic is one byte.
+    """
+
+    def set_input(self, name: str, value: int):
+        port = self._get_port(self._circuit.inputs, name)
+
+        if not 0 <= value < 2 ** len(port.gates):
+            raise ValueError(f'value {value} doesn\'t fit in input "{name}"')
+
+        for i, gate in enumerate(port.gates):
+            self._state[gate.id] = (value >> i) & 1
+
+    def get_output(self, name: str) -> int:
+        return self._read_port(self._get_port(self._circuit.outputs, name))
+
+    def get_input(self, name: str) -> int:
+        return self._read_port(self._get_port(self._circuit.inputs, name))
+
+    def get(self, id: LogicId) -> bool:
+        return bool(self._state[id])
+
+    def _create_state(self, size: int) -> NDArray:
+        return np.zeros(size, dtype=np.uint8)
+
+    def _create_mask(self, flags: list[bool]) -> NDArray:
+        return np.array(flags, dtype=np.uint8)
+
+    def _read_port(self, port: Port) -> int:
+        result = 0
+
+        for i, gate in enumerate(port.gates):
+            result |= int(self._state[gate.id]) << i
+
+        return result
+
+
+_LANE_SHIFTS = np.arange(64, dtype=np.uint64)
+
+
+class BitParallelSimulator(_SimulatorBase):
+    """
+    Simulator which runs many independent input vectors at once. Each logic
+    state is a row of `uint64` words, bit `i % 64` of word `i // 64` belongs to
+    vector `i`.
+    """
+
+    vectors: int
+    _words: int
+
+    def __init__(self, circuit: Circuit, vectors: int = 64) -> None:
+        if vectors <= 0:
+            raise ValueError(f"vectors count ({vectors}) must be > 0")
+
+        self.vectors = vectors
+        self._words = (vectors + 63) // 64
+
+        super().__init__(circuit)
+
+    def evaluate(
+        self, inputs: dict[str, Sequence[int]], ticks: Union[int, None] = None
+    ) -> dict[str, list[int]]:
+        """
+        Sets `inputs` (one value per vector for each input port), waits for
+        `ticks` (circuit delay by default) and returns values of all outputs.
+        """
+
+        for name, values in inputs.items():
+            self.set_input(name, values)
+
+        if ticks is None:
+            ticks = self._circuit.output_ready_time
+
+        self.step(ticks)
+
+        return {name: self.get_output(name) for name in self._circuit.outputs}
+
+    def set_input(self, name: str, values: Sequence[int]):
+        port = self._get_port(self._circuit.inputs, name)
+
+        if len(values) != self.vectors:
+            raise ValueError(
+                f'expected {self.vectors} values for input "{name}", got {len(values)}'
+            )
+
+        for value in values:
+            if not 0 <= value < 2 ** len(port.gates):
+                raise ValueError(f'value {value} doesn\'t fit in input "{name}"')
+
+        chunks = _split_values(values, len(port.gates))
+
+        for i, gate in enumerate(port.gates):
+            self._state[gate.id] = self._pack(
+                (chunks[i // 64] >> np.uint64(i % 64)) & np.uint64(1)
+            )
+
+    def get_output(self, name: str) -> list[int]:
+        return self._read_port(self._get_port(self._circuit.outputs, name))
+
+    def get_input(self, name: str) -> list[int]:
+        return self._read_port(self._get_port(self._circuit.inputs, name))
+
+    def get(self, id: LogicId) -> list[bool]:
+        return [bool(bit) for bit in self._unpack(self._state[id])]
+
+    def _create_state(self, size: int) -> NDArray:
+        return np.zeros((size, self._words), dtype=np.uint64)
+
+    def _create_mask(self, flags: list[bool]) -> NDArray:
+        return np.where(
+            np.array(flags, dtype=bool)[:, None],
+            np.uint64(0xFFFF_FFFF_FFFF_FFFF),
+            np.uint64(0),
+        )
+
+    def _read_port(self, port: Port) -> list[int]:
+        chunks = [
+            np.zeros(self.vectors, dtype=np.uint64)
+            for _ in range((len(port.gates) + 63) // 64)
+        ]
+
+        for i, gate in enumerate(port.gates):
+            chunks[i // 64] |= self._unpack(self._state[gate.id]) << np.uint64(i % 64)
+
+        return _join_values(chunks)
+
+    def _pack(self, bits: NDArray[np.uint64]) -> NDArray[np.uint64]:
+        padded = np.zeros(self._words * 64, dtype=np.uint64)
+        padded[: len(bits)] = bits
+
+        return np.bitwise_or.reduce(
+            padded.reshape(self._words, 64) << _LANE_SHIFTS, axis=1
+        )
+
+    def _unpack(self, words: NDArray[np.uint64]) -> NDArray[np.uint64]:
+        return ((words[:, None] >> _LANE_SHIFTS) & np.uint64(1)).reshape(-1)[
+            : self.vectors
+        ]
+
+
+def _split_values(values: Sequence[int], width: int) -> list[NDArray[np.uint64]]:
+    if width <= 64:
+        return [np.array(values, dtype=np.uint64)]
+
+    return [
+        np.array([(value >> shift) & (2**64 - 1) for value in values], dtype=np.uint64)
+        for shift in range(0, width, 64)
+    ]
+
+
+def _join_values(chunks: list[NDArray[np.uint64]]) -> list[int]:
+    if len(chunks) == 1:
+        return chunks[0].tolist()
+
+    result = [0] * len(chunks[0])
+
+    for i, chunk in enumerate(chunks):
+        for j, value in enumerate(chunk.tolist()):
+            result[j] |= value << (64 * i)
+
+    return result
@@ -0,0 +1,161 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from hashlib import sha256
+from pathlib import Path
+from typing import TextIO, Union
+import fcntl
+import os
+import re
+
+from .utils import open_atomically
+
+_INCLUDE_REGEX = re.compile(r'`include\s+"([^"]+)"')
+
+
+class SynthesisCache:
+    """
+    Directory with yosys outputs named by hash of everything that affects
+    synthesis (see `synthesis_key`). Outputs are written atomically, so
+    concurrent builds never read partially written output. Least recently
+    used outputs are removed when total size exceeds `max_size` bytes.
+    """
+
+    path: Path
+    max_size: int
+    # Paths of outputs opened by `open`, so caller can report them.
+    hits: list[Path]
+
+    def __init__(self, path: Path, max_size: int) -> None:
+        self.path = path
+        self.max_size = max_size
+        self.hits = []
+
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def open(self, key: str) -> Union[TextIO, None]:
+        """
+        Opens cached output for reading. Opened output can be read even if it
+        is evicted by other build.
+        """
+
+        path = self._entry_path(key)
+
+        try:
+            result = path.open()
+        except FileNotFoundError:
+            return None
+
+        self.hits.append(path)
+
+        try:
+            # Modification time is used as last access time for LRU eviction.
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+
+        return result
+
+    @contextmanager
+    def writer(self, key: str) -> Iterator[TextIO]:
+        """
+        Opens output for writing. It is added to cache atomically if no
+        exception is raised in context.
+        """
+
+        with open_atomically(self._entry_path(key)) as file:
+            yield file
+
+        with self._lock():
+            self._evict()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / f"{key}.json"
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        with open(self.path / ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _evict(self):
+        entries: list[tuple[float, int, Path]] = []
+
+        for path in self.path.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()
+
+        total_size = sum(size for _, size, _ in entries)
+
+        # Most recent entry is kept even if it alone exceeds `max_size`.
+        for _, size, path in entries[:-1]:
+            if total_size <= self.max_size:
+                break
+
+            path.unlink(missing_ok=True)
+
+            total_size -= size
+
+
+def synthesis_key(
+    files: list[Path], top_module: str, yosys_version: str, *texts: str
+) -> str:
+    """
+    Hashes contents of `files` (and files they include), `top_module`,
+    `yosys_version` and `texts` (yosys script, cell libraries, techmap files).
+    """
+
+    hash = sha256()
+
+    def update(data: bytes):
+        hash.update(len(data).to_bytes(8, "little"))
+        hash.update(data)
+
+    for file in files:
+        update(str(file).encode())
+
+        for included_file in included_files(file):
+            update(str(included_file).encode())
+            update(included_file.read_bytes())
+
+    update(top_module.encode())
+    update(yosys_version.encode())
+
+    for text in texts:
+        update(text.encode())
+
+    return hash.hexdigest()
+
+
+def included_files(file: Path) -> list[Path]:
+    """
+    Returns `file` and files included by it with `include directive which
+    exist relative to including file.
+    """
+
+    result: list[Path] = []
+    stack = [file]
+    visited: set[Path] = set()
+
+    while len(stack) != 0:
+        file = stack.pop()
+
+        if file in visited or not file.is_file():
+            continue
+
+        visited.add(file)
+        result.append(file)
+
+        for name in _INCLUDE_REGEX.findall(file.read_text(errors="replace")):
+            stack.append(file.parent / name)
+
+    return result
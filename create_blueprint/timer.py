@@ -1,15 +1,21 @@
-from typing import Union
-
 from .logic import Logic, LogicId
 
+MAX_TIMER_TICKS = 2400
+
 
 class Timer(Logic):
     """
     Note that timer with 0 ticks still behaves like logic gate (has 1 tick delay).
     """
 
+    __slots__ = ("ticks",)
+
     ticks: int
 
+    @property
+    def delay(self) -> int:
+        return self.ticks + 1
+
     def __init__(self, id: LogicId, ticks: int = 0) -> None:
         super().__init__(id)
 
@@ -17,6 +23,3 @@ class Timer(Logic):
 
     def _render_name(self) -> str:
         return f"Timer: {self.ticks} ticks"
-
-    def _compute_output_ready_time(self) -> Union[int, None]:
-        return self._max_arrival_time(-self.ticks - 1) + self.ticks + 1
@@ -0,0 +1,717 @@
+from dataclasses import dataclass
+from heapq import heapify, heappop, heappush
+from typing import TYPE_CHECKING, Callable, Iterable, Union
+
+from .sync_sr_latch_output import SyncSRLatchOutput
+from .group_gate import GroupGate
+from .logic import Logic, LogicId
+from .timer import Timer
+from .gate import Gate
+
+if TYPE_CHECKING:
+    from .circuit import Circuit
+
+_LATCH_DELAY = 3
+_RANK_SPACING = 1 << 16
+
+Node = int
+"""
+Node of timing graph. Non-negative nodes are `LogicId`s, negative node `-1 - i`
+is group `i` (output ready time shared by all `GroupGate`s of one group).
+"""
+
+
+@dataclass(frozen=True)
+class CriticalPathEntry:
+    id: LogicId
+    mode: str
+    arrival: int
+    ready: int
+
+
+class Timing:
+    """
+    Output ready times of circuit logic.
+
+    Logic that depends on latches is timed relatively to the tick at which latch
+    outputs get their values, other logic is timed relatively to inputs. Logic
+    only takes into account inputs with same kind of timing.
+
+    Computed without recursion. Circuit edits are reported with `add`, `remove`
+    and `invalidate`, after which only logic which values actually change gets
+    recomputed (in topological order, tracked with ranks).
+    """
+
+    _circuit: "Circuit"
+    _depends_on_latch: list[bool]
+    _arrival: list[int]
+    _own_ready: list[int]
+    _ready: list[int]
+    _ready_counts: dict[int, int]
+    _groups: list[dict[LogicId, GroupGate]]
+    _groups_own_ready_counts: list[dict[int, int]]
+    _group_ready: list[int]
+    _group_indices: dict[int, int]
+    _group_of: dict[LogicId, int]
+    _latches_of: dict[LogicId, list[SyncSRLatchOutput]]
+    _depends_on_latch_rank: dict[LogicId, int]
+    _ready_rank: dict[Node, int]
+    _depends_on_latch_max_rank: int
+    _ready_max_rank: int
+    _dirty: dict[LogicId, None]
+    _dirty_groups: dict[int, None]
+
+    @property
+    def output_ready_time(self) -> int:
+        self.update()
+
+        return max(self._ready_counts, default=0)
+
+    def __init__(self, circuit: "Circuit") -> None:
+        self._circuit = circuit
+        self._depends_on_latch = []
+        self._arrival = []
+        self._own_ready = []
+        self._ready = []
+        self._ready_counts = {}
+        self._groups = []
+        self._groups_own_ready_counts = []
+        self._group_ready = []
+        self._group_indices = {}
+        self._group_of = {}
+        self._latches_of = {}
+        self._depends_on_latch_rank = {}
+        self._ready_rank = {}
+        self._depends_on_latch_max_rank = 0
+        self._ready_max_rank = 0
+        self._dirty = {}
+        self._dirty_groups = {}
+
+        for logic in circuit.all_logic.values():
+            self._register(logic)
+
+        self._compute_all()
+
+    def add(self, logic: Logic):
+        """
+        Must be called after `logic` is added to circuit.
+        """
+
+        self._register(logic)
+
+        self._dirty[logic.id] = None
+
+    def remove(self, logic: Logic):
+        """
+        Must be called after `logic` is removed from circuit.
+        """
+
+        self._count(self._ready_counts, self._get_ready(logic.id), -1)
+
+        group_index = self._group_of.pop(logic.id, None)
+
+        if group_index is not None:
+            del self._groups[group_index][logic.id]
+
+            self._count(
+                self._groups_own_ready_counts[group_index],
+                self._own_ready[logic.id],
+                -1,
+            )
+
+            self._dirty_groups[group_index] = None
+
+        if isinstance(logic, SyncSRLatchOutput):
+            self._latches_of[logic.clk_and_set.id].remove(logic)
+
+        self._depends_on_latch_rank.pop(logic.id, None)
+        self._ready_rank.pop(logic.id, None)
+        self._dirty.pop(logic.id, None)
+
+        for output in logic.outputs:
+            self._dirty[output.id] = None
+
+    def invalidate(self, logic: Logic):
+        """
+        Must be called after inputs or delay of `logic` change.
+        """
+
+        self._dirty[logic.id] = None
+
+    def update(self):
+        """
+        Recomputes timings of logic affected by edits since last update.
+        """
+
+        if len(self._dirty) == 0 and len(self._dirty_groups) == 0:
+            return
+
+        all_logic = self._circuit.all_logic
+
+        dirty = [id for id in self._dirty if id in all_logic]
+        dirty_groups = list(self._dirty_groups)
+
+        self._dirty = {}
+        self._dirty_groups = {}
+
+        self._depends_on_latch_max_rank = _repair_ranks(
+            self._depends_on_latch_rank,
+            self._depends_on_latch_max_rank,
+            dirty,
+            self._depends_on_latch_predecessors,
+            self._depends_on_latch_successors,
+        )
+        depends_on_latch_changed = _propagate(
+            self._depends_on_latch_rank,
+            dirty,
+            self._evaluate_depends_on_latch,
+            self._depends_on_latch_successors,
+        )
+
+        seeds: list[Node] = dirty + [-1 - i for i in dirty_groups]
+
+        for id in depends_on_latch_changed:
+            seeds.append(id)
+            seeds.extend(output.id for output in all_logic[id].outputs)
+
+        seeds = list(dict.fromkeys(seeds))
+
+        self._ready_max_rank = _repair_ranks(
+            self._ready_rank,
+            self._ready_max_rank,
+            seeds,
+            self._ready_predecessors,
+            self._ready_successors,
+        )
+        _propagate(self._ready_rank, seeds, self._evaluate, self._ready_successors)
+
+    def depends_on_latch(self, logic: Logic) -> bool:
+        self.update()
+
+        return self._depends_on_latch[logic.id]
+
+    def arrival_time(self, logic: Logic) -> int:
+        """
+        Max ready time of inputs (0 if there are no inputs).
+        """
+
+        self.update()
+
+        return self._arrival[logic.id]
+
+    def ready_time(self, logic: Logic) -> int:
+        self.update()
+
+        return self._get_ready(logic.id)
+
+    def critical_path(self) -> list[CriticalPathEntry]:
+        """
+        Path (from source to sink) which ends in logic with max ready time.
+        """
+
+        self.update()
+
+        all_logic = self._circuit.all_logic
+        logic: Union[Logic, None] = max(
+            all_logic.values(),
+            key=lambda logic: self._get_ready(logic.id),
+            default=None,
+        )
+
+        # All members of group have the same ready time.
+        if logic is not None:
+            logic = self._group_critical_member(logic)
+
+        result: list[CriticalPathEntry] = []
+
+        while logic is not None:
+            result.append(
+                CriticalPathEntry(
+                    logic.id,
+                    _mode_name(logic),
+                    self._arrival[logic.id],
+                    self._get_ready(logic.id),
+                )
+            )
+
+            if isinstance(logic, SyncSRLatchOutput):
+                logic = self._group_critical_member(logic.clk_and_set)
+
+                continue
+
+            logic = max(
+                self._timing_inputs(logic),
+                key=lambda input: self._get_ready(input.id),
+                default=None,
+            )
+
+            if logic is not None:
+                logic = self._group_critical_member(logic)
+
+        result.reverse()
+
+        return result
+
+    def slacks(self) -> dict[LogicId, int]:
+        """
+        Count of ticks by which output of each logic can be delayed without
+        increasing circuit delay.
+        """
+
+        output_ready_time = self.output_ready_time
+        required = self.required_times()
+
+        return {
+            id: required.get(id, output_ready_time) - self._own_ready[id]
+            for id in self._circuit.all_logic
+        }
+
+    def required_times(self) -> dict[Node, int]:
+        """
+        Max own ready time of each logic (and group node) which doesn't increase
+        circuit delay, logic missing in result isn't limited by anything.
+
+        Result stays valid after edits which don't change fan-out cone of logic.
+        """
+
+        output_ready_time = self.output_ready_time
+        required: dict[Node, int] = {}
+
+        for node in sorted(self._ready_rank, key=self._ready_rank.__getitem__)[::-1]:
+            input_required = required.get(node, output_ready_time) - self._weight(node)
+
+            for input in self._ready_predecessors(node):
+                required[input] = min(
+                    required.get(input, output_ready_time), input_required
+                )
+
+        return required
+
+    def connection_slacks(
+        self, logic: Logic, required_times: dict[Node, int]
+    ) -> list[int]:
+        """
+        Count of ticks by which each connection from `logic` to its outputs (in
+        order of `logic.outputs`) can be delayed without increasing circuit
+        delay. `required_times` must be result of `required_times` made before
+        any edits of fan-out cone of `logic`.
+        """
+
+        output_ready_time = self.output_ready_time
+        node = self._node(logic)
+        ready = self._get_ready(logic.id)
+
+        result: list[int] = []
+
+        for output in logic.outputs:
+            if node in self._ready_predecessors(output.id):
+                result.append(
+                    required_times.get(output.id, output_ready_time)
+                    - self._weight(output.id)
+                    - ready
+                )
+            else:
+                result.append(output_ready_time - ready)
+
+        return result
+
+    def slack_histogram(self, buckets_count: int = 10) -> list[tuple[int, int, int]]:
+        """
+        Returns list of `(min_slack, max_slack, logic_count)`.
+        """
+
+        slacks = list(self.slacks().values())
+
+        if len(slacks) == 0:
+            return []
+
+        max_slack = max(slacks)
+        bucket_size = max(1, -(-(max_slack + 1) // buckets_count))
+
+        counts = [0] * (max_slack // bucket_size + 1)
+
+        for slack in slacks:
+            counts[slack // bucket_size] += 1
+
+        return [
+            (i * bucket_size, min(max_slack, (i + 1) * bucket_size - 1), count)
+            for i, count in enumerate(counts)
+        ]
+
+    def _register(self, logic: Logic):
+        if logic.id >= len(self._ready):
+            extension = logic.id + 1 - len(self._ready)
+
+            self._depends_on_latch.extend([False] * extension)
+            self._arrival.extend([0] * extension)
+            self._own_ready.extend([0] * extension)
+            self._ready.extend([0] * extension)
+
+        self._depends_on_latch[logic.id] = False
+        self._arrival[logic.id] = 0
+        self._own_ready[logic.id] = 0
+        self._ready[logic.id] = 0
+
+        if isinstance(logic, GroupGate):
+            group_index = self._group_indices.get(id(logic.group_gates))
+
+            if group_index is None:
+                group_index = len(self._groups)
+
+                self._group_indices[id(logic.group_gates)] = group_index
+                self._groups.append({})
+                self._groups_own_ready_counts.append({})
+                self._group_ready.append(0)
+
+            self._groups[group_index][logic.id] = logic
+            self._group_of[logic.id] = group_index
+            self._dirty_groups[group_index] = None
+
+            self._count(self._groups_own_ready_counts[group_index], 0, 1)
+        elif isinstance(logic, SyncSRLatchOutput):
+            self._latches_of.setdefault(logic.clk_and_set.id, []).append(logic)
+
+        self._count(self._ready_counts, self._get_ready(logic.id), 1)
+
+    def _weight(self, node: Node) -> int:
+        if node < 0:
+            return 0
+
+        logic = self._circuit.all_logic[node]
+
+        if isinstance(logic, SyncSRLatchOutput):
+            return _LATCH_DELAY
+
+        return logic.delay
+
+    def _compute_all(self):
+        all_logic = self._circuit.all_logic
+
+        order = topological_order(all_logic, self._depends_on_latch_predecessors)
+
+        for i, id in enumerate(order):
+            self._depends_on_latch_rank[id] = i * _RANK_SPACING
+
+            self._evaluate_depends_on_latch(id)
+
+        self._depends_on_latch_max_rank = len(order) * _RANK_SPACING
+
+        nodes: list[Node] = list(all_logic)
+        nodes.extend(-1 - i for i in range(len(self._groups)))
+
+        order = topological_order(nodes, self._ready_predecessors)
+
+        for i, node in enumerate(order):
+            self._ready_rank[node] = i * _RANK_SPACING
+
+            self._evaluate(node)
+
+        self._ready_max_rank = len(order) * _RANK_SPACING
+
+        self._dirty = {}
+        self._dirty_groups = {}
+
+    def _depends_on_latch_predecessors(self, id: LogicId) -> list[Node]:
+        logic = self._circuit.all_logic[id]
+
+        if isinstance(logic, SyncSRLatchOutput):
+            return []
+
+        return [input.id for input in logic.inputs]
+
+    def _depends_on_latch_successors(self, id: LogicId) -> list[Node]:
+        return [
+            output.id
+            for output in self._circuit.all_logic[id].outputs
+            if not isinstance(output, SyncSRLatchOutput)
+        ]
+
+    def _ready_predecessors(self, node: Node) -> list[Node]:
+        if node < 0:
+            return list(self._groups[-1 - node])
+
+        logic = self._circuit.all_logic[node]
+
+        if isinstance(logic, SyncSRLatchOutput):
+            return [self._node(logic.clk_and_set)]
+
+        return [self._node(input) for input in self._timing_inputs(logic)]
+
+    def _ready_successors(self, node: Node) -> list[Node]:
+        if node < 0:
+            return [
+                successor
+                for gate in self._groups[-1 - node].values()
+                for successor in self._logic_ready_successors(gate)
+            ]
+
+        group_index = self._group_of.get(node)
+
+        if group_index is not None:
+            return [-1 - group_index]
+
+        return self._logic_ready_successors(self._circuit.all_logic[node])
+
+    def _logic_ready_successors(self, logic: Logic) -> list[Node]:
+        depends_on_latch = self._depends_on_latch[logic.id]
+
+        result = [
+            output.id
+            for output in logic.outputs
+            if not isinstance(output, SyncSRLatchOutput)
+            and self._depends_on_latch[output.id] == depends_on_latch
+        ]
+        result.extend(latch.id for latch in self._latches_of.get(logic.id, ()))
+
+        return result
+
+    def _evaluate_depends_on_latch(self, id: LogicId) -> bool:
+        logic = self._circuit.all_logic[id]
+
+        if isinstance(logic, SyncSRLatchOutput):
+            depends_on_latch = True
+        else:
+            depends_on_latch = len(logic.inputs) != 0 and all(
+                self._depends_on_latch[input.id] for input in logic.inputs
+            )
+
+        if self._depends_on_latch[id] == depends_on_latch:
+            return False
+
+        self._depends_on_latch[id] = depends_on_latch
+
+        return True
+
+    def _evaluate(self, node: Node) -> bool:
+        if node < 0:
+            return self._evaluate_group(-1 - node)
+
+        logic = self._circuit.all_logic[node]
+
+        if isinstance(logic, SyncSRLatchOutput):
+            arrival = self._get_ready(logic.clk_and_set.id)
+            own_ready = arrival + _LATCH_DELAY
+        else:
+            max_arrival = max(
+                (self._get_ready(input.id) for input in self._timing_inputs(logic)),
+                default=None,
+            )
+
+            arrival = 0 if max_arrival is None else max_arrival
+            own_ready = 0 if max_arrival is None else max_arrival + logic.delay
+
+        self._arrival[node] = arrival
+
+        old_own_ready = self._own_ready[node]
+
+        if old_own_ready == own_ready:
+            return False
+
+        self._own_ready[node] = own_ready
+
+        group_index = self._group_of.get(node)
+
+        if group_index is None:
+            self._count(self._ready_counts, old_own_ready, -1)
+            self._count(self._ready_counts, own_ready, 1)
+
+            self._ready[node] = own_ready
+        else:
+            own_ready_counts = self._groups_own_ready_counts[group_index]
+
+            self._count(own_ready_counts, old_own_ready, -1)
+            self._count(own_ready_counts, own_ready, 1)
+
+        return True
+
+    def _evaluate_group(self, group_index: int) -> bool:
+        old_ready = self._group_ready[group_index]
+        ready = max(self._groups_own_ready_counts[group_index], default=0)
+
+        if old_ready == ready:
+            return False
+
+        self._group_ready[group_index] = ready
+
+        group_size = len(self._groups[group_index])
+
+        self._count(self._ready_counts, old_ready, -group_size)
+        self._count(self._ready_counts, ready, group_size)
+
+        return True
+
+    def _get_ready(self, id: LogicId) -> int:
+        group_index = self._group_of.get(id)
+
+        if group_index is None:
+            return self._ready[id]
+
+        return self._group_ready[group_index]
+
+    @staticmethod
+    def _count(counts: dict[int, int], value: int, delta: int):
+        if delta == 0:
+            return
+
+        count = counts.get(value, 0) + delta
+
+        if count == 0:
+            del counts[value]
+        else:
+            counts[value] = count
+
+    def _timing_inputs(self, logic: Logic) -> list[Logic]:
+        depends_on_latch = self._depends_on_latch[logic.id]
+
+        return [
+            input
+            for input in logic.inputs
+            if self._depends_on_latch[input.id] == depends_on_latch
+        ]
+
+    def _group_critical_member(self, logic: Logic) -> Logic:
+        group_index = self._group_of.get(logic.id)
+
+        if group_index is None:
+            return logic
+
+        return max(
+            self._groups[group_index].values(),
+            key=lambda gate: self._own_ready[gate.id],
+        )
+
+    def _node(self, logic: Logic) -> Node:
+        group_index = self._group_of.get(logic.id)
+
+        if group_index is None:
+            return logic.id
+
+        return -1 - group_index
+
+
+def topological_order(
+    nodes: Iterable[Node], predecessors: Callable[[Node], list[Node]]
+) -> list[Node]:
+    pending_inputs: dict[Node, int] = {}
+    successors: dict[Node, list[Node]] = {}
+    ready: list[Node] = []
+
+    for node in nodes:
+        node_predecessors = predecessors(node)
+
+        for predecessor in node_predecessors:
+            successors.setdefault(predecessor, []).append(node)
+
+        if len(node_predecessors) == 0:
+            ready.append(node)
+        else:
+            pending_inputs[node] = len(node_predecessors)
+
+    result: list[Node] = []
+
+    while len(ready) != 0:
+        node = ready.pop()
+
+        result.append(node)
+
+        for successor in successors.get(node, ()):
+            pending_inputs[successor] -= 1
+
+            if pending_inputs[successor] == 0:
+                del pending_inputs[successor]
+
+                ready.append(successor)
+
+    if len(pending_inputs) != 0:
+        raise ValueError(
+            f"circuit contains combinational loop ({len(pending_inputs)} logic affected)"
+        )
+
+    return result
+
+
+def _repair_ranks(
+    rank: dict[Node, int],
+    max_rank: int,
+    nodes: list[Node],
+    predecessors: Callable[[Node], list[Node]],
+    successors: Callable[[Node], list[Node]],
+) -> int:
+    """
+    Restores `rank[predecessor] < rank[node]` for every edge after edges going
+    into `nodes` changed. `max_rank` must not be less than any rank, returns
+    new such bound.
+
+    Without loops no rank can grow beyond `max_rank` by more than longest path
+    length, so this is used to detect loops.
+    """
+
+    for node in nodes:
+        rank.setdefault(node, 0)
+
+    stack = list(nodes)
+    limit = max_rank + len(rank) + 1
+
+    while len(stack) != 0:
+        node = stack.pop()
+
+        min_rank = max((rank.get(input, 0) for input in predecessors(node)), default=-1)
+
+        if rank[node] > min_rank:
+            continue
+
+        rank[node] = min_rank + 1
+
+        if rank[node] > limit:
+            raise ValueError("circuit contains combinational loop")
+
+        max_rank = max(max_rank, rank[node])
+
+        stack.extend(successors(node))
+
+    return max_rank
+
+
+def _propagate(
+    rank: dict[Node, int],
+    nodes: list[Node],
+    evaluate: Callable[[Node], bool],
+    successors: Callable[[Node], list[Node]],
+) -> list[Node]:
+    """
+    Evaluates `nodes` and successors of every node which value has changed, in
+    topological order. Returns changed nodes.
+    """
+
+    queue = [(rank[node], node) for node in nodes]
+    queued = set(nodes)
+    changed: list[Node] = []
+
+    heapify(queue)
+
+    while len(queue) != 0:
+        _, node = heappop(queue)
+
+        if not evaluate(node):
+            continue
+
+        changed.append(node)
+
+        for successor in successors(node):
+            if successor not in queued:
+                queued.add(successor)
+
+                heappush(queue, (rank[successor], successor))
+
+    return changed
+
+
+def _mode_name(logic: Logic) -> str:
+    if isinstance(logic, SyncSRLatchOutput):
+        return "SYNC_SR_LATCH"
+    if isinstance(logic, Gate):
+        return logic.mode.name
+    if isinstance(logic, Timer):
+        return f"TIMER({logic.ticks})"
+
+    return type(logic).__name__
@@ -1,10 +1,15 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
 from enum import StrEnum
-from typing import Callable, TypeVar, Union
-from bitstring import BitArray
+from pathlib import Path
+from typing import Callable, TextIO, TypeVar, Union
+import os
+import tempfile
 
 from .gate import Gate
 from .port import Port
 
+RESOURCES_PATH = Path(__file__).resolve().parent.parent / "resources"
 
 K = TypeVar("K")
 V = TypeVar("V")
@@ -39,6 +44,10 @@ def get_yosys_integer_attribute(
     if name not in attributes:
         return default
 
+    # Imported here, so it isn't loaded by modules which don't parse yosys
+    # output.
+    from bitstring import BitArray
+
     return BitArray(bin=attributes[name]).int
 
 
@@ -60,3 +69,34 @@ def get_yosys_str_enum_attribute(
         raise ValueError(f'invalid value "{str_value}" for attribute "{name}"')
 
     return value
+
+
+@contextmanager
+def open_atomically(path: Path) -> Iterator[TextIO]:
+    """
+    Opens temporary file for writing and renames it to `path` when closed, so
+    other processes never see partially written file. Temporary file is
+    removed if exception is raised.
+    """
+
+    with tempfile.NamedTemporaryFile(
+        "w", dir=path.parent, prefix=".", suffix=".tmp", delete=False
+    ) as file:
+        try:
+            yield file
+        except BaseException:
+            file.close()
+
+            os.unlink(file.name)
+
+            raise
+
+    # Temporary files are created readable only by owner.
+    os.chmod(file.name, 0o644)
+
+    os.replace(file.name, path)
+
+
+def write_text_atomically(path: Path, text: str):
+    with open_atomically(path) as file:
+        file.write(text)
@@ -1,10 +1,33 @@
-from subprocess import run
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from fnmatch import fnmatchcase
+from functools import cache
+from hashlib import sha256
+from subprocess import PIPE, CalledProcessError, Popen, run
 from pathlib import Path
-from typing import Union
+from typing import IO, Any, TextIO, Union, cast
+import atexit
+import os
+import re
+import shutil
+import tempfile
 
+from .synthesis_cache import SynthesisCache, synthesis_key
+from .yosys_json import parse_yosys_output
+from .utils import RESOURCES_PATH, write_text_atomically
 from .gate import GateMode
 from .cell import Cell
 
+_FF_MAP_PATH = RESOURCES_PATH / "ff_map.sv"
+_BUF_MAP_PATH = RESOURCES_PATH / "buf_map.sv"
+_CELLS_LIBERTY_NAME = "scrap_mechanic_cells.lib"
+_CELLS_VERILOG_NAME = "scrap_mechanic_cells.sv"
+_COPY_CHUNK_SIZE = 1 << 16
+_SELECTION_SPECIAL_CHARS_REGEX = re.compile(r"[*?\[\]%]")
+_FILE_NAME_SPECIAL_CHARS_REGEX = re.compile(r"[^\w.=-]")
+_MAX_FILE_NAME_LENGTH = 64
+_LOG_SECTION_REGEX = re.compile(r"^\d+(?:\.\d+)*\. (.*)$", re.MULTILINE)
+
 
 def _create_gate_formula(mode: GateMode, inputs: list[str]) -> str:
     match mode:
@@ -52,18 +75,65 @@ def _create_cells_verilog(cells: dict[str, Cell]) -> str:
     return result
 
 
+def _write_cells_libraries(path: Path, cells_liberty: str, cells_verilog: str):
+    """
+    Writes cell libraries to `path` directory if they are not there yet.
+    """
+
+    # Verilog library is written last, so it exists only if both are written.
+    if (path / _CELLS_VERILOG_NAME).exists():
+        return
+
+    path.mkdir(parents=True, exist_ok=True)
+
+    write_text_atomically(path / _CELLS_LIBERTY_NAME, cells_liberty)
+    write_text_atomically(path / _CELLS_VERILOG_NAME, cells_verilog)
+
+
+def temporary_cells_path(cells: dict[str, Cell]) -> Path:
+    """
+    Returns temporary directory with cell libraries for builds without cache.
+    Libraries are written once for every set of cells in process and are
+    removed when it exits. Forked processes (daemon requests) exit without
+    removing them, so they should reuse directories created before fork.
+    """
+
+    return _temporary_cells_path(
+        _create_cells_liberty(cells), _create_cells_verilog(cells)
+    )
+
+
+@cache
+def _temporary_cells_path(cells_liberty: str, cells_verilog: str) -> Path:
+    path = Path(tempfile.mkdtemp(prefix="sm-verilog-cells-"))
+
+    atexit.register(shutil.rmtree, path, True)
+
+    _write_cells_libraries(path, cells_liberty, cells_verilog)
+
+    return path
+
+
 def _create_yosys_script(
     top_module: str,
     files: list[str],
+    cells_path: Path,
     module_flowchart_prefix: Union[str, None],
-    blueprints_path: Path,
+    module: Union[str, None],
+    parameters: dict[str, str],
 ) -> str:
-    return f"""
-read_verilog -sv {" ".join(f'"{file}"' for file in files)}
+    """
+    Returns script which synthesizes flattened design or, if `module` is
+    given, only that module with every other module turned into blackbox.
+    Generated names of module are enumerated from zero, so they don't depend
+    on count of names generated while other modules are read.
+    """
 
-hierarchy -check -top {top_module}
+    return f"""
+{_create_hierarchy_script(top_module, files, parameters)}
+{f"blackbox {_selection_pattern(module)} %n" if module is not None else ""}
 proc
-flatten
+{"flatten" if module is None else ""}
 opt_expr
 opt_clean
 check
@@ -85,34 +155,381 @@ techmap; opt -full
 
 dfflegalize -cell $_DFF_P_ x
 opt -nodffe -nosdff -full
-techmap -map resources/ff_map.sv
+techmap -map "{_FF_MAP_PATH}"
 techmap; opt -full
-abc -liberty resources/scrap_mechanic_cells.lib -dff
-techmap -map resources/buf_map.sv
+abc -liberty "{cells_path / _CELLS_LIBERTY_NAME}" -dff
+techmap -map "{_BUF_MAP_PATH}"
 opt -full
+{"rename -enumerate" if module is not None else ""}
 
-{f"show -lib resources/scrap_mechanic_cells.sv -format dot -viewer none -stretch -prefix {module_flowchart_prefix} {top_module}" if module_flowchart_prefix is not None else ""}
-write_json {blueprints_path / top_module / f"{top_module}.json"}
+{f'show -lib "{cells_path / _CELLS_VERILOG_NAME}" -format dot -viewer none -stretch -prefix {module_flowchart_prefix} {top_module}' if module_flowchart_prefix is not None else ""}
 stat
+write_json
 """
 
 
+def _create_hierarchy_script(
+    top_module: str, files: list[str], parameters: dict[str, str]
+) -> str:
+    return f"""
+read_verilog -sv {" ".join(f'"{file}"' for file in files)}
+
+hierarchy -check -top {top_module}{"".join(f" -chparam {name} {value}" for name, value in parameters.items())}
+"""
+
+
+def _create_modules_script(
+    top_module: str, files: list[str], parameters: dict[str, str]
+) -> str:
+    """
+    Returns script which outputs every module of design (with unique set of
+    parameters) as blackbox.
+    """
+
+    return f"""
+{_create_hierarchy_script(top_module, files, parameters)}
+blackbox *
+write_json
+"""
+
+
+def _selection_pattern(module: str) -> str:
+    """
+    Returns yosys selection pattern which matches only `module`. Characters
+    which have special meaning in patterns are replaced with `?`.
+    """
+
+    return _SELECTION_SPECIAL_CHARS_REGEX.sub("?", module)
+
+
+def _module_file_name(module: str) -> str:
+    """
+    Returns name of files of `module` synthesis which is safe to use on any
+    file system.
+    """
+
+    name = _FILE_NAME_SPECIAL_CHARS_REGEX.sub("_", module)
+
+    if name == module and len(name) <= _MAX_FILE_NAME_LENGTH:
+        return name
+
+    module_hash = sha256(module.encode()).hexdigest()[:8]
+
+    return f"{name[:_MAX_FILE_NAME_LENGTH]}-{module_hash}"
+
+
+def yosys_version() -> str:
+    """
+    Returns version of yosys found in PATH. Version is cached until yosys
+    executable changes, which matters for long-lived processes.
+    """
+
+    path = shutil.which("yosys")
+
+    if path is None:
+        return _run_yosys_version("yosys")
+
+    return _cached_yosys_version(path, os.stat(path).st_mtime_ns)
+
+
+@cache
+def _cached_yosys_version(path: str, mtime: int) -> str:
+    return _run_yosys_version(path)
+
+
+def _run_yosys_version(path: str) -> str:
+    return run([path, "-V"], check=True, capture_output=True, text=True).stdout.strip()
+
+
+def build_graph_key(
+    top_module: str,
+    files: list[str],
+    cells: dict[str, Cell],
+    parameters: dict[str, str] = {},
+) -> str:
+    """
+    Hashes everything that affects synthesis of hierarchical design except
+    contents of source files, see `BuildGraph`.
+    """
+
+    return synthesis_key(
+        [],
+        top_module,
+        yosys_version(),
+        _create_yosys_script(top_module, files, Path(), None, top_module, parameters),
+        _create_cells_liberty(cells),
+        _create_cells_verilog(cells),
+        _FF_MAP_PATH.read_text(),
+        _BUF_MAP_PATH.read_text(),
+    )
+
+
 def compile(
     top_module: str,
     files: list[str],
     cells: dict[str, Cell],
     module_flowchart_prefix: Union[str, None],
-    blueprints_path: Path,
-) -> str:
-    Path("resources/scrap_mechanic_cells.lib").write_text(_create_cells_liberty(cells))
-    Path("resources/scrap_mechanic_cells.sv").write_text(_create_cells_verilog(cells))
-
-    run(
-        ["yosys", "-s", "-"],
-        check=True,
-        input=_create_yosys_script(
-            top_module, files, module_flowchart_prefix, blueprints_path
-        ).encode(),
+    blueprint_path: Union[Path, None],
+    cache: Union[SynthesisCache, None] = None,
+    hierarchical: bool = False,
+    blackboxes: list[str] = [],
+    parameters: dict[str, str] = {},
+    statistics: Union[list[str], None] = None,
+) -> dict[str, Any]:
+    """
+    Runs yosys and returns its output parsed by `parse_yosys_output`. JSON is
+    read from yosys stdout while it is written. If `blueprint_path` directory
+    is given, JSON is also saved to it and yosys log is written to `yosys.log`
+    in it.
+
+    Cell libraries are written to `cache` directory (once for every set of
+    cells) or to temporary directory of process (see `temporary_cells_path`),
+    so concurrent builds with different cells don't interfere. If `cache` is given, yosys is not run when same
+    output is already cached. Cached output is not used when module flowchart
+    is requested, because flowchart is created by yosys itself.
+
+    If `hierarchical` is set, design is not flattened: every unique module
+    (and set of its parameters) is synthesized once by separate yosys job in
+    which every other module is blackbox, so netlist of module doesn't depend
+    on which other modules are synthesized. Jobs run in parallel, their JSON
+    and logs are saved to `synthesis` directory in `blueprint_path`. Output
+    contains all modules. Modules named in `blackboxes` are not synthesized
+    and are left empty. `parameters` override parameters of top module,
+    values are Verilog constants.
+
+    Yosys is run quietly. If `statistics` is given, output of yosys `stat`
+    command is appended to it for every job which was run and has log.
+    """
+
+    cells_liberty = _create_cells_liberty(cells)
+    cells_verilog = _create_cells_verilog(cells)
+
+    if cache is not None:
+        cells_hash = sha256((cells_liberty + cells_verilog).encode()).hexdigest()
+        cells_path = cache.path / "cells" / cells_hash
+
+        _write_cells_libraries(cells_path, cells_liberty, cells_verilog)
+    else:
+        cells_path = _temporary_cells_path(cells_liberty, cells_verilog)
+
+    def run_job(
+        script: str,
+        output_path: Union[Path, None],
+        log_path: Union[Path, None],
+        cache: Union[SynthesisCache, None],
+    ) -> tuple[dict[str, Any], Union[str, None]]:
+        return _run_yosys(
+            top_module,
+            files,
+            script,
+            cells_liberty,
+            cells_verilog,
+            output_path,
+            log_path,
+            cache,
+            hierarchical,
+        )
+
+    def add_statistics(job_statistics: Union[str, None]):
+        if statistics is not None and job_statistics is not None:
+            statistics.append(job_statistics)
+
+    if not hierarchical:
+        output_path = None
+        log_path = None
+
+        if blueprint_path is not None:
+            output_path = blueprint_path / f"{top_module}.json"
+            log_path = blueprint_path / "yosys.log"
+
+        script = _create_yosys_script(
+            top_module, files, cells_path, module_flowchart_prefix, None, parameters
+        )
+
+        yosys_output, job_statistics = run_job(
+            script,
+            output_path,
+            log_path,
+            cache if module_flowchart_prefix is None else None,
+        )
+
+        add_statistics(job_statistics)
+
+        return yosys_output
+
+    modules = run_job(
+        _create_modules_script(top_module, files, parameters), None, None, cache
+    )[0]["modules"]
+
+    synthesis_path = None
+
+    if blueprint_path is not None:
+        synthesis_path = blueprint_path / "synthesis"
+
+        synthesis_path.mkdir(exist_ok=True)
+
+    def synthesize(module: str) -> tuple[dict[str, Any], Union[str, None]]:
+        pattern = _selection_pattern(module)
+
+        if any(fnmatchcase(name, pattern) for name in modules.keys() - {module}):
+            raise ValueError(f'module "{module}" can\'t be selected in yosys script')
+
+        # Flowchart is created only for top module.
+        flowchart_prefix = module_flowchart_prefix if module == top_module else None
+        output_path = None
+        log_path = None
+
+        if synthesis_path is not None:
+            file_name = _module_file_name(module)
+            output_path = synthesis_path / f"{file_name}.json"
+            log_path = synthesis_path / f"{file_name}.log"
+
+        script = _create_yosys_script(
+            top_module, files, cells_path, flowchart_prefix, module, parameters
+        )
+
+        yosys_output, job_statistics = run_job(
+            script,
+            output_path,
+            log_path,
+            cache if flowchart_prefix is None else None,
+        )
+
+        return yosys_output["modules"][module], job_statistics
+
+    synthesized = sorted(modules.keys() - set(blackboxes))
+
+    with ThreadPoolExecutor(os.cpu_count()) as executor:
+        for module, (output, job_statistics) in zip(
+            synthesized, executor.map(synthesize, synthesized)
+        ):
+            modules[module] = output
+
+            add_statistics(job_statistics)
+
+    return {"modules": modules}
+
+
+def _run_yosys(
+    top_module: str,
+    files: list[str],
+    script: str,
+    cells_liberty: str,
+    cells_verilog: str,
+    output_path: Union[Path, None],
+    log_path: Union[Path, None],
+    cache: Union[SynthesisCache, None],
+    keep_submodules: bool,
+) -> tuple[dict[str, Any], Union[str, None]]:
+    """
+    Runs yosys `script` (or reads its output from `cache`) and returns its
+    output parsed by `parse_yosys_output` and output of `stat` command (`None`
+    if output is read from cache or script has no `stat`). JSON is also saved to
+    `output_path` and yosys log is written to `log_path` if they are given.
+    """
+
+    with ExitStack() as stack:
+        outputs: list[TextIO] = []
+
+        if output_path is not None:
+            outputs.append(stack.enter_context(output_path.open("w")))
+
+        if cache is not None:
+            key = synthesis_key(
+                [Path(file) for file in files],
+                top_module,
+                yosys_version(),
+                script,
+                cells_liberty,
+                cells_verilog,
+                _FF_MAP_PATH.read_text(),
+                _BUF_MAP_PATH.read_text(),
+            )
+
+            cached_output = cache.open(key)
+
+            if cached_output is not None:
+                with cached_output:
+                    return (
+                        _read_yosys_output(
+                            cached_output, top_module, outputs, keep_submodules
+                        ),
+                        None,
+                    )
+
+            # Output is added to cache only if yosys succeeds.
+            outputs.append(stack.enter_context(cache.writer(key)))
+
+        # With -q only warnings and errors are printed, so stdout has only JSON.
+        # Output of `stat` is read from log instead.
+        if log_path is None:
+            log_fd, log_name = tempfile.mkstemp(prefix="sm-verilog-", suffix=".log")
+
+            os.close(log_fd)
+            stack.callback(os.remove, log_name)
+
+            log_path = Path(log_name)
+
+        yosys_args = ["yosys", "-q", "-s", "-", "-l", str(log_path)]
+
+        process = Popen(yosys_args, stdin=PIPE, stdout=PIPE, text=True)
+
+        with cast(IO[str], process.stdin) as stdin:
+            stdin.write(script)
+
+        with cast(TextIO, process.stdout) as stdout:
+            try:
+                yosys_output = _read_yosys_output(
+                    stdout, top_module, outputs, keep_submodules
+                )
+            except ValueError as error:
+                if process.wait() != 0:
+                    raise CalledProcessError(
+                        process.returncode, process.args
+                    ) from error
+
+                raise
+
+        if process.wait() != 0:
+            raise CalledProcessError(process.returncode, process.args)
+
+        return yosys_output, _read_statistics(log_path)
+
+
+def _read_statistics(log_path: Path) -> Union[str, None]:
+    """
+    Returns output of the last `stat` command from yosys log or `None` if
+    there is no such output.
+    """
+
+    sections = _LOG_SECTION_REGEX.split(log_path.read_text())
+    statistics = None
+
+    # Section titles and texts alternate after text before the first section.
+    for title, text in zip(sections[1::2], sections[2::2]):
+        if title == "Printing statistics.":
+            statistics = text.strip()
+
+    return statistics
+
+
+def _read_yosys_output(
+    stream: TextIO, top_module: str, outputs: list[TextIO], keep_submodules: bool
+) -> dict[str, Any]:
+    """
+    Parses yosys output from `stream` and copies it to `outputs`.
+    """
+
+    def write(chunk: str):
+        for output in outputs:
+            output.write(chunk)
+
+    yosys_output = parse_yosys_output(
+        stream, top_module, write if len(outputs) != 0 else None, keep_submodules
     )
 
-    return (blueprints_path / top_module / f"{top_module}.json").read_text()
+    if len(outputs) != 0:
+        while (chunk := stream.read(_COPY_CHUNK_SIZE)) != "":
+            write(chunk)
+
+    return yosys_output
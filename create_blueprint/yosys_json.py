@@ -0,0 +1,397 @@
+from collections.abc import Iterator
+from json import JSONDecodeError, JSONDecoder
+from typing import Any, Callable, TextIO, Union
+import re
+
+_CHUNK_SIZE = 1 << 16
+_WHITESPACE = " \t\n\r"
+_WHITESPACE_REGEX = re.compile(r"\s*")
+# Matches end of previous object member (if any) and key of next one.
+_FIRST_MEMBER_REGEX = re.compile(r'\s*(?:(\})|"((?:[^"\\]|\\.)*)"\s*:\s*)')
+_NEXT_MEMBER_REGEX = re.compile(r'\s*(?:(\})|,\s*"((?:[^"\\]|\\.)*)"\s*:\s*)')
+# Characters which change state of scanner looking for end of value.
+_STRUCTURE_REGEX = re.compile(r'["\[\]{}]')
+_STRING_SPECIAL_REGEX = re.compile(r'["\\]')
+
+
+def parse_yosys_output(
+    stream: TextIO,
+    top_module: str,
+    on_chunk: Union[Callable[[str], Any], None] = None,
+    keep_submodules: bool = False,
+) -> dict[str, Any]:
+    """
+    Reads yosys JSON output from `stream` chunk by chunk and returns it with
+    only `top_module` (and other modules if `keep_submodules` is set). Only
+    `attributes`, `ports` and `cells` of modules and attributes of top module
+    ports in `netnames` are kept. Everything else is skipped without decoding
+    and dropped while it is read, so whole document is never kept in memory.
+    Every chunk read is passed to `on_chunk`.
+    """
+
+    reader = _Reader(stream, on_chunk)
+    modules: dict[str, dict[str, Any]] = {}
+
+    for key in reader.object_keys():
+        if key != "modules":
+            reader.skip_value()
+
+            continue
+
+        for module_name in reader.object_keys():
+            if module_name != top_module and not keep_submodules:
+                reader.skip_value()
+
+                continue
+
+            module = modules[module_name] = {}
+
+            for section in reader.object_keys():
+                if section in ("attributes", "ports"):
+                    module[section] = reader.value()
+                elif section == "cells":
+                    module["cells"] = dict(reader.object_items())
+                elif section == "netnames" and module_name == top_module:
+                    ports = module.get("ports", {})
+                    netnames = {}
+
+                    for net_name, netname in reader.object_items():
+                        if net_name in ports:
+                            netnames[net_name] = {"attributes": netname["attributes"]}
+
+                    module["netnames"] = netnames
+                else:
+                    reader.skip_value()
+
+            for section in ("attributes", "ports", "cells", "netnames"):
+                module.setdefault(section, {})
+
+    reader.end()
+
+    if top_module not in modules:
+        raise ValueError(f'module "{top_module}" not found in yosys output')
+
+    return {"modules": modules}
+
+
+class _Reader:
+    """
+    Buffered reader of JSON document from text stream. Values are decoded
+    with scanner of `JSONDecoder`, more data is read when value is cut at the
+    end of buffer.
+    """
+
+    _stream: TextIO
+    _on_chunk: Union[Callable[[str], Any], None]
+    _decoder: JSONDecoder
+    _scan: Callable[[str, int], tuple[Any, int]]
+    _buffer: str
+    _position: int
+    _eof: bool
+
+    def __init__(
+        self, stream: TextIO, on_chunk: Union[Callable[[str], Any], None]
+    ) -> None:
+        self._stream = stream
+        self._on_chunk = on_chunk
+        self._decoder = JSONDecoder()
+        self._scan = self._decoder.raw_decode
+        self._buffer = ""
+        self._position = 0
+        self._eof = False
+
+    def object_keys(self) -> Iterator[str]:
+        """
+        Iterates over keys of object starting at current position. Value of
+        every key must be read before getting next key.
+        """
+
+        self._expect("{")
+
+        regex = _FIRST_MEMBER_REGEX
+
+        while True:
+            match = regex.match(self._buffer, self._position)
+
+            while match is None and self._read():
+                match = regex.match(self._buffer, self._position)
+
+            if match is None:
+                raise ValueError("invalid yosys output: invalid object member")
+
+            self._position = match.end()
+
+            if match.group(1) is not None:
+                return
+
+            key = match.group(2)
+
+            if "\\" in key:
+                key = self._decoder.decode(f'"{key}"')
+
+            yield key
+
+            regex = _NEXT_MEMBER_REGEX
+
+    def object_items(self) -> Iterator[tuple[str, Any]]:
+        """
+        Iterates over members of object starting at current position. Same as
+        `object_keys` followed by `value`, but faster.
+        """
+
+        self._expect("{")
+
+        regex = _FIRST_MEMBER_REGEX
+        scan = self._scan
+
+        while True:
+            buffer = self._buffer
+            match = regex.match(buffer, self._position)
+
+            if match is not None:
+                if match.group(1) is not None:
+                    self._position = match.end()
+
+                    return
+
+                value = None
+
+                try:
+                    value, end = scan(buffer, match.end())
+                except JSONDecodeError:
+                    end = len(buffer)
+
+                key = match.group(2)
+
+                if "\\" in key:
+                    key = self._decoder.decode(f'"{key}"')
+
+                # Member is complete only if something follows it in buffer.
+                if end < len(buffer):
+                    self._position = end
+                else:
+                    # Value is cut at the end of buffer, it is read by `value`
+                    # without scanning it again for every chunk.
+                    self._position = match.end()
+                    value = self.value()
+
+                yield key, value
+
+                regex = _NEXT_MEMBER_REGEX
+
+                continue
+
+            if not self._read():
+                raise ValueError("invalid yosys output: invalid object member")
+
+    def value(self) -> Any:
+        if self._buffer[self._position : self._position + 1] in _WHITESPACE:
+            self._skip_whitespace()
+
+        if self._buffer[self._position : self._position + 1] in ('"', "[", "{"):
+            end = self._value_end(True)
+
+            try:
+                value, _ = self._scan(self._buffer, self._position)
+            except JSONDecodeError as error:
+                raise ValueError("invalid yosys output: invalid value") from error
+
+            self._position = end
+
+            return value
+
+        while True:
+            try:
+                value, end = self._scan(self._buffer, self._position)
+            except JSONDecodeError as error:
+                if self._read():
+                    continue
+
+                raise ValueError("invalid yosys output: invalid value") from error
+
+            # Number at the end of buffer may continue in next chunk.
+            if end == len(self._buffer) and self._read():
+                continue
+
+            self._position = end
+
+            return value
+
+    def skip_value(self):
+        """
+        Skips value at current position. Strings, arrays and objects are not
+        decoded and are dropped from buffer while they are scanned.
+        """
+
+        if self._peek() in ('"', "[", "{"):
+            self._position = self._value_end(False)
+        else:
+            self.value()
+
+    def end(self):
+        if self._peek() != "":
+            raise ValueError("invalid yosys output: data after end of document")
+
+    def _peek(self) -> str:
+        """
+        Returns next non-whitespace character or empty string at the end of
+        stream.
+        """
+
+        self._skip_whitespace()
+
+        return self._buffer[self._position : self._position + 1]
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise ValueError(f'invalid yosys output: expected "{char}"')
+
+        self._position += 1
+
+    def _skip_whitespace(self):
+        while True:
+            self._position = _WHITESPACE_REGEX.match(
+                self._buffer, self._position
+            ).end()  # type: ignore
+
+            if self._position != len(self._buffer) or not self._read():
+                return
+
+    def _value_end(self, keep: bool) -> int:
+        """
+        Returns end of string, array or object starting at current position,
+        reading more chunks until it is in buffer. Every character is scanned
+        once and chunks of value are joined once. If `keep` is not set,
+        chunks of value are dropped instead.
+        """
+
+        scanner = _ValueEndScanner()
+        end = scanner.scan(self._buffer, self._position)
+
+        if end is not None:
+            return end
+
+        chunks = [self._buffer[self._position :]] if keep else []
+
+        while True:
+            chunk = self._read_chunk()
+
+            if chunk is None:
+                raise ValueError("invalid yosys output: invalid value")
+
+            end = scanner.scan(chunk, 0)
+
+            if end is not None:
+                self._buffer = "".join(chunks) + chunk
+                self._position = 0
+
+                return len(self._buffer) - len(chunk) + end
+
+            if keep:
+                chunks.append(chunk)
+
+    def _read(self) -> bool:
+        """
+        Appends next chunk to buffer, returns `False` at the end of stream.
+        """
+
+        chunk = self._read_chunk()
+
+        if chunk is None:
+            return False
+
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+
+        return True
+
+    def _read_chunk(self) -> Union[str, None]:
+        """
+        Returns next chunk of stream or `None` at the end of stream.
+        """
+
+        if self._eof:
+            return None
+
+        chunk = self._stream.read(_CHUNK_SIZE)
+
+        if chunk == "":
+            self._eof = True
+
+            return None
+
+        if self._on_chunk is not None:
+            self._on_chunk(chunk)
+
+        return chunk
+
+
+class _ValueEndScanner:
+    """
+    Finds end of JSON string, array or object which is split into chunks.
+    Only nesting is tracked, value itself is checked when it is decoded.
+    """
+
+    __slots__ = ("depth", "in_string", "escaped")
+
+    depth: int
+    in_string: bool
+    # Previous chunk ended with backslash in string.
+    escaped: bool
+
+    def __init__(self) -> None:
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def scan(self, text: str, index: int) -> Union[int, None]:
+        """
+        Continues scanning with `text` from `index`. Returns index after the
+        end of value or `None` if value continues in the next chunk.
+        """
+
+        if self.escaped:
+            index += 1
+            self.escaped = False
+
+        while True:
+            if self.in_string:
+                match = _STRING_SPECIAL_REGEX.search(text, index)
+
+                if match is None:
+                    return None
+
+                index = match.end()
+
+                if match.group() == "\\":
+                    if index == len(text):
+                        self.escaped = True
+
+                        return None
+
+                    index += 1
+
+                    continue
+
+                self.in_string = False
+
+                if self.depth == 0:
+                    return index
+            else:
+                match = _STRUCTURE_REGEX.search(text, index)
+
+                if match is None:
+                    return None
+
+                index = match.end()
+                char = match.group()
+
+                if char == '"':
+                    self.in_string = True
+                elif char in "[{":
+                    self.depth += 1
+                else:
+                    self.depth -= 1
+
+                    if self.depth == 0:
+                        return index
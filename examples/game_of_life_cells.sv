@@ -0,0 +1,80 @@
+// Same as game_of_life.sv, but every cell is an instance of game_of_life_cell module.
+// Compile with --hierarchical to synthesize game_of_life_cell only once.
+
+module game_of_life_cell (
+    input bit clk,
+    input bit rst,
+    input bit init,
+    input bit [7:0] neighbors,
+
+    output bit alive
+);
+    bit [3:0] neighbors_count;
+
+    always_comb begin
+        neighbors_count = 0;
+
+        for (integer i = 0; i != 8; i++) begin
+            neighbors_count += neighbors[i];
+        end
+    end
+
+    always_ff @(posedge clk) begin
+        if (rst) begin
+            alive <= init;
+        end else if (alive) begin
+            if (neighbors_count != 2 && neighbors_count != 3) begin
+                alive <= 0;
+            end
+        end else if (neighbors_count == 3) begin
+            alive <= 1;
+        end
+    end
+endmodule
+
+module game_of_life_cells #(
+    parameter SIZE = 10
+) (
+    input bit clk,
+    (* attachment="switch" *)
+    input bit rst,
+
+    output bit clk_out,
+
+    (* attachment="switch", stripe_width=SIZE, stripes_orientation="vertical", override_x=SIZE + 3, override_y=1, override_z=3 *)
+    input bit [SIZE * SIZE - 1:0] field_in,
+
+    (* gate_rotation="backward", stripe_width=SIZE, stripes_orientation="vertical", override_x=1, override_y=1, override_z=3 *)
+    output bit [SIZE * SIZE - 1:0] field
+);
+
+assign clk_out = clk;
+
+generate
+    for (genvar x = 0; x != SIZE; x++) begin
+        for (genvar y = 0; y != SIZE; y++) begin
+            bit [7:0] neighbors;
+
+            for (genvar n = 0; n != 9; n++) begin
+                localparam n_x = x + n % 3 - 1;
+                localparam n_y = y + n / 3 - 1;
+
+                if (n < 4) begin
+                    assign neighbors[n] = n_x >= 0 && n_x < SIZE && n_y >= 0 && n_y < SIZE ? field[n_y * SIZE + n_x] : 0;
+                end else if (n > 4) begin
+                    assign neighbors[n - 1] = n_x >= 0 && n_x < SIZE && n_y >= 0 && n_y < SIZE ? field[n_y * SIZE + n_x] : 0;
+                end
+            end
+
+            game_of_life_cell cell (
+                .clk,
+                .rst,
+                .init (field_in[y * SIZE + x]),
+                .neighbors,
+                .alive (field[y * SIZE + x])
+            );
+        end
+    end
+endgenerate
+
+endmodule
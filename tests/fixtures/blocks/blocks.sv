@@ -0,0 +1,14 @@
+module blocks (
+    (* attachment="switch" *)
+    input bit clk,
+    (* attachment="switch" *)
+    input bit [1:0] a,
+
+    (* attachment="sensor" *)
+    output bit [1:0] q,
+    output bit y
+);
+    always_ff @(posedge clk) q <= a;
+
+    assign y = ^a;
+endmodule
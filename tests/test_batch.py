@@ -0,0 +1,98 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from create_blueprint.batch import _format_table, load_manifest
+from create_blueprint.build import blueprint_name, create_argument_parser
+
+_EXAMPLES_MANIFEST_PATH = Path(__file__).parent.parent / "examples" / "blueprints.toml"
+
+
+class ManifestTest(unittest.TestCase):
+    def test_examples_manifest(self):
+        parser = create_argument_parser()
+        builds = [
+            parser.parse_args(arguments)
+            for arguments in load_manifest(_EXAMPLES_MANIFEST_PATH)
+        ]
+        names = [blueprint_name(args) for args in builds]
+
+        self.assertEqual(len(set(names)), len(names))
+
+        for args in builds:
+            self.assertTrue(args.auto_height)
+            self.assertEqual(len(args.files), 1)
+
+    def test_defaults_are_overridden(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory)
+            files = [str(path / name) for name in ("default.sv", "b.sv", "c.sv")]
+            manifest = {
+                "defaults": {"height": 4, "minify": True, "files": files[:1]},
+                "build": [
+                    {"top": "a"},
+                    {
+                        "top": "b",
+                        "name": "b-5",
+                        "minify": False,
+                        "files": files[1:],
+                        "parameters": {"SIZE": 5, "INIT": "4'b1010"},
+                    },
+                ],
+            }
+
+            for file in files:
+                Path(file).touch()
+
+            (path / "manifest.json").write_text(json.dumps(manifest))
+
+            builds = [
+                create_argument_parser().parse_args(arguments)
+                for arguments in load_manifest(path / "manifest.json")
+            ]
+
+        self.assertEqual(
+            [
+                (args.top, blueprint_name(args), args.height, args.minify, args.files)
+                for args in builds
+            ],
+            [
+                ("a", "a", 4, True, [Path(file) for file in files[:1]]),
+                ("b", "b-5", 4, False, [Path(file) for file in files[1:]]),
+            ],
+        )
+        self.assertEqual(builds[0].parameter, [])
+        self.assertEqual(builds[1].parameter, [("SIZE", "5"), ("INIT", "4'b1010")])
+
+    def test_list_manifest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "manifest.json"
+
+            path.write_text(
+                json.dumps([{"top": "a", "cubic": True, "files": ["a.sv"]}])
+            )
+
+            self.assertEqual(
+                load_manifest(path), [["--top", "a", "--cubic", "--", "a.sv"]]
+            )
+
+
+class FormatTableTest(unittest.TestCase):
+    def test_alignment(self):
+        self.assertEqual(
+            _format_table(
+                [
+                    ["name", "top", "delay", "total"],
+                    ["counter", "counter", "7", "91"],
+                    ["a", "b", "12", "failed"],
+                ]
+            ),
+            "name     top      delay   total\n"
+            "counter  counter      7      91\n"
+            "a        b           12  failed",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
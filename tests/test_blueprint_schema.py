@@ -0,0 +1,232 @@
+"""
+Fixtures in `fixtures` are `blueprint.json` files written by sm-verilog before
+`--minify` was added, whose format is loaded by game. Output of current
+version must have the same layout of blocks, except for fields which
+`--minify` omits.
+"""
+
+import json
+import unittest
+from pathlib import Path
+from typing import Any, Union
+
+from create_blueprint.block_placer import BlockPlacer, BlockPlacerOptions
+from create_blueprint.blueprint_schema import validate_blueprint
+from create_blueprint.cell import generate_cells
+from create_blueprint.circuit import Circuit
+
+_FIXTURES_PATH = Path(__file__).parent / "fixtures"
+_DEFAULT_COLOR = "222222"
+# Fields which `--minify` may omit.
+_OPTIONAL_FIELDS = {"color", "controllers", "joints"}
+_BODY_SIZE = 7
+
+
+def _fixtures() -> list[Any]:
+    return [
+        json.loads(path.read_text())
+        for path in sorted(_FIXTURES_PATH.glob("*/blueprint.json"))
+    ]
+
+
+def _blocks(blueprint: Any) -> list[Any]:
+    return [block for body in blueprint["bodies"] for block in body["childs"]]
+
+
+def _layout(value: Any) -> Any:
+    """
+    Returns JSON value with leaf values replaced by their types, items of
+    arrays are described by their first item.
+    """
+
+    if isinstance(value, dict):
+        return {key: _layout(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_layout(item) for item in value[:1]]
+
+    return type(value).__name__
+
+
+def _blocks_layouts(blueprints: list[Any]) -> dict[str, Any]:
+    """
+    Returns layout of fullest block of every shape.
+    """
+
+    result: dict[str, Any] = {}
+
+    for blueprint in blueprints:
+        for block in _blocks(blueprint):
+            layout = _layout(block)
+            current = result.get(block["shapeId"])
+
+            if current is None or json.dumps(layout) > json.dumps(current):
+                result[block["shapeId"]] = layout
+
+    return result
+
+
+def _blueprint(minify: bool, body_size: Union[int, None]) -> Any:
+    """
+    Returns parsed `blueprint.json` of design similar to the one of fixture
+    (see `fixtures/blocks/blocks.sv`).
+    """
+
+    ports = {
+        "clk": {"direction": "input", "bits": [2]},
+        "a": {"direction": "input", "bits": [3, 4]},
+        "q": {"direction": "output", "bits": [5, 6]},
+        "y": {"direction": "output", "bits": [7]},
+    }
+    attributes = {"clk": "switch", "a": "switch", "q": "sensor"}
+    cells: dict[str, Any] = {
+        "xor": {"type": "XOR2", "connections": {"A": [3], "B": [4], "Y": [7]}},
+    }
+
+    for i in range(2):
+        cells[f"not{i}"] = {
+            "type": "NAND1",
+            "connections": {"A": [3 + i], "Y": [8 + i]},
+        }
+        cells[f"latch{i}"] = {
+            "type": "SYNC_SR_LATCH",
+            "connections": {"C": [2], "S": [3 + i], "R": [8 + i], "Q": [5 + i]},
+        }
+
+    for cell in cells.values():
+        cell["parameters"] = {}
+        cell["attributes"] = {}
+
+    yosys_output = {
+        "modules": {
+            "blocks": {
+                "attributes": {"top": "1"},
+                "ports": ports,
+                "cells": cells,
+                "netnames": {
+                    name: {
+                        "bits": port["bits"],
+                        "attributes": (
+                            {"attachment": attributes[name]}
+                            if name in attributes
+                            else {}
+                        ),
+                    }
+                    for name, port in ports.items()
+                },
+            }
+        }
+    }
+
+    circuit = Circuit.from_yosys_output(generate_cells(10), yosys_output, "blocks")
+    blueprint = BlockPlacer.place(circuit, BlockPlacerOptions(None, False, True, False))
+
+    blueprint.minify = minify
+    blueprint.body_size = body_size
+
+    return json.loads(blueprint.to_json())
+
+
+class BlueprintSchemaTest(unittest.TestCase):
+    def test_fixtures_match_schema(self):
+        fixtures = _fixtures()
+
+        self.assertNotEqual(len(fixtures), 0)
+
+        for fixture in fixtures:
+            validate_blueprint(fixture)
+
+    def test_output_matches_fixtures(self):
+        layouts = _blocks_layouts(_fixtures())
+
+        for minify in (False, True):
+            for body_size in (None, _BODY_SIZE):
+                blueprint = _blueprint(minify, body_size)
+                blocks = _blocks(blueprint)
+
+                validate_blueprint(blueprint)
+
+                self.assertEqual({block["shapeId"] for block in blocks}, layouts.keys())
+
+                for block in blocks:
+                    self._assert_layout(
+                        _layout(block),
+                        layouts[block["shapeId"]],
+                        _OPTIONAL_FIELDS if minify else set(),
+                    )
+
+                if body_size is None:
+                    self.assertEqual(len(blueprint["bodies"]), 1)
+                else:
+                    self.assertEqual(
+                        [len(body["childs"]) for body in blueprint["bodies"]],
+                        [
+                            min(body_size, len(blocks) - i)
+                            for i in range(0, len(blocks), body_size)
+                        ],
+                    )
+
+    def test_minify_keeps_blocks(self):
+        blocks = _blocks(_blueprint(False, None))
+        minified_blocks = _blocks(_blueprint(True, _BODY_SIZE))
+        ids = {
+            block["controller"]["id"]: i
+            for i, block in enumerate(
+                block for block in blocks if "controller" in block
+            )
+        }
+
+        self.assertEqual(len(minified_blocks), len(blocks))
+
+        for block, minified_block in zip(blocks, minified_blocks):
+            for key in ("pos", "shapeId", "xaxis", "zaxis", "bounds"):
+                self.assertEqual(minified_block.get(key), block.get(key))
+
+            self.assertEqual(
+                minified_block.get("color", _DEFAULT_COLOR), block["color"]
+            )
+
+            if "controller" not in block:
+                continue
+
+            controller = dict(block["controller"])
+            minified_controller = minified_block["controller"]
+
+            controller["id"] = ids[controller["id"]]
+            controller["controllers"] = [
+                {"id": ids[connection["id"]]}
+                for connection in controller["controllers"]
+            ]
+
+            self.assertEqual(
+                {"controllers": [], "joints": None, **minified_controller},
+                controller,
+            )
+
+    def _assert_layout(
+        self, layout: Any, fixture_layout: Any, optional_fields: set[str]
+    ):
+        """
+        Checks that `layout` has keys of `fixture_layout` in the same order
+        and of the same types, except for `optional_fields` which may be
+        omitted.
+        """
+
+        if not isinstance(fixture_layout, dict):
+            self.assertEqual(layout, fixture_layout)
+
+            return
+
+        missing_keys = fixture_layout.keys() - layout.keys()
+
+        self.assertLessEqual(missing_keys, optional_fields)
+        self.assertEqual(list(layout), [key for key in fixture_layout if key in layout])
+
+        for key, item in layout.items():
+            if isinstance(item, list) and len(item) == 0:
+                continue
+
+            self._assert_layout(item, fixture_layout[key], optional_fields)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any, Union
+
+from create_blueprint.build_graph import BuildGraph
+from create_blueprint.cell import generate_cells
+from create_blueprint.yosys import compile
+
+_TOP = """
+module top(input bit clk, input bit [3:0] a, input bit [3:0] b, output bit [3:0] y);
+    bit [3:0] sum;
+
+    adder adder(.clk, .a, .b, .y(sum));
+
+    assign y = sum ^ {a[0], b[3:1]};
+endmodule
+"""
+_ADDER = """
+module adder(input bit clk, input bit [3:0] a, input bit [3:0] b, output bit [3:0] y);
+    always_ff @(posedge clk) y <= a + b;
+endmodule
+"""
+_CHANGED_ADDER = """
+// Longer file, so yosys generates more names while reading it.
+module adder(input bit clk, input bit [3:0] a, input bit [3:0] b, output bit [3:0] y);
+    bit [3:0] difference;
+
+    assign difference = a - b;
+
+    always_ff @(posedge clk) y <= difference & a;
+endmodule
+"""
+
+
+def _module(file: Path, ports: dict[str, int], cells: dict[str, Any]) -> dict[str, Any]:
+    """
+    Returns yosys output of module defined in `file` which has input ports of
+    given widths.
+    """
+
+    return {
+        "attributes": {"src": f"{file}:1.1-3.10"},
+        "ports": {
+            name: {"direction": "input", "bits": list(range(2, 2 + width))}
+            for name, width in ports.items()
+        },
+        "cells": cells,
+        "netnames": {},
+    }
+
+
+def _yosys_output(path: Path, adder_width: int, synthesized: bool) -> dict[str, Any]:
+    """
+    Returns yosys output of incremental build of design in which `top`
+    instantiates `adder`. `top` is blackbox unless it is `synthesized`.
+    """
+
+    connections = {"a": list(range(2, 2 + adder_width))}
+    top_cells = {"adder": {"type": "adder", "connections": connections}}
+
+    return {
+        "modules": {
+            "top": _module(path / "top.sv", {}, top_cells if synthesized else {}),
+            "adder": _module(path / "adder.sv", {"a": adder_width}, {}),
+        }
+    }
+
+
+class BuildGraphTest(unittest.TestCase):
+    def test_reuse(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory)
+            graph_path = path / "build_graph.json"
+
+            (path / "top.sv").write_text("module top;")
+            (path / "adder.sv").write_text("module adder;")
+
+            graph = BuildGraph(graph_path, "key")
+
+            self.assertEqual(graph.link(_yosys_output(path, 4, True), set()), set())
+            self.assertEqual(graph.reusable_modules(), {"top", "adder"})
+
+            graph.save()
+            (path / "adder.sv").write_text("module adder; // changed")
+
+            self.assertEqual(BuildGraph.load(graph_path, "other key").modules, {})
+
+            graph = BuildGraph.load(graph_path, "key")
+            reused = graph.reusable_modules()
+
+            self.assertEqual(reused, {"top"})
+
+            # Saved netlist of `top` replaces its blackbox.
+            yosys_output = _yosys_output(path, 4, False)
+
+            self.assertEqual(graph.link(yosys_output, reused), set())
+            self.assertEqual(yosys_output, _yosys_output(path, 4, True))
+            self.assertEqual(graph.reusable_modules(), {"top", "adder"})
+
+            # `top` must be synthesized again when ports of `adder` change.
+            (path / "adder.sv").write_text("module adder; // wider")
+
+            yosys_output = _yosys_output(path, 8, False)
+            reused = graph.reusable_modules()
+
+            self.assertEqual(graph.link(yosys_output, reused), {"top"})
+            self.assertEqual(yosys_output, _yosys_output(path, 8, False))
+
+
+@unittest.skipIf(shutil.which("yosys") is None, "yosys is not installed")
+class IncrementalBuildTest(unittest.TestCase):
+    def test_partial_rebuild_equals_clean_build(self):
+        cells = generate_cells(10)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory)
+            # Changed file is read before reused module.
+            files = [str(path / "adder.sv"), str(path / "top.sv")]
+
+            def build(graph: Union[BuildGraph, None]) -> dict[str, Any]:
+                reused = graph.reusable_modules() if graph is not None else set()
+                yosys_output = compile(
+                    "top", files, cells, None, None, None, True, sorted(reused)
+                )
+
+                if graph is not None:
+                    self.assertEqual(graph.link(yosys_output, reused), set())
+
+                return yosys_output
+
+            (path / "top.sv").write_text(_TOP)
+            (path / "adder.sv").write_text(_ADDER)
+
+            graph = BuildGraph(path / "build_graph.json", "key")
+
+            build(graph)
+
+            (path / "adder.sv").write_text(_CHANGED_ADDER)
+
+            self.assertEqual(graph.reusable_modules(), {"top"})
+            self.assertEqual(build(graph), build(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import socket
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from create_blueprint.client import (
+    create_private_directory,
+    default_socket_path,
+    peer_uid,
+    private_socket_directory,
+)
+
+
+class SocketPathTest(unittest.TestCase):
+    def test_socket_is_in_private_directory_without_runtime_directory(self):
+        with mock.patch.dict(os.environ, clear=True):
+            path = default_socket_path()
+
+        self.assertEqual(path.parent, private_socket_directory())
+        self.assertIn(str(os.getuid()), path.parent.name)
+
+    def test_private_directory_is_created(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "sockets"
+
+            create_private_directory(path)
+            # Existing private directory is accepted.
+            create_private_directory(path)
+
+            self.assertEqual(stat.S_IMODE(path.stat().st_mode), 0o700)
+
+    def test_shared_directory_is_rejected(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "sockets"
+
+            path.mkdir()
+            path.chmod(0o777)
+
+            with self.assertRaises(ValueError):
+                create_private_directory(path)
+
+            path.rmdir()
+            path.symlink_to(directory)
+
+            with self.assertRaises(ValueError):
+                create_private_directory(path)
+
+
+@unittest.skipIf(not hasattr(socket, "SO_PEERCRED"), "SO_PEERCRED is not supported")
+class PeerUidTest(unittest.TestCase):
+    def test_peer_uid(self):
+        first, second = socket.socketpair(socket.AF_UNIX)
+
+        with first, second:
+            self.assertEqual(peer_uid(first), os.getuid())
+            self.assertEqual(peer_uid(second), os.getuid())
+
+
+if __name__ == "__main__":
+    unittest.main()
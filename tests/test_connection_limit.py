@@ -0,0 +1,80 @@
+import unittest
+
+from create_blueprint.cell import generate_cells
+from create_blueprint.circuit import Circuit
+from create_blueprint.simulator import Simulator
+
+# More outputs than one logic can have, so they are moved behind buffers.
+_FANOUT = 300
+# Length of clock signal required by README.
+_CLOCK_TICKS = 3
+
+
+def _latch_circuit() -> Circuit:
+    """
+    Returns circuit with one latch which output drives `_FANOUT` output bits.
+    """
+
+    ports = {
+        "clk": {"direction": "input", "bits": [2]},
+        "s": {"direction": "input", "bits": [3]},
+        "r": {"direction": "input", "bits": [4]},
+        "q": {"direction": "output", "bits": [5] * _FANOUT},
+    }
+    yosys_output = {
+        "modules": {
+            "top": {
+                "attributes": {"top": "1"},
+                "ports": ports,
+                "cells": {
+                    "latch": {
+                        "type": "SYNC_SR_LATCH",
+                        "parameters": {},
+                        "attributes": {},
+                        "connections": {"C": [2], "S": [3], "R": [4], "Q": [5]},
+                    }
+                },
+                "netnames": {
+                    name: {"bits": port["bits"], "attributes": {}}
+                    for name, port in ports.items()
+                },
+            }
+        }
+    }
+
+    return Circuit.from_yosys_output(generate_cells(10), yosys_output, "top")
+
+
+class LatchFanoutTest(unittest.TestCase):
+    def test_latch_holds_value(self):
+        circuit = _latch_circuit()
+        simulator = Simulator(circuit)
+        ones = 2**_FANOUT - 1
+
+        for s, r, expected in ((1, 0, ones), (0, 1, 0), (1, 0, ones), (0, 1, 0)):
+            simulator.set_input("s", s)
+            simulator.set_input("r", r)
+            simulator.step(circuit.output_ready_time)
+            simulator.set_input("clk", 1)
+            simulator.step(_CLOCK_TICKS)
+            simulator.set_input("clk", 0)
+            simulator.set_input("s", 0)
+            simulator.set_input("r", 0)
+
+            for _ in range(8):
+                simulator.step(circuit.output_ready_time)
+
+                self.assertEqual(simulator.get_output("q"), expected)
+
+    def test_latch_feedback_is_direct(self):
+        circuit = _latch_circuit()
+        latch = circuit.latches[0]
+
+        self.assertTrue(
+            any(latch.clk_and_set in output.inputs for output in latch.outputs)
+        )
+        self.assertLessEqual(len(latch.outputs), 255)
+
+
+if __name__ == "__main__":
+    unittest.main()
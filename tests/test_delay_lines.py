@@ -0,0 +1,95 @@
+import unittest
+
+from create_blueprint.cell import generate_cells
+from create_blueprint.circuit import Circuit
+from create_blueprint.simulator import Simulator
+from create_blueprint.timer import MAX_TIMER_TICKS, Timer
+
+# Longer than delay of one timer, so delay line consists of two of them.
+_CHAIN_LENGTH = 2500
+
+
+def _long_delay_circuit() -> Circuit:
+    """
+    Returns circuit which output port has one bit connected directly to input
+    and another one behind chain of `_CHAIN_LENGTH` inverters, so first bit
+    must be delayed by more than `MAX_TIMER_TICKS`. Outputs are aligned only
+    in circuits with latches, so there is unrelated latch too.
+    """
+
+    cells = {
+        f"g{i}": {
+            "type": "NAND1",
+            "parameters": {},
+            "attributes": {},
+            "connections": {"A": [3 if i == 0 else 10 + i - 1], "Y": [10 + i]},
+        }
+        for i in range(_CHAIN_LENGTH)
+    }
+    cells["latch"] = {
+        "type": "SYNC_SR_LATCH",
+        "parameters": {},
+        "attributes": {},
+        "connections": {"C": [4], "S": [5], "R": [6], "Q": [7]},
+    }
+    ports = {
+        "a": {"direction": "input", "bits": [2, 3]},
+        "clk": {"direction": "input", "bits": [4]},
+        "s": {"direction": "input", "bits": [5]},
+        "r": {"direction": "input", "bits": [6]},
+        "y": {"direction": "output", "bits": [2, 10 + _CHAIN_LENGTH - 1]},
+        "q": {"direction": "output", "bits": [7]},
+    }
+    yosys_output = {
+        "modules": {
+            "top": {
+                "attributes": {"top": "1"},
+                "ports": ports,
+                "cells": cells,
+                "netnames": {
+                    name: {"bits": port["bits"], "attributes": {}}
+                    for name, port in ports.items()
+                },
+            }
+        }
+    }
+
+    return Circuit.from_yosys_output(
+        generate_cells(10), yosys_output, "top", optimize=False
+    )
+
+
+class LongDelayTest(unittest.TestCase):
+    def test_delay_line_is_split(self):
+        circuit = _long_delay_circuit()
+        timers = [
+            logic for logic in circuit.all_logic.values() if isinstance(logic, Timer)
+        ]
+
+        # Output of latch is aligned with other outputs too.
+        self.assertEqual(circuit.delay_blocks_count, 4)
+        self.assertEqual(len(timers), 4)
+
+        for timer in timers:
+            self.assertLessEqual(timer.ticks, MAX_TIMER_TICKS)
+
+    def test_output_bits_change_together(self):
+        circuit = _long_delay_circuit()
+        simulator = Simulator(circuit)
+
+        simulator.step(circuit.output_ready_time + 1)
+
+        self.assertEqual(simulator.get_output("y"), 0b00)
+
+        simulator.set_input("a", 0b11)
+        simulator.step(circuit.output_ready_time - 1)
+
+        self.assertEqual(simulator.get_output("y"), 0b00)
+
+        simulator.step()
+
+        self.assertEqual(simulator.get_output("y"), 0b11)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+import unittest
+from typing import Any
+
+from create_blueprint.cell import generate_cells
+from create_blueprint.circuit import Circuit
+from create_blueprint.simulator import Simulator
+
+_TOP_PORTS = {
+    "a": {"direction": "input", "bits": [2]},
+    "b": {"direction": "input", "bits": [3]},
+    "cin": {"direction": "input", "bits": [4]},
+    "s": {"direction": "output", "bits": [5]},
+    "cout": {"direction": "output", "bits": [6]},
+    "z": {"direction": "output", "bits": [11]},
+}
+
+
+def _cell(cell_type: str, **connections: list[Any]) -> dict[str, Any]:
+    return {
+        "type": cell_type,
+        "parameters": {},
+        "attributes": {},
+        "connections": connections,
+    }
+
+
+def _module(
+    ports: dict[str, Any], cells: dict[str, Any], top: bool = False
+) -> dict[str, Any]:
+    return {
+        "attributes": {"top": "1"} if top else {},
+        "ports": ports,
+        "cells": cells,
+        "netnames": {
+            name: {"bits": port["bits"], "attributes": {}}
+            for name, port in ports.items()
+        },
+    }
+
+
+def _hierarchical_output() -> dict[str, Any]:
+    """
+    Returns yosys output of full adder built from two instances of half adder
+    module with carry passed through buffer module. Output `z` is sum of
+    third half adder which input is constant.
+    """
+
+    half_adder = _module(
+        {
+            "a": {"direction": "input", "bits": [2]},
+            "b": {"direction": "input", "bits": [3]},
+            "s": {"direction": "output", "bits": [4]},
+            "c": {"direction": "output", "bits": [5]},
+        },
+        {
+            "xor": _cell("XOR2", A=[2], B=[3], Y=[4]),
+            "and": _cell("AND2", A=[2], B=[3], Y=[5]),
+        },
+    )
+    # Output is connected directly to input.
+    buffer = _module(
+        {
+            "i": {"direction": "input", "bits": [2]},
+            "o": {"direction": "output", "bits": [2]},
+        },
+        {},
+    )
+    top = _module(
+        _TOP_PORTS,
+        {
+            "ha0": _cell("half_adder", a=[2], b=[3], s=[7], c=[8]),
+            "ha1": _cell("half_adder", a=[7], b=[4], s=[5], c=[9]),
+            "or": _cell("OR2", A=[8], B=[9], Y=[10]),
+            "buffer": _cell("buffer", i=[10], o=[6]),
+            "ha2": _cell("half_adder", a=[2], b=["0"], s=[11], c=[12]),
+        },
+        True,
+    )
+
+    return {"modules": {"top": top, "half_adder": half_adder, "buffer": buffer}}
+
+
+def _flat_output() -> dict[str, Any]:
+    top = _module(
+        _TOP_PORTS,
+        {
+            "ha0.xor": _cell("XOR2", A=[2], B=[3], Y=[7]),
+            "ha0.and": _cell("AND2", A=[2], B=[3], Y=[8]),
+            "ha1.xor": _cell("XOR2", A=[7], B=[4], Y=[5]),
+            "ha1.and": _cell("AND2", A=[7], B=[4], Y=[9]),
+            "or": _cell("OR2", A=[8], B=[9], Y=[6]),
+            "ha2.xor": _cell("XOR2", A=[2], B=["0"], Y=[11]),
+            "ha2.and": _cell("AND2", A=[2], B=["0"], Y=[12]),
+        },
+        True,
+    )
+
+    return {"modules": {"top": top}}
+
+
+class HierarchicalCircuitTest(unittest.TestCase):
+    def test_instances_match_flat_design(self):
+        cells = generate_cells(10)
+
+        for optimize in (False, True):
+            hierarchical = Circuit.from_yosys_output(
+                cells, _hierarchical_output(), "top", optimize=optimize
+            )
+            flat = Circuit.from_yosys_output(
+                cells, _flat_output(), "top", optimize=optimize
+            )
+
+            self.assertEqual(len(hierarchical.all_logic), len(flat.all_logic))
+            self.assertEqual(hierarchical.output_ready_time, flat.output_ready_time)
+
+            for inputs in range(8):
+                simulators = [Simulator(hierarchical), Simulator(flat)]
+                outputs = []
+
+                for simulator in simulators:
+                    for i, port in enumerate(("a", "b", "cin")):
+                        simulator.set_input(port, inputs >> i & 1)
+
+                    simulator.step(flat.output_ready_time)
+
+                    outputs.append(
+                        [simulator.get_output(port) for port in ("s", "cout", "z")]
+                    )
+
+                a, b, cin = (inputs >> i & 1 for i in range(3))
+
+                self.assertEqual(outputs[0], outputs[1], (optimize, inputs))
+                self.assertEqual(outputs[0], [(a + b + cin) & 1, (a + b + cin) >> 1, a])
+
+
+if __name__ == "__main__":
+    unittest.main()
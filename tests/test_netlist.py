@@ -0,0 +1,106 @@
+import unittest
+from typing import Any
+
+from create_blueprint.block_placer import BlockPlacer, BlockPlacerOptions
+from create_blueprint.cell import generate_cells
+from create_blueprint.circuit import Circuit
+from create_blueprint.gate import Gate
+from create_blueprint.netlist import Netlist
+from create_blueprint.timer import Timer
+
+
+def _circuit() -> Circuit:
+    cells: dict[str, Any] = {
+        "and": {"type": "AND2", "connections": {"A": [2], "B": [3], "Y": [6]}},
+        "xor": {"type": "XOR2", "connections": {"A": [6], "B": [3], "Y": [7]}},
+        "latch": {
+            "type": "SYNC_SR_LATCH",
+            "connections": {"C": [4], "S": [7], "R": [5], "Q": [8]},
+        },
+    }
+    ports = {
+        "a": {"direction": "input", "bits": [2, 3]},
+        "clk": {"direction": "input", "bits": [4]},
+        "r": {"direction": "input", "bits": [5]},
+        "y": {"direction": "output", "bits": [6, 8]},
+    }
+
+    for cell in cells.values():
+        cell["parameters"] = {}
+        cell["attributes"] = {}
+
+    yosys_output = {
+        "modules": {
+            "top": {
+                "attributes": {"top": "1"},
+                "ports": ports,
+                "cells": cells,
+                "netnames": {
+                    name: {"bits": port["bits"], "attributes": {}}
+                    for name, port in ports.items()
+                },
+            }
+        }
+    }
+
+    return Circuit.from_yosys_output(generate_cells(10), yosys_output, "top")
+
+
+class NetlistTest(unittest.TestCase):
+    def test_views_match_circuit(self):
+        circuit = _circuit()
+        netlist = Netlist.from_circuit(circuit)
+
+        self.assertEqual(list(netlist.all_logic), list(circuit.all_logic))
+        self.assertEqual(list(netlist.middle_logic), list(circuit.middle_logic))
+        self.assertEqual(netlist.output_ready_time, circuit.output_ready_time)
+        self.assertTrue(
+            any(isinstance(logic, Timer) for logic in circuit.all_logic.values())
+        )
+
+        for logic, view in zip(circuit.all_logic.values(), netlist.all_logic.values()):
+            self.assertEqual(isinstance(view, Timer), isinstance(logic, Timer))
+            self.assertEqual(view.id, logic.id)
+            self.assertEqual(
+                [input.id for input in view.inputs],
+                [input.id for input in logic.inputs],
+            )
+            self.assertEqual(
+                [output.id for output in view.outputs],
+                [output.id for output in logic.outputs],
+            )
+            self.assertEqual(len(view.outputs), len(logic.outputs))
+
+            if isinstance(logic, Gate):
+                assert isinstance(view, Gate)
+
+                self.assertEqual(view.mode, logic.mode)
+            else:
+                assert isinstance(logic, Timer) and isinstance(view, Timer)
+
+                self.assertEqual(view.ticks, logic.ticks)
+
+            for output in view.outputs:
+                self.assertIn(output, view.outputs)
+                self.assertIn(view, output.inputs)
+
+    def test_views_are_read_only(self):
+        netlist = Netlist.from_circuit(_circuit())
+        view = next(iter(netlist.all_logic.values()))
+
+        with self.assertRaises(TypeError):
+            view.outputs.append(view)
+
+    def test_placement_matches_circuit(self):
+        circuit = _circuit()
+        netlist = Netlist.from_circuit(circuit)
+        options = BlockPlacerOptions(None, False, True, False)
+
+        self.assertEqual(
+            BlockPlacer.place(netlist, options).to_json(),
+            BlockPlacer.place(circuit, options).to_json(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
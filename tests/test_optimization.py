@@ -0,0 +1,101 @@
+import random
+import unittest
+from typing import Any
+
+from create_blueprint.cell import generate_cells
+from create_blueprint.circuit import Circuit
+from create_blueprint.simulator import BitParallelSimulator
+
+_INPUTS_COUNT = 4
+_MODES = ["AND", "OR", "XOR", "NAND", "NOR", "XNOR"]
+
+
+def _random_yosys_output(rng: random.Random, cells_count: int) -> dict[str, Any]:
+    """
+    Returns combinational module with random gates. Some gates are copies of
+    earlier ones, so structural hashing has something to merge.
+    """
+
+    nets = list(range(2, 2 + _INPUTS_COUNT))
+    cells: dict[str, Any] = {}
+    definitions: list[tuple[str, list[int]]] = []
+
+    for i in range(cells_count):
+        if len(definitions) != 0 and rng.random() < 0.3:
+            cell_type, inputs = rng.choice(definitions)
+            inputs = rng.sample(inputs, len(inputs))
+        else:
+            inputs = rng.sample(nets[-8:], rng.randint(1, 3))
+            cell_type = (
+                rng.choice(["AND1", "NAND1"])
+                if len(inputs) == 1
+                else f"{rng.choice(_MODES)}{len(inputs)}"
+            )
+            definitions.append((cell_type, inputs))
+
+        output = 2 + _INPUTS_COUNT + i
+        connections = {chr(ord("A") + j): [net] for j, net in enumerate(inputs)}
+        connections["Y"] = [output]
+
+        cells[f"g{i}"] = {
+            "type": cell_type,
+            "parameters": {},
+            "attributes": {},
+            "connections": connections,
+        }
+        nets.append(output)
+
+    ports = {
+        "a": {"direction": "input", "bits": nets[:_INPUTS_COUNT]},
+        "y": {"direction": "output", "bits": nets[_INPUTS_COUNT:]},
+    }
+
+    return {
+        "modules": {
+            "top": {
+                "attributes": {"top": "1"},
+                "ports": ports,
+                "cells": cells,
+                "netnames": {
+                    name: {"bits": port["bits"], "attributes": {}}
+                    for name, port in ports.items()
+                },
+            }
+        }
+    }
+
+
+def _outputs(circuit: Circuit, ticks: int) -> list[int]:
+    values = list(range(2**_INPUTS_COUNT))
+    simulator = BitParallelSimulator(circuit, len(values))
+
+    return simulator.evaluate({"a": values}, ticks)["y"]
+
+
+class OptimizationTest(unittest.TestCase):
+    def test_optimized_circuit_is_equivalent(self):
+        rng = random.Random(0)
+        cells = generate_cells(10)
+
+        for _ in range(200):
+            yosys_output = _random_yosys_output(rng, rng.randint(4, 24))
+
+            circuit = Circuit.from_yosys_output(
+                cells, yosys_output, "top", optimize=False
+            )
+            optimized = Circuit.from_yosys_output(cells, yosys_output, "top")
+
+            # Game keeps only one connection between two blocks, so simulator
+            # matches it only if there are no repeated inputs.
+            for logic in optimized.all_logic.values():
+                inputs_ids = [input.id for input in logic.inputs]
+
+                self.assertEqual(len(inputs_ids), len(set(inputs_ids)))
+
+            ticks = max(circuit.output_ready_time, optimized.output_ready_time) + 1
+
+            self.assertEqual(_outputs(optimized, ticks), _outputs(circuit, ticks))
+
+
+if __name__ == "__main__":
+    unittest.main()
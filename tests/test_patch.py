@@ -0,0 +1,163 @@
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+
+from create_blueprint.block_placer import BlockPlacerOptions
+from create_blueprint.cell import generate_cells
+from create_blueprint.circuit import Circuit
+from create_blueprint.gate import GateMode
+from create_blueprint.patch import PatchState, diff_blueprints
+
+_OPTIONS = BlockPlacerOptions(None, False, True, False)
+_WIDTH = 8
+
+
+def _circuit(width: int, types: dict[int, str] = {}) -> Circuit:
+    """
+    Returns circuit in which `y[i]` is XOR (or gate of `types[i]`) of `a[i]`
+    and `b[i]`.
+    """
+
+    cells = {
+        f"gate{i}": {
+            "type": types.get(i, "XOR2"),
+            "parameters": {},
+            "attributes": {},
+            "connections": {
+                "A": [2 + i],
+                "B": [2 + width + i],
+                "Y": [2 + 2 * width + i],
+            },
+        }
+        for i in range(width)
+    }
+    ports = {
+        name: {
+            "direction": "output" if name == "y" else "input",
+            "bits": list(range(2 + i * width, 2 + (i + 1) * width)),
+        }
+        for i, name in enumerate(("a", "b", "y"))
+    }
+    yosys_output: dict[str, Any] = {
+        "modules": {
+            "top": {
+                "attributes": {"top": "1"},
+                "ports": ports,
+                "cells": cells,
+                "netnames": {
+                    name: {"bits": port["bits"], "attributes": {}}
+                    for name, port in ports.items()
+                },
+            }
+        }
+    }
+
+    return Circuit.from_yosys_output(generate_cells(10), yosys_output, "top")
+
+
+def _ids(blocks: list[dict[str, Any]]) -> set[int]:
+    return {block["controller"]["id"] for block in blocks if "controller" in block}
+
+
+class PatchTest(unittest.TestCase):
+    def patch(self, circuit: Circuit) -> dict[str, Any]:
+        """
+        Patches blueprint of `_circuit(_WIDTH)` with `circuit` and returns
+        difference between them.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory)
+            blueprint_path = path / "blueprint"
+            state_path = path / "patch_state.json"
+
+            blueprint_path.mkdir()
+
+            state = PatchState.load(state_path, _OPTIONS)
+            blueprint = state.place(_circuit(_WIDTH), _OPTIONS)
+
+            blueprint.hot_swap(blueprint_path)
+            state.save(blueprint_path)
+
+            state = PatchState.load(state_path, _OPTIONS)
+
+            self.assertEqual(state.blueprint_path, blueprint_path)
+
+            diff = diff_blueprints(blueprint_path, state.place(circuit, _OPTIONS))
+            diff["old_ids"] = _ids(
+                [
+                    *diff["removed"],
+                    *(change["old"] for change in diff["changed"]),
+                ]
+            )
+
+            return diff
+
+    def test_unchanged_design(self):
+        diff = self.patch(_circuit(_WIDTH))
+
+        self.assertEqual(diff["added"], [])
+        self.assertEqual(diff["removed"], [])
+        self.assertEqual(diff["changed"], [])
+
+    def test_changed_gate(self):
+        diff = self.patch(_circuit(_WIDTH, {3: "XNOR2"}))
+
+        [added] = diff["added"]
+        [removed] = diff["removed"]
+
+        self.assertEqual(added["controller"]["mode"], int(GateMode.XNOR))
+        self.assertEqual(removed["controller"]["mode"], int(GateMode.XOR))
+        self.assertEqual(added["pos"], removed["pos"])
+        self.assertNotEqual(added["controller"]["id"], removed["controller"]["id"])
+
+        # Only input gates which drive changed gate are relinked.
+        self.assertEqual(len(diff["changed"]), 2)
+
+        for change in diff["changed"]:
+            old_controller = dict(change["old"].pop("controller"))
+            new_controller = dict(change["new"].pop("controller"))
+
+            self.assertEqual(change["old"], change["new"])
+            self.assertEqual(
+                old_controller["controllers"], [{"id": removed["controller"]["id"]}]
+            )
+            self.assertEqual(
+                new_controller["controllers"], [{"id": added["controller"]["id"]}]
+            )
+
+    def test_wider_design(self):
+        diff = self.patch(_circuit(_WIDTH + 1))
+        added_ids = _ids(diff["added"])
+
+        # Input, middle and output gates of new bit.
+        self.assertEqual(len(added_ids), 4)
+        self.assertEqual(diff["removed"], [])
+        self.assertTrue(min(added_ids) > max(diff["old_ids"]))
+        self.assertNotEqual(diff["unchanged_count"], 0)
+
+        # Middle gates of old bits keep their positions.
+        for change in diff["changed"]:
+            if change["old"]["controller"]["mode"] == int(GateMode.XOR):
+                self.assertEqual(change["old"]["pos"], change["new"]["pos"])
+
+    def test_state_of_other_geometry_is_ignored(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory)
+            state = PatchState(path / "patch_state.json")
+
+            state.place(_circuit(_WIDTH), _OPTIONS)
+            state.save(path)
+
+            self.assertNotEqual(PatchState.load(state.path, _OPTIONS).logic, {})
+            self.assertEqual(
+                PatchState.load(
+                    state.path, BlockPlacerOptions(None, False, False, True)
+                ).logic,
+                {},
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+
+from create_blueprint.block_placer import BlockPlacer, BlockPlacerOptions
+from create_blueprint.blueprint import Blueprint
+from create_blueprint.cell import generate_cells
+from create_blueprint.circuit import Circuit
+
+
+def _blueprint(name: str, mode: str = "XOR2") -> Blueprint:
+    """
+    Returns reproducible blueprint of design with one gate of `mode`.
+    """
+
+    ports = {
+        "a": {"direction": "input", "bits": [2, 3]},
+        "y": {"direction": "output", "bits": [4]},
+    }
+    yosys_output: dict[str, Any] = {
+        "modules": {
+            "top": {
+                "attributes": {"top": "1"},
+                "ports": ports,
+                "cells": {
+                    "gate": {
+                        "type": mode,
+                        "parameters": {},
+                        "attributes": {},
+                        "connections": {"A": [2], "B": [3], "Y": [4]},
+                    }
+                },
+                "netnames": {
+                    port_name: {"bits": port["bits"], "attributes": {}}
+                    for port_name, port in ports.items()
+                },
+            }
+        }
+    }
+    circuit = Circuit.from_yosys_output(generate_cells(10), yosys_output, "top")
+    blueprint = BlockPlacer.place(circuit, BlockPlacerOptions(None, False, True, False))
+
+    blueprint.name = name
+    blueprint.reproducible = True
+
+    return blueprint
+
+
+def _files(path: Path) -> dict[str, bytes]:
+    return {file.name: file.read_bytes() for file in path.iterdir()}
+
+
+class ReproducibleBlueprintTest(unittest.TestCase):
+    def test_same_content_same_blueprint(self):
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            first_path = _blueprint("top").save(Path(first))
+            second_path = _blueprint("top").save(Path(second))
+
+            self.assertEqual(first_path.name, second_path.name)
+            self.assertEqual(_files(first_path), _files(second_path))
+            self.assertEqual(
+                json.loads((first_path / "description.json").read_text())["localId"],
+                first_path.name,
+            )
+
+            # Saving again keeps existing blueprint and leaves no temporary files.
+            self.assertEqual(_blueprint("top").save(Path(first)), first_path)
+            self.assertEqual(os.listdir(first), [first_path.name])
+
+    def test_different_content_different_uuid(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory)
+            uuids = {
+                _blueprint("top").save(path).name,
+                _blueprint("other").save(path).name,
+                _blueprint("top", "AND2").save(path).name,
+            }
+
+            self.assertEqual(len(uuids), 3)
+            self.assertEqual(set(os.listdir(directory)), uuids)
+
+    def test_uuid_is_random_by_default(self):
+        with tempfile.TemporaryDirectory() as directory:
+            blueprints = [_blueprint("top") for _ in range(2)]
+
+            for blueprint in blueprints:
+                blueprint.reproducible = False
+
+            self.assertNotEqual(
+                blueprints[0].save(Path(directory)),
+                blueprints[1].save(Path(directory)),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
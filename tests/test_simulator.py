@@ -0,0 +1,287 @@
+import unittest
+from typing import Any
+
+from create_blueprint.cell import generate_cells
+from create_blueprint.circuit import Circuit
+from create_blueprint.gate import Gate, GateMode
+from create_blueprint.simulator import BitParallelSimulator, Simulator
+from create_blueprint.timer import Timer
+
+# Length of clock signal required by README.
+_CLOCK_TICKS = 3
+_ADDER_WIDTH = 4
+
+
+def _circuit(
+    cells: dict[str, Any], ports: dict[str, Any], optimize: bool = False
+) -> Circuit:
+    for cell in cells.values():
+        cell.setdefault("parameters", {})
+        cell.setdefault("attributes", {})
+
+    yosys_output = {
+        "modules": {
+            "top": {
+                "attributes": {"top": "1"},
+                "ports": ports,
+                "cells": cells,
+                "netnames": {
+                    name: {"bits": port["bits"], "attributes": {}}
+                    for name, port in ports.items()
+                },
+            }
+        }
+    }
+
+    return Circuit.from_yosys_output(
+        generate_cells(10), yosys_output, "top", optimize=optimize
+    )
+
+
+def _buffer_circuit() -> tuple[Circuit, Gate]:
+    """
+    Returns circuit with output driven by input through one gate and that gate.
+    """
+
+    circuit = _circuit(
+        {"buffer": {"type": "AND1", "connections": {"A": [2], "Y": [3]}}},
+        {
+            "a": {"direction": "input", "bits": [2]},
+            "y": {"direction": "output", "bits": [3]},
+        },
+    )
+    buffer = next(
+        logic
+        for logic in circuit.middle_logic.values()
+        if isinstance(logic, Gate) and logic.mode == GateMode.AND
+    )
+
+    return circuit, buffer
+
+
+def _adder_circuit(optimize: bool) -> Circuit:
+    """
+    Returns ripple-carry adder of two `_ADDER_WIDTH`-bit inputs with carry out
+    as the highest output bit.
+    """
+
+    a = list(range(2, 2 + _ADDER_WIDTH))
+    b = list(range(2 + _ADDER_WIDTH, 2 + 2 * _ADDER_WIDTH))
+    nets = iter(range(2 + 2 * _ADDER_WIDTH, 1000))
+    cells: dict[str, Any] = {}
+    sum_bits: list[int] = []
+    carry = None
+
+    def cell(cell_type: str, *inputs: int) -> int:
+        output = next(nets)
+        connections = {chr(ord("A") + i): [net] for i, net in enumerate(inputs)}
+        connections["Y"] = [output]
+
+        cells[f"g{len(cells)}"] = {"type": cell_type, "connections": connections}
+
+        return output
+
+    for i in range(_ADDER_WIDTH):
+        half_sum = cell("XOR2", a[i], b[i])
+        half_carry = cell("AND2", a[i], b[i])
+
+        if carry is None:
+            sum_bits.append(half_sum)
+            carry = half_carry
+        else:
+            sum_bits.append(cell("XOR2", half_sum, carry))
+            carry = cell("OR2", half_carry, cell("AND2", half_sum, carry))
+
+    return _circuit(
+        cells,
+        {
+            "a": {"direction": "input", "bits": a},
+            "b": {"direction": "input", "bits": b},
+            "y": {"direction": "output", "bits": sum_bits + [carry]},
+        },
+        optimize,
+    )
+
+
+def _ticks_until_output(simulator: Simulator, expected: int, limit: int) -> int:
+    for ticks in range(1, limit + 1):
+        simulator.step()
+
+        if simulator.get_output("y") == expected:
+            return ticks
+
+    raise AssertionError(f"output is not {expected} after {limit} ticks")
+
+
+class GateTest(unittest.TestCase):
+    def test_gate_modes(self):
+        operations = {
+            "AND": lambda a, b: a & b,
+            "OR": lambda a, b: a | b,
+            "XOR": lambda a, b: a ^ b,
+            "NAND": lambda a, b: 1 - (a & b),
+            "NOR": lambda a, b: 1 - (a | b),
+            "XNOR": lambda a, b: 1 - (a ^ b),
+        }
+        cells = {
+            mode: {
+                "type": f"{mode}2",
+                "connections": {"A": [2], "B": [3], "Y": [4 + i]},
+            }
+            for i, mode in enumerate(operations)
+        }
+        circuit = _circuit(
+            cells,
+            {
+                "a": {"direction": "input", "bits": [2]},
+                "b": {"direction": "input", "bits": [3]},
+                "y": {"direction": "output", "bits": list(range(4, 4 + len(cells)))},
+            },
+        )
+        simulator = Simulator(circuit)
+
+        for a in (0, 1):
+            for b in (0, 1):
+                simulator.set_input("a", a)
+                simulator.set_input("b", b)
+                simulator.step(circuit.output_ready_time)
+
+                expected = sum(
+                    operation(a, b) << i
+                    for i, operation in enumerate(operations.values())
+                )
+
+                self.assertEqual(simulator.get_output("y"), expected, (a, b))
+
+    def test_gate_delay(self):
+        circuit, _ = _buffer_circuit()
+        simulator = Simulator(circuit)
+
+        simulator.set_input("a", 1)
+
+        # Input gate, buffer and output gate.
+        self.assertEqual(_ticks_until_output(simulator, 1, 10), 2)
+
+    def test_gate_without_inputs_is_off(self):
+        circuit, buffer = _buffer_circuit()
+        gates = [
+            circuit._create_gate("middle", mode)
+            for mode in (GateMode.NAND, GateMode.NOR, GateMode.XNOR)
+        ]
+        simulator = Simulator(circuit)
+
+        simulator.set_input("a", 1)
+        simulator.step(5)
+
+        self.assertTrue(simulator.get(buffer.id))
+
+        for gate in gates:
+            self.assertFalse(simulator.get(gate.id), gate.mode.name)
+
+
+class TimerTest(unittest.TestCase):
+    def test_timer_delay(self):
+        for ticks in (0, 1, 7, 100):
+            circuit, buffer = _buffer_circuit()
+            timer = Timer(circuit.id_generator.next(), ticks)
+
+            circuit._register_logic(timer, "middle")
+            circuit._replace(buffer, timer)
+            circuit._unregister_logic(buffer)
+
+            simulator = Simulator(circuit)
+
+            simulator.set_input("a", 1)
+
+            # Timer replaces gate with 1 tick delay.
+            self.assertEqual(
+                _ticks_until_output(simulator, 1, ticks + 10), ticks + 2, ticks
+            )
+
+            simulator.set_input("a", 0)
+
+            self.assertEqual(
+                _ticks_until_output(simulator, 0, ticks + 10), ticks + 2, ticks
+            )
+
+
+class BitParallelSimulatorTest(unittest.TestCase):
+    def test_adder_matches_simulator(self):
+        a_values = [a for a in range(2**_ADDER_WIDTH) for _ in range(2**_ADDER_WIDTH)]
+        b_values = [b for _ in range(2**_ADDER_WIDTH) for b in range(2**_ADDER_WIDTH)]
+
+        for optimize in (False, True):
+            circuit = _adder_circuit(optimize)
+            parallel_simulator = BitParallelSimulator(circuit, len(a_values))
+            simulators = [Simulator(circuit) for _ in a_values]
+
+            parallel_simulator.set_input("a", a_values)
+            parallel_simulator.set_input("b", b_values)
+
+            for simulator, a, b in zip(simulators, a_values, b_values):
+                simulator.set_input("a", a)
+                simulator.set_input("b", b)
+
+            # Outputs are compared on every tick, not only after they are ready.
+            for tick in range(circuit.output_ready_time + 1):
+                outputs = parallel_simulator.get_output("y")
+
+                for i, simulator in enumerate(simulators):
+                    self.assertEqual(
+                        outputs[i], simulator.get_output("y"), (optimize, tick, i)
+                    )
+
+                    simulator.step()
+
+                parallel_simulator.step()
+
+            self.assertEqual(
+                parallel_simulator.get_output("y"),
+                [a + b for a, b in zip(a_values, b_values)],
+            )
+
+
+class LatchTest(unittest.TestCase):
+    def test_latch(self):
+        circuit = _circuit(
+            {
+                "latch": {
+                    "type": "SYNC_SR_LATCH",
+                    "connections": {"C": [2], "S": [3], "R": [4], "Q": [5]},
+                }
+            },
+            {
+                "clk": {"direction": "input", "bits": [2]},
+                "s": {"direction": "input", "bits": [3]},
+                "r": {"direction": "input", "bits": [4]},
+                "q": {"direction": "output", "bits": [5]},
+            },
+        )
+        simulator = Simulator(circuit)
+
+        def clock(s: int, r: int) -> int:
+            simulator.set_input("s", s)
+            simulator.set_input("r", r)
+            simulator.step(circuit.output_ready_time)
+            simulator.set_input("clk", 1)
+            simulator.step(_CLOCK_TICKS)
+            simulator.set_input("clk", 0)
+            simulator.step(circuit.output_ready_time)
+
+            return simulator.get_output("q")
+
+        self.assertEqual(clock(1, 0), 1)
+        self.assertEqual(clock(0, 0), 1)
+        self.assertEqual(clock(0, 1), 0)
+        self.assertEqual(clock(0, 0), 0)
+        self.assertEqual(clock(1, 0), 1)
+
+        # Without clock inputs are ignored.
+        simulator.set_input("r", 1)
+        simulator.step(4 * circuit.output_ready_time)
+
+        self.assertEqual(simulator.get_output("q"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+from create_blueprint.cell import generate_cells
+from create_blueprint.circuit import Circuit
+
+_CHAIN_LENGTH = 6
+
+
+def _chain_circuit() -> Circuit:
+    """
+    Returns circuit which output port has one bit connected directly to input
+    and another one behind chain of `_CHAIN_LENGTH` gates, so both bits are in
+    the same output group but only one of them is critical.
+    """
+
+    cells = {}
+
+    for i in range(_CHAIN_LENGTH):
+        cells[f"g{i}"] = {
+            "type": "XOR2" if i % 2 == 1 else "AND2",
+            "parameters": {},
+            "attributes": {},
+            "connections": {
+                "A": [3 if i == 0 else 10 + i - 1],
+                "B": [2],
+                "Y": [10 + i],
+            },
+        }
+
+    ports = {
+        "a": {"direction": "input", "bits": [2, 3]},
+        "y": {"direction": "output", "bits": [2, 10 + _CHAIN_LENGTH - 1]},
+    }
+    yosys_output = {
+        "modules": {
+            "top": {
+                "attributes": {"top": "1"},
+                "ports": ports,
+                "cells": cells,
+                "netnames": {
+                    name: {"bits": port["bits"], "attributes": {}}
+                    for name, port in ports.items()
+                },
+            }
+        }
+    }
+
+    return Circuit.from_yosys_output(generate_cells(10), yosys_output, "top")
+
+
+class CriticalPathTest(unittest.TestCase):
+    def test_path_length_equals_ready_time(self):
+        circuit = _chain_circuit()
+        path = circuit.timing.critical_path()
+
+        self.assertEqual(path[0].ready, 0)
+        self.assertEqual(path[-1].ready, circuit.output_ready_time)
+        # Every logic on path delays signal by one tick.
+        self.assertEqual(len(path) - 1, circuit.output_ready_time)
+
+        for previous, entry in zip(path, path[1:]):
+            self.assertEqual(entry.arrival, previous.ready)
+            self.assertEqual(entry.ready, entry.arrival + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Any
+
+from create_blueprint.block_placer import BlockPlacer, BlockPlacerOptions
+from create_blueprint.blueprint import Blueprint
+from create_blueprint.build import _watched_files_state
+from create_blueprint.cell import generate_cells
+from create_blueprint.circuit import Circuit
+
+
+def _blueprint(width: int) -> Blueprint:
+    """
+    Returns blueprint of `width` inverters.
+    """
+
+    cells = {
+        f"not{i}": {
+            "type": "NAND1",
+            "parameters": {},
+            "attributes": {},
+            "connections": {"A": [2 + i], "Y": [2 + width + i]},
+        }
+        for i in range(width)
+    }
+    ports = {
+        "a": {"direction": "input", "bits": list(range(2, 2 + width))},
+        "y": {"direction": "output", "bits": list(range(2 + width, 2 + 2 * width))},
+    }
+    yosys_output: dict[str, Any] = {
+        "modules": {
+            "top": {
+                "attributes": {"top": "1"},
+                "ports": ports,
+                "cells": cells,
+                "netnames": {
+                    name: {"bits": port["bits"], "attributes": {}}
+                    for name, port in ports.items()
+                },
+            }
+        }
+    }
+    circuit = Circuit.from_yosys_output(generate_cells(10), yosys_output, "top")
+
+    return BlockPlacer.place(circuit, BlockPlacerOptions(None, False, True, False))
+
+
+class WatchedFilesTest(unittest.TestCase):
+    def test_included_files_are_watched(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory)
+            top = path / "top.sv"
+            header = path / "include" / "header.svh"
+
+            header.parent.mkdir()
+            header.write_text("`define WIDTH 4")
+            top.write_text('`include "include/header.svh"\nmodule top;')
+
+            state = _watched_files_state([top])
+
+            self.assertEqual(state.keys(), {top, header})
+            self.assertEqual(_watched_files_state([top]), state)
+
+            header.write_text("`define WIDTH 16")
+
+            self.assertNotEqual(_watched_files_state([top]), state)
+
+            header.unlink()
+
+            self.assertEqual(_watched_files_state([top]).keys(), {top})
+
+    def test_same_size_change(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file = Path(directory) / "top.sv"
+
+            file.write_text("module a;")
+
+            state = _watched_files_state([file])
+            mtime = state[file][0]
+
+            file.write_text("module b;")
+            # Size is the same, so edit is detected only by modification time.
+            os.utime(file, ns=(mtime + 1, mtime + 1))
+
+            self.assertNotEqual(_watched_files_state([file]), state)
+
+
+class HotSwapTest(unittest.TestCase):
+    def test_hot_swap_keeps_description_and_icon(self):
+        with tempfile.TemporaryDirectory() as directory:
+            blueprint = _blueprint(2)
+            blueprint.name = "top"
+            blueprint_path = blueprint.save(Path(directory))
+            description = (blueprint_path / "description.json").read_bytes()
+            icon = (blueprint_path / "icon.png").read_bytes()
+
+            swapped_blueprint = _blueprint(8)
+            swapped_blueprint.name = "other"
+
+            swapped_blueprint.hot_swap(blueprint_path)
+
+            self.assertEqual(os.listdir(directory), [blueprint_path.name])
+            self.assertEqual(
+                sorted(os.listdir(blueprint_path)),
+                ["blueprint.json", "description.json", "icon.png"],
+            )
+            self.assertEqual(
+                (blueprint_path / "description.json").read_bytes(), description
+            )
+            self.assertEqual((blueprint_path / "icon.png").read_bytes(), icon)
+            self.assertEqual(
+                json.loads((blueprint_path / "blueprint.json").read_text()),
+                json.loads(swapped_blueprint.to_json()),
+            )
+            self.assertNotEqual(swapped_blueprint.to_json(), blueprint.to_json())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+from create_blueprint import yosys_json
+from create_blueprint.yosys_json import parse_yosys_output
+
+# Strings with escapes and brackets, so values cut at any position are found.
+_DOCUMENT = {
+    "creator": ['a\\"]}{[', {'k"}': '\\"'}],
+    "modules": {
+        "sub": {
+            "cells": {},
+            "netnames": {'a\\"b': {"bits": [1], "attributes": {"src": "}]\\"}}},
+        },
+        "top": {
+            "attributes": {"top": "1", "a\\": "]"},
+            "ports": {'p"': {"direction": "input", "bits": [2]}},
+            "cells": {
+                "c": {
+                    "type": "AND1",
+                    "attributes": {"src": '\\"{'},
+                    "connections": {"A": [2], "Y": [3]},
+                }
+            },
+            "netnames": {
+                'p"': {"bits": [2], "attributes": {"q": "\\"}},
+                "n": {"bits": [3], "attributes": {}},
+            },
+        },
+    },
+    "after": 12345,
+}
+
+
+class ParseYosysOutputTest(unittest.TestCase):
+    def test_values_split_between_chunks(self):
+        top = _DOCUMENT["modules"]["top"]
+        expected = {
+            "attributes": top["attributes"],
+            "ports": top["ports"],
+            "cells": top["cells"],
+            "netnames": {'p"': {"attributes": {"q": "\\"}}},
+        }
+        sub = {"attributes": {}, "ports": {}, "cells": {}, "netnames": {}}
+
+        for indent in (None, 1):
+            text = json.dumps(_DOCUMENT, indent=indent)
+
+            for chunk_size in range(1, 48):
+                with mock.patch.object(yosys_json, "_CHUNK_SIZE", chunk_size):
+                    result = parse_yosys_output(io.StringIO(text), "top")
+                    submodules_result = parse_yosys_output(
+                        io.StringIO(text), "top", keep_submodules=True
+                    )
+
+                self.assertEqual(result, {"modules": {"top": expected}})
+                self.assertEqual(
+                    submodules_result, {"modules": {"sub": sub, "top": expected}}
+                )
+
+    def test_invalid_value(self):
+        for text in ('{"modules": {"sub": [1, 2}', '{"modules": {"top": {"ports": ['):
+            for chunk_size in (1, 5, 4096):
+                with mock.patch.object(yosys_json, "_CHUNK_SIZE", chunk_size):
+                    with self.assertRaises(ValueError):
+                        parse_yosys_output(io.StringIO(text), "top")
+
+
+if __name__ == "__main__":
+    unittest.main()